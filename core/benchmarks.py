@@ -0,0 +1,735 @@
+"""
+Benchmarks for the contract processing pipeline.
+
+Run from the project root, for example:
+    python -m core.benchmarks profiles "Input_PDFs/contract1.pdf" "Input_PDFs/contract2.pdf"
+    python -m core.benchmarks memory --pages 50 400
+    python -m core.benchmarks regex --size 1000
+    python -m core.benchmarks parser
+"""
+import gc
+import io
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import contextlib
+import subprocess
+
+from core.processing_logic import EXTRACTION_PROFILES
+from core.processing_logic import DEFAULT_EXTRACTION_PROFILE
+from core.processing_logic import extract_text_from_pdf
+from core.processing_logic import extract_legacy_contract_text
+from core.processing_logic import parse_any_legacy_contract_text
+from core.processing_logic import get_all_legacy_contract_field_names
+from core.processing_logic import format_name
+from core.processing_logic import generate_legacy_folder_name
+from core.text_normalization import preprocess_text_globally
+from core.field_spec import ComputedFields, ConstantField, ExtractionContext, RegexField
+from core.legacy_contract_spec import LEGACY_CONTRACT_SPEC, extract_settlement_date
+
+
+def benchmark_extraction_profiles(pdf_paths, profiles=None, reference_profile: str = "full", repeat: int = 1) -> dict:
+    """
+    Extracts every PDF with each extraction profile, parses the output with
+    `parse_any_legacy_contract_text` and compares the parsed fields against
+    those from `reference_profile`.
+
+    Args:
+        pdf_paths: The Legacy contract PDFs to benchmark.
+        profiles: Profile names to run (defaults to all of EXTRACTION_PROFILES).
+        reference_profile: The profile whose parsed fields count as correct.
+        repeat: Extractions per PDF and profile; the fastest run is kept.
+
+    Returns:
+        A dict keyed by profile name, each value holding:
+            - 'seconds' (float): Total extraction time over all PDFs.
+            - 'parse_seconds' (float): Total parse time over all PDFs.
+            - 'matching_fields' (int): Fields equal to the reference, summed over all PDFs.
+            - 'total_fields' (int): Fields compared, summed over all PDFs.
+            - 'mismatches' (dict): PDF path -> list of fields that differ from the reference.
+    """
+    profiles = list(profiles or EXTRACTION_PROFILES)
+    if reference_profile not in profiles:
+        profiles.insert(0, reference_profile)
+    field_names = get_all_legacy_contract_field_names()
+    parsed = {profile: {} for profile in profiles}
+    results = {}
+
+    for profile in profiles:
+        extraction_seconds = 0.0
+        parse_seconds = 0.0
+        for pdf_path in pdf_paths:
+            best = None
+            for _ in range(max(1, repeat)):
+                with contextlib.redirect_stdout(io.StringIO()): # Silence per-page progress output
+                    start = time.perf_counter()
+                    text = extract_legacy_contract_text(pdf_path, profile)
+                    elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            extraction_seconds += best
+            start = time.perf_counter()
+            parsed[profile][pdf_path] = parse_any_legacy_contract_text(text)
+            parse_seconds += time.perf_counter() - start
+        results[profile] = {'seconds': extraction_seconds, 'parse_seconds': parse_seconds}
+
+    for profile in profiles:
+        matching_fields = 0
+        mismatches = {}
+        for pdf_path in pdf_paths:
+            expected = parsed[reference_profile][pdf_path]
+            actual = parsed[profile][pdf_path]
+            differing = [name for name in field_names if expected.get(name) != actual.get(name)]
+            matching_fields += len(field_names) - len(differing)
+            if differing:
+                mismatches[pdf_path] = differing
+        results[profile].update({
+            'matching_fields': matching_fields,
+            'total_fields': len(field_names) * len(pdf_paths),
+            'mismatches': mismatches,
+        })
+    return results
+
+
+def format_extraction_profile_report(results: dict, reference_profile: str = "full") -> str:
+    """Formats the output of `benchmark_extraction_profiles` as a text table."""
+    reference_seconds = results[reference_profile]['seconds'] or float('nan')
+    lines = [f"{'Profile':<8} {'Extract s':>10} {'Parse s':>9} {'Speedup':>8}  Fields matching '{reference_profile}'"]
+    for profile, result in results.items():
+        speedup = reference_seconds / result['seconds'] if result['seconds'] else float('nan')
+        lines.append(
+            f"{profile:<8} {result['seconds']:>10.3f} {result['parse_seconds']:>9.3f} {speedup:>7.2f}x  "
+            f"{result['matching_fields']}/{result['total_fields']}"
+        )
+    for profile, result in results.items():
+        for pdf_path, fields in result['mismatches'].items():
+            lines.append(f"  {profile}: {pdf_path} differs in {', '.join(fields)}")
+    return "\n".join(lines)
+
+
+def write_synthetic_pdf(pdf_path: str, page_texts) -> None:
+    """
+    Writes a minimal uncompressed PDF with one Helvetica text page per entry of
+    `page_texts` (one PDF text line per line of input).
+    """
+    objects = []
+
+    def add(obj: bytes) -> int:
+        objects.append(obj)
+        return len(objects)
+
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    pages_id = add(b"") # Filled in once the page ids are known
+    page_ids = []
+    for page_text in page_texts:
+        operators = [b"BT /F1 9 Tf 11 TL 40 760 Td"]
+        for line in page_text.split("\n"):
+            encoded = line.encode("cp1252", "replace").replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+            operators.append(b"(" + encoded + b") Tj T*")
+        operators.append(b"ET")
+        stream = b"\n".join(operators)
+        content_id = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (pages_id, font_id, content_id)
+        ))
+    objects[pages_id - 1] = (b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % i for i in page_ids)
+                             + b"] /Count %d >>" % len(page_ids))
+    catalog_id = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    with open(pdf_path, 'wb') as out_file:
+        out_file.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, obj in enumerate(objects, 1):
+            offsets.append(out_file.tell())
+            out_file.write(b"%d 0 obj\n" % number + obj + b"\nendobj\n")
+        xref_offset = out_file.tell()
+        out_file.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            out_file.write(b"%010d 00000 n \n" % offset)
+        out_file.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog_id, xref_offset))
+
+
+def synthetic_exhibit_pages(page_count: int, lines_per_page: int = 24, seed: int = 0):
+    """
+    Yields the text of `page_count` pages resembling scanned exhibits: DocuSign
+    headers, DigitalControl artifacts, pipes and runs of spaces, so every
+    preprocessing rule has work to do on every page.
+    """
+    rng = random.Random(seed)
+    words = ["Exhibit", "scan", "|ab-DigitalControl_x1", "|", "    ", "Buyer", "Seller",
+             "12/01/2024", "$1,000.00", "Lot", "Address", "acknowledges", "Initials", "____"]
+    for page_number in range(page_count):
+        lines = [f"Docusign Envelope ID: 1A2B3C4D-{page_number:04d}"]
+        lines.extend(" ".join(rng.choice(words) for _ in range(12)) for _ in range(lines_per_page))
+        yield "\n".join(lines)
+
+
+def _peak_rss_bytes() -> int:
+    """Returns this process's peak resident set size in bytes."""
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        get_process_memory_info = ctypes.WinDLL("psapi").GetProcessMemoryInfo
+        get_process_memory_info.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS), wintypes.DWORD]
+        get_process_memory_info(ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb)
+        return counters.PeakWorkingSetSize
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024 # Linux reports kilobytes
+
+
+def _probe_peak_rss(mode: str, pdf_path: str | None = None, profile: str = DEFAULT_EXTRACTION_PROFILE) -> int:
+    """Runs one extraction in a fresh interpreter (so peaks don't carry over) and returns its peak RSS."""
+    command = [sys.executable, "-m", "core.benchmarks", "memory-probe", mode]
+    if pdf_path:
+        command.append(pdf_path)
+    command.extend(["--profile", profile])
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    completed = subprocess.run(command, capture_output=True, text=True, check=True, cwd=project_root)
+    return int(completed.stdout.strip().splitlines()[-1])
+
+
+def synthetic_packet_pages(exhibit_pages: int, seed: int = 0):
+    """
+    Yields the pages of a synthetic Legacy contract with no addenda followed by
+    `exhibit_pages` pages of scanned exhibits (see `synthetic_exhibit_pages`).
+    """
+    contract_text = synthetic_legacy_contract_text(seed, addendum_pages=0, noise=0.0)
+    yield from (page for page in contract_text.split("\f") if page.strip())
+    yield from synthetic_exhibit_pages(exhibit_pages, seed=seed)
+
+
+def benchmark_streaming_memory(page_counts=(50, 400), profile: str = DEFAULT_EXTRACTION_PROFILE, include_whole: bool = True) -> dict:
+    """
+    Measures peak RSS of `extract_legacy_contract_text` on synthetic packets (a
+    contract followed by each number of exhibit pages in `page_counts`; see
+    `synthetic_packet_pages`), relative to a process that only imports the
+    pipeline. Optionally also measures whole-document extraction plus
+    `preprocess_text_globally` for comparison.
+
+    Returns:
+        A dict with 'baseline_bytes' (int) and 'runs': a list of dicts holding
+        'pages', 'stream_bytes' and (if measured) 'whole_bytes', each a peak
+        RSS growth over the baseline in bytes.
+    """
+    results = {'baseline_bytes': _probe_peak_rss("baseline", profile=profile), 'runs': []}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for page_count in page_counts:
+            pdf_path = os.path.join(temp_dir, f"packet_{page_count}.pdf")
+            write_synthetic_pdf(pdf_path, synthetic_packet_pages(page_count))
+            run = {'pages': page_count}
+            run['stream_bytes'] = _probe_peak_rss("stream", pdf_path, profile) - results['baseline_bytes']
+            if include_whole:
+                run['whole_bytes'] = _probe_peak_rss("whole", pdf_path, profile) - results['baseline_bytes']
+            results['runs'].append(run)
+    return results
+
+
+def format_streaming_memory_report(results: dict) -> str:
+    """Formats the output of `benchmark_streaming_memory` as a text table."""
+    megabyte = 1024 * 1024
+    lines = [f"Baseline peak RSS: {results['baseline_bytes'] / megabyte:.1f} MB",
+             f"{'Pages':>6} {'Stream +MB':>11} {'Whole +MB':>10}"]
+    for run in results['runs']:
+        whole = f"{run['whole_bytes'] / megabyte:>10.1f}" if 'whole_bytes' in run else f"{'-':>10}"
+        lines.append(f"{run['pages']:>6} {run['stream_bytes'] / megabyte:>11.1f} {whole}")
+    return "\n".join(lines)
+
+
+def _run_memory_probe(mode: str, pdf_path: str | None, profile: str) -> int:
+    with contextlib.redirect_stdout(io.StringIO()): # Keep stdout for the measurement only
+        if mode == "stream":
+            extract_legacy_contract_text(pdf_path, profile)
+        elif mode == "whole":
+            preprocess_text_globally(extract_text_from_pdf(pdf_path, profile))
+    print(_peak_rss_bytes())
+    return 0
+
+
+def spec_pattern_targets(spec=LEGACY_CONTRACT_SPEC):
+    """
+    Yields (label, pattern sources, run) for every regex-driven part of `spec`:
+    the section locator, each scope, each RegexField and each ComputedFields
+    that lists its patterns. `run(text)` performs that part's real work on
+    `text`, as `spec.parse` would on a scope or section holding it.
+    """
+    if spec.section_locator:
+        sources = [section.start for section in spec.sections] + [section.end for section in spec.sections if section.end]
+        yield "sections", sources, spec.section_locator.locate
+    for scope in spec.scopes.values():
+        yield f"scope {scope.name}", [scope.pattern.pattern], scope.pattern.search
+    for group in spec.groups:
+        for spec_field in group.fields:
+            if isinstance(spec_field, RegexField):
+                yield spec_field.name, [pattern.pattern for pattern in spec_field.patterns], spec_field.search
+            elif isinstance(spec_field, ComputedFields) and spec_field.patterns:
+                yield "/".join(spec_field.names), [pattern.pattern for pattern in spec_field.patterns], spec_field.evaluate
+
+
+def adversarial_texts(pattern_sources, size: int, seed: int = 0) -> dict:
+    """
+    Builds inputs of about `size` characters meant to make regexes backtrack:
+    the literal words of the patterns repeated, shuffled into soups with
+    digits and punctuation, or followed by long runs of words, digits or
+    whitespace that never complete a match, or completing one every few words
+    with a ZIP code, phone number and email. Returns name -> text.
+    """
+    words = []
+    for source in pattern_sources:
+        words.extend(re.findall(r"[A-Za-z’']{2,}", re.sub(r"\\[A-Za-z]", " ", source)))
+    words = list(dict.fromkeys(words)) or ["a"]
+    first = words[0]
+    rng = random.Random(seed)
+    filler = ["1", "12", "12345", "555-1234", "(662)", "a", "-", ",", ".", "#", "@", ":", "$", "%", "/", "\n"]
+    texts = {
+        'repeated_keyword': (first + " 1 ") * (size // (len(first) + 3) + 1),
+        'keyword_then_words': (first + " a b c ") * (size // (len(first) + 7) + 1),
+        'word_soup': " ".join(rng.choice(words + ["1", "a", "12345"]) for _ in range(size)),
+        'token_soup': " ".join(rng.choice(words[:-1] + filler) for _ in range(size)),
+        'whitespace_run': first + " " * size,
+        'word_run': first + " " + "a " * (size // 2),
+        'digit_run': "1 " + "1 a " * (size // 4),
+        'long_word': first + " " + "a" * size,
+        'all_keywords_but_last': " ".join(words[:-1]) + " " + "a " * (size // 2),
+        'repeated_vocabulary': (" ".join(words) + " 12345 (662) 555-1234 a@b.co ") * (size // 40 + 1),
+    }
+    return {name: text[:size] if len(text) > size + len(first) + 1 else text for name, text in texts.items()}
+
+
+def _best_seconds(run, text, repeat: int) -> float:
+    """Fastest of `repeat` runs of `run(text)`, with garbage collection paused as in `benchmark_parser`."""
+    gc_was_enabled = gc.isenabled()
+    gc.disable() # A collection of other runs' garbage can triple a millisecond timing
+    try:
+        best = None
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            run(text)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def benchmark_regex_scaling(spec=LEGACY_CONTRACT_SPEC, size: int = 1000, growth: int = 4, slack: float = 2.5,
+                            floor_seconds: float = 0.002, repeat: int = 5) -> list:
+    """
+    Times every part of `spec` from `spec_pattern_targets` on each adversarial
+    input at `size` and `growth` * `size` characters. Linear work grows about
+    `growth` times; a part fails when the larger input takes more than
+    `slack` * `growth` times as long and more than `floor_seconds` (so timer
+    noise on microsecond runs can't fail it).
+
+    Returns:
+        A list of dicts, one per part and input, worst ratio first, holding
+        'target', 'input', 'small_seconds', 'large_seconds', 'ratio' and 'failed'.
+    """
+    results = []
+    for label, sources, run in spec_pattern_targets(spec):
+        small_texts = adversarial_texts(sources, size)
+        large_texts = adversarial_texts(sources, size * growth)
+        for input_name, small_text in small_texts.items():
+            small_seconds = _best_seconds(run, small_text, repeat)
+            large_seconds = _best_seconds(run, large_texts[input_name], repeat)
+            ratio = large_seconds / max(small_seconds, 1e-7)
+            results.append({
+                'target': label,
+                'input': input_name,
+                'small_seconds': small_seconds,
+                'large_seconds': large_seconds,
+                'ratio': ratio,
+                'failed': large_seconds > floor_seconds and ratio > slack * growth,
+            })
+    results.sort(key=lambda result: result['ratio'], reverse=True)
+    return results
+
+
+def format_regex_scaling_report(results: list, limit: int = 15) -> str:
+    """Formats the slowest-growing entries of `benchmark_regex_scaling` as a text table."""
+    lines = [f"{'Target':<34} {'Input':<22} {'Small ms':>9} {'Large ms':>9} {'Ratio':>7}"]
+    for result in results[:limit]:
+        flag = "  FAIL" if result['failed'] else ""
+        lines.append(f"{result['target'][:34]:<34} {result['input']:<22} {result['small_seconds'] * 1000:>9.3f} "
+                     f"{result['large_seconds'] * 1000:>9.3f} {result['ratio']:>7.1f}{flag}")
+    return "\n".join(lines)
+
+
+_FIRST_NAMES = ["John A", "Jane B", "Maria", "Robert L", "Keisha", "Tran", "William Henry", "Ashley", "Luis", "Mary Beth"]
+_LAST_NAMES = ["Smith", "Johnson", "Nguyen", "Williams", "Garcia", "O'Neal", "Brown", "Davis-Hill", "McKenzie", "Patel"]
+_COMPANY_BUYERS = ["Smith Custom Homes LLC", "Delta Properties Inc", "Magnolia Builders LLC", "Riverbend Development Inc"]
+_STREET_NAMES = ["Main", "Oak", "Maple", "Getwell", "Church", "Goodman", "Stateline", "Hacks Cross", "Poplar", "Pleasant Hill"]
+_BUYER_STREET_SUFFIXES = ["Street", "St", "Drive", "Dr", "Road", "Rd", "Avenue", "Ave", "Lane", "Cove", "Court", "Place", "Blvd"]
+_PROPERTY_STREET_SUFFIXES = ["Lane", "Drive", "Road", "Cove", "Street", "St", "Ave", "Dr"]
+_CITIES = [("Southaven", "MS", "38671"), ("Hernando", "MS", "38632"), ("Olive Branch", "MISSISSIPPI", "38654"),
+           ("Horn Lake", "MS", "38637"), ("Memphis", "TN", "38117"), ("Collierville", "TENNESSEE", "38017"),
+           ("Germantown", "TN", "38138"), ("Dallas", "TX", "75201")]
+_SUBDIVISIONS = ["Cherry Hill Phase 2", "Bakers Grove Section B Phase 3", "Wedgewood", "Lakes of Nesbit Phase 1",
+                 "Cypress Creek", "Hunters Ridge Section 4 Phase 2"]
+_PLANS = ["Aspen B", "Willow II", "Magnolia C", "Birch-A"]
+_SELLING_FIRMS = ["Crye-Leike Realtors", "Keller Williams Realty", "Coldwell Banker Collins-Maury", "eXp Realty, LLC",
+                  "Hobson Realtors", "Sowell & Co."]
+_AGENT_NAMES = ["Bob Brown", "Mary Jones", "Tasha Reed", "Chris Lee", "Ann-Marie Cole", "Dwayne Carter Jr"]
+
+
+def _synthetic_person(rng) -> str:
+    return f"{rng.choice(_FIRST_NAMES)} {rng.choice(_LAST_NAMES)}"
+
+
+def _synthetic_phone(rng) -> str:
+    return f"({rng.choice(['662', '901', '601'])}) 555-{rng.randrange(10000):04d}"
+
+
+def _synthetic_street(rng, suffixes) -> str:
+    return f"{rng.randrange(100, 9999)} {rng.choice(_STREET_NAMES)} {rng.choice(suffixes)}"
+
+
+def _synthetic_agency_block(rng) -> str:
+    listing = (f"Listing Agency Legacy Homes Realty Listing Agent {rng.choice(_AGENT_NAMES)}, Business Phone {_synthetic_phone(rng)} "
+               f"Address 5740 Getwell Email listing{rng.randrange(100)}@legacy.com License #: Agent S-{rng.randrange(10000, 99999)} ")
+    style = rng.randrange(4)
+    if style == 0: # Unrepresented buyer: no selling agency at all
+        return listing
+    city, state, zip_code = rng.choice(_CITIES)
+    agent = rng.choice(_AGENT_NAMES)
+    street = _synthetic_street(rng, ["Street", "Parkway", "Road", "Rd", "Avenue"])
+    if style == 1:
+        address = f"Address: {street}, {city}, {state}, {zip_code}, United States of America"
+    elif style == 2:
+        address = f"Address: {street}, Suite {rng.randrange(100, 400)}, {city}, {state} {zip_code}"
+    else:
+        address = f"Address: {street}, {city}, {state}, United States of America {zip_code}"
+    licenses = f"License #: Firm {rng.randrange(1000, 99999)} " if rng.random() < 0.7 else ""
+    return (f"{listing}Selling Agency {rng.choice(_SELLING_FIRMS)} Selling Agent {agent}, Business Phone {_synthetic_phone(rng)} "
+            f"{address} Email: {agent.split()[0].lower()}@example.com {licenses}License #: Agent S-{rng.randrange(10000, 99999)} ")
+
+
+def _add_docusign_noise(rng, text: str, noise: float) -> str:
+    """Sprinkles DigitalControl markers, stray pipes and column gaps between the words of `text`."""
+    if noise <= 0:
+        return text
+    pieces = []
+    for word in text.split(" "):
+        pieces.append(word)
+        roll = rng.random()
+        if roll < noise * 0.03:
+            pieces.append(f"|{rng.choice(['abc', 'x9', 'dc-4'])}-DigitalControl_{rng.choice(['x1', 'b_2', 'z'])}")
+        elif roll < noise * 0.08:
+            pieces.append("|")
+        elif roll < noise * 0.15:
+            pieces.append(" " * rng.randrange(2, 12))
+    return " ".join(pieces)
+
+
+def synthetic_legacy_contract_text(seed: int = 0, buyer_count: int | None = None, addendum_pages: int | None = None,
+                                   noise: float | None = None) -> str:
+    """
+    Builds the text `extract_text_from_pdf` would give for a made-up Legacy
+    contract. The seed picks everything left as None: one or two buyers (or a
+    company), address and state spellings, whether a plan is listed, the
+    agency block (no selling agency, or one of several address layouts), the
+    closing-date block, how much DocuSign noise is sprinkled in and how many
+    addendum pages follow the form.
+    """
+    rng = random.Random(seed)
+    if buyer_count is None:
+        buyer_count = rng.choice([1, 2, 2])
+    if addendum_pages is None:
+        addendum_pages = rng.choice([0, 1, 2, 4, 8, 16, 32])
+    if noise is None:
+        noise = rng.choice([0.0, 0.5, 1.0, 2.0])
+    envelope = f"Docusign Envelope ID: {rng.getrandbits(32):08X}-{rng.getrandbits(16):04X}-{rng.getrandbits(16):04X}-{rng.getrandbits(16):04X}-{rng.getrandbits(48):012X}"
+
+    if buyer_count == 1 and rng.random() < 0.2:
+        buyers = [rng.choice(_COMPANY_BUYERS)]
+    else:
+        buyers = [_synthetic_person(rng) for _ in range(buyer_count)]
+    separator = rng.choice([" and ", "     "]) # pdfminer keeps column gaps between names
+    names = separator.join(buyers)
+    contacts = []
+    for buyer in buyers:
+        city, state, zip_code = rng.choice(_CITIES)
+        contacts.append(f"{_synthetic_street(rng, _BUYER_STREET_SUFFIXES)} {city} {state} {zip_code} {_synthetic_phone(rng)} "
+                        f"{buyer.split()[0].lower()}{rng.randrange(100)}@example.com")
+    city, state, zip_code = rng.choice([city for city in _CITIES if city[1] in ("MS", "MISSISSIPPI", "TN", "TENNESSEE")])
+    plan = f" Plan/Elevation {rng.choice(_PLANS)}" if rng.random() < 0.7 else ""
+    dates = [f"{rng.randrange(1, 13):02d}/{rng.randrange(1, 29):02d}/{rng.randrange(2024, 2027)}" for _ in range(rng.choice([2, 3]))]
+    deposit = rng.choice([
+        f"4. Deposit held by LEGACY NEW HOMES,LLC ${rng.randrange(500, 10000):,}.00",
+        f"4. DEPOSIT Held by Legacy New Homes, LLC ${rng.randrange(500, 10000):,}.00",
+    ])
+
+    page1 = "\n".join([
+        envelope,
+        "NEW HOME PURCHASE CONTRACT",
+        "1. Parties - LEGACY NEW HOMES, LLC hereafter called SELLER and",
+        names,
+        "hereafter called BUYER(s), whose address, phone numbers, and email addresses are listed below",
+        *contacts,
+        "hereby agree to the following.",
+        _add_docusign_noise(rng, f"2. Property: Lot {rng.randrange(1, 300)}{plan} Subdivision {rng.choice(_SUBDIVISIONS)} "
+                                 f"Address {_synthetic_street(rng, _PROPERTY_STREET_SUFFIXES)} {city} {state} {zip_code}", noise),
+        f"3. Full Purchase Price ${rng.randrange(180000, 650000):,}.00",
+        deposit,
+        f"5. Home is to close on or before {'/'.join(dates)}/ as agreed",
+        f"6. BUYER wishes to take title as follows: {names} Please List whether BUYER is: Single Person Married Person",
+        "|abc-DigitalControl_x1 Revised 01/15/24",
+    ])
+    page2 = "\n".join([
+        envelope,
+        _add_docusign_noise(rng, f"7. Seller agrees to pay buyer’s agent compensation of {rng.choice([1, 2, 3])}% at closing.", noise),
+        _add_docusign_noise(rng, f"12. AGENCY DISCLOSURE - (check one): {_synthetic_agency_block(rng)}13. ARBITRATION All disputes "
+                                 "arising under this contract shall be settled by arbitration.", noise),
+        "Revised 01/15/24",
+    ])
+    pages = [page1, page2]
+    for page_number in range(addendum_pages):
+        lines = [envelope, f"ADDENDUM {page_number + 1} | Disclosure page {page_number + 1}"]
+        for _ in range(rng.randrange(10, 30)):
+            lines.append(_add_docusign_noise(rng, " ".join(rng.choice(
+                ["The", "buyer", "seller", "acknowledges", "receipt", "of", "the", "disclosures", "listed", "herein",
+                 "Initials", "____", "Date", "Lot", "closing", "12/31/2025", "$1,500.00", "Address", "Phone"]
+            ) for _ in range(rng.randrange(6, 16))), noise))
+        pages.append("\n".join(lines))
+    return "\n\f".join(pages) + "\n\f"
+
+
+# Saved `parser` run compared against by default and by tests/test_parser_benchmark.py
+PARSER_BASELINE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "parser_baseline.json")
+
+
+def synthetic_legacy_corpus(documents: int, seed: int = 0) -> list:
+    """`documents` texts from `synthetic_legacy_contract_text`, reproducible from `seed`."""
+    return [synthetic_legacy_contract_text(seed * 1_000_003 + i) for i in range(documents)]
+
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def benchmark_parser(texts, spec=LEGACY_CONTRACT_SPEC, repeat: int = 3) -> dict:
+    """
+    Times the Legacy parser on `texts`, keeping the fastest of `repeat` rounds
+    per measurement:
+
+    - documents_per_second: whole `parse_any_legacy_contract_text` calls.
+    - latency: p50/p99 seconds per document of preprocessing, of every
+      non-constant field of `spec` (labelled like `benchmarks.py regex`), of
+      the SETTDATE token walk on the raw text, of `format_name` on the parsed
+      buyers and of `generate_legacy_folder_name`.
+
+    Garbage collection is paused while timing and run between documents.
+    """
+    texts = list(texts)
+    gc_was_enabled = gc.isenabled()
+    gc.disable() # A collection landing in one document's timing would show up as its p99
+    try:
+        return _benchmark_parser(texts, spec, repeat)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _benchmark_parser(texts: list, spec, repeat: int) -> dict:
+    parse_seconds = None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        parsed = [parse_any_legacy_contract_text(text) for text in texts]
+        elapsed = time.perf_counter() - start
+        parse_seconds = elapsed if parse_seconds is None else min(parse_seconds, elapsed)
+
+    def timed(samples: dict, label: str, run, *args):
+        start = time.perf_counter()
+        result = run(*args)
+        elapsed = time.perf_counter() - start
+        samples[label] = min(samples.get(label, elapsed), elapsed)
+        return result
+
+    document_samples = [{} for _ in texts]
+    for _ in range(max(1, repeat)): # Whole rounds, so a slow moment can't hit every try of one document
+        for text, data, samples in zip(texts, parsed, document_samples):
+            context = timed(samples, "preprocess", ExtractionContext, spec, text)
+            for group in spec.groups:
+                for spec_field in group.fields:
+                    if not isinstance(spec_field, ConstantField):
+                        timed(samples, "/".join(spec_field.names), spec_field.extract, context)
+            timed(samples, "SETTDATE token walk", extract_settlement_date, text)
+            timed(samples, "format_name", format_name, data.get('BYR1NAM1') or "", data.get('BYR1NAM2'))
+            timed(samples, "generate_legacy_folder_name", generate_legacy_folder_name, data)
+            gc.collect()
+
+    latencies = {}
+    for samples in document_samples:
+        for label, seconds in samples.items():
+            latencies.setdefault(label, []).append(seconds)
+
+    latency = {}
+    for label, values in latencies.items():
+        values.sort()
+        latency[label] = {'p50': _percentile(values, 0.50), 'p99': _percentile(values, 0.99)}
+    return {
+        'documents': len(texts),
+        'characters': sum(len(text) for text in texts),
+        'documents_per_second': len(texts) / parse_seconds if parse_seconds else float('inf'),
+        'latency': latency,
+    }
+
+
+def compare_parser_benchmark(results: dict, baseline: dict, max_regression: float = 0.25,
+                             max_p99_regression: float = 1.0, floor_seconds: float = 0.00005) -> list:
+    """
+    Returns a message for every measurement of `results` that is worse than
+    in `baseline` by more than a fraction: `max_regression` for documents per
+    second and p50 latencies, `max_p99_regression` for p99 latencies (the
+    slowest documents vary most from run to run). Latencies that grew by less
+    than `floor_seconds` are ignored, so timer noise on microsecond steps
+    can't fail the run. Measurements missing from either side are skipped.
+    """
+    regressions = []
+    baseline_rate = baseline.get('documents_per_second')
+    if baseline_rate and results['documents_per_second'] < baseline_rate * (1 - max_regression):
+        regressions.append(f"documents/second fell from {baseline_rate:.1f} to {results['documents_per_second']:.1f}")
+    for label, baseline_stats in baseline.get('latency', {}).items():
+        stats = results['latency'].get(label)
+        if not stats:
+            continue
+        for key, allowed in (('p50', max_regression), ('p99', max_p99_regression)):
+            before, after = baseline_stats.get(key), stats[key]
+            if before is not None and after > before * (1 + allowed) and after - before > floor_seconds:
+                regressions.append(f"{label} {key} rose from {before * 1e6:.0f} µs to {after * 1e6:.0f} µs")
+    return regressions
+
+
+def format_parser_benchmark_report(results: dict, baseline: dict | None = None) -> str:
+    """Formats the output of `benchmark_parser` as a text table, next to `baseline` when given."""
+    lines = [f"{results['documents']} documents ({results['characters']:,} characters): "
+             f"{results['documents_per_second']:.1f} documents/second"
+             + (f" (baseline {baseline['documents_per_second']:.1f})" if baseline else "")]
+    lines.append(f"{'Step':<44} {'p50 µs':>9} {'p99 µs':>9}" + (f" {'Base p50':>9} {'Base p99':>9}" if baseline else ""))
+    for label, stats in sorted(results['latency'].items(), key=lambda item: item[1]['p99'], reverse=True):
+        line = f"{label[:44]:<44} {stats['p50'] * 1e6:>9.1f} {stats['p99'] * 1e6:>9.1f}"
+        baseline_stats = (baseline or {}).get('latency', {}).get(label)
+        if baseline_stats:
+            line += f" {baseline_stats['p50'] * 1e6:>9.1f} {baseline_stats['p99'] * 1e6:>9.1f}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m core.benchmarks", description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    profiles_parser = subparsers.add_parser("profiles", help="Compare extraction profiles for speed and parsed-field accuracy.")
+    profiles_parser.add_argument("pdfs", nargs="+", help="Legacy contract PDFs to benchmark.")
+    profiles_parser.add_argument("--profiles", nargs="+", choices=list(EXTRACTION_PROFILES), help="Profiles to run (default: all).")
+    profiles_parser.add_argument("--reference", default="full", choices=list(EXTRACTION_PROFILES), help="Profile treated as correct.")
+    profiles_parser.add_argument("--repeat", type=int, default=1, help="Extractions per PDF and profile; the fastest is kept.")
+    profiles_parser.add_argument("--strict", action="store_true", help="Exit with status 1 if any profile's fields differ.")
+
+    memory_parser = subparsers.add_parser("memory", help="Check that Legacy extraction keeps peak RSS flat as exhibit pages are added.")
+    memory_parser.add_argument("--pages", nargs=2, type=int, default=[50, 400], metavar=("SMALL", "LARGE"), help="Exhibit pages after the contract in the two synthetic packets compared.")
+    memory_parser.add_argument("--profile", default=DEFAULT_EXTRACTION_PROFILE, choices=list(EXTRACTION_PROFILES), help="Extraction profile to use.")
+    memory_parser.add_argument("--max-growth-mb", type=float, default=2.0, help="Allowed extra peak RSS for the large PDF over the small one.")
+    memory_parser.add_argument("--skip-whole", action="store_true", help="Don't measure whole-document extraction for comparison.")
+
+    regex_parser = subparsers.add_parser("regex", help="Check that every Legacy pattern stays linear on adversarial inputs.")
+    regex_parser.add_argument("--size", type=int, default=1000, help="Characters in the smaller adversarial inputs.")
+    regex_parser.add_argument("--growth", type=int, default=4, help="How many times larger the second inputs are.")
+    regex_parser.add_argument("--slack", type=float, default=2.5, help="Allowed time growth over linear before failing.")
+
+    parser_parser = subparsers.add_parser("parser", help="Time the Legacy parser on a synthetic corpus and compare with a saved baseline.")
+    parser_parser.add_argument("--documents", type=int, default=200, help="Synthetic contracts to parse.")
+    parser_parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic corpus.")
+    parser_parser.add_argument("--repeat", type=int, default=3, help="Rounds per measurement; the fastest is kept.")
+    parser_parser.add_argument("--baseline", default=PARSER_BASELINE_PATH, help="JSON file with a saved run to compare against (default: the committed one).")
+    parser_parser.add_argument("--save-baseline", action="store_true", help="Write this run to --baseline instead of comparing.")
+    parser_parser.add_argument("--max-regression", type=float, default=0.25, help="Allowed drop in documents/second and rise in p50, as a fraction.")
+    parser_parser.add_argument("--max-p99-regression", type=float, default=1.0, help="Allowed rise in p99 latency, as a fraction.")
+
+    probe_parser = subparsers.add_parser("memory-probe") # Internal: one measurement per fresh process
+    probe_parser.add_argument("mode", choices=["baseline", "stream", "whole"])
+    probe_parser.add_argument("pdf", nargs="?")
+    probe_parser.add_argument("--profile", default=DEFAULT_EXTRACTION_PROFILE, choices=list(EXTRACTION_PROFILES))
+
+    args = parser.parse_args(argv)
+    if args.command == "memory-probe":
+        return _run_memory_probe(args.mode, args.pdf, args.profile)
+    if args.command == "memory":
+        results = benchmark_streaming_memory(args.pages, args.profile, not args.skip_whole)
+        print(format_streaming_memory_report(results))
+        small, large = results['runs']
+        growth_mb = (large['stream_bytes'] - small['stream_bytes']) / (1024 * 1024)
+        if growth_mb > args.max_growth_mb:
+            print(f"FAIL: Streaming peak RSS grew {growth_mb:.1f} MB from {small['pages']} to {large['pages']} pages "
+                  f"(allowed {args.max_growth_mb:.1f} MB).")
+            return 1
+        print(f"OK: Streaming peak RSS grew {growth_mb:.1f} MB from {small['pages']} to {large['pages']} pages.")
+    if args.command == "regex":
+        results = benchmark_regex_scaling(size=args.size, growth=args.growth, slack=args.slack)
+        print(format_regex_scaling_report(results))
+        failed = sorted({result['target'] for result in results if result['failed']})
+        if failed:
+            print(f"FAIL: Super-linear time growth in: {', '.join(failed)}")
+            return 1
+        print(f"OK: {len({result['target'] for result in results})} patterns and fields grew at most linearly.")
+    if args.command == "parser":
+        results = benchmark_parser(synthetic_legacy_corpus(args.documents, args.seed), repeat=args.repeat)
+        results.update(seed=args.seed, repeat=args.repeat)
+        if args.save_baseline:
+            if not args.baseline:
+                print("ERROR: --save-baseline needs --baseline.")
+                return 2
+            with open(args.baseline, 'w', encoding='utf-8') as baseline_file:
+                json.dump(results, baseline_file, indent=2)
+            print(format_parser_benchmark_report(results))
+            print(f"INFO: Saved parser baseline to {args.baseline}")
+            return 0
+        baseline = None
+        if args.baseline:
+            try:
+                with open(args.baseline, encoding='utf-8') as baseline_file:
+                    baseline = json.load(baseline_file)
+            except FileNotFoundError:
+                print(f"WARNING: No parser baseline at {args.baseline}; run with --save-baseline to create one.")
+        if baseline and (baseline.get('documents'), baseline.get('seed')) != (results['documents'], args.seed):
+            print(f"WARNING: Baseline was run on {baseline.get('documents')} documents with seed {baseline.get('seed')}; "
+                  f"comparing anyway.")
+        print(format_parser_benchmark_report(results, baseline))
+        if baseline:
+            regressions = compare_parser_benchmark(results, baseline, args.max_regression, args.max_p99_regression)
+            if regressions:
+                print("FAIL: Parser slower than the baseline:")
+                for regression in regressions:
+                    print(f"  {regression}")
+                return 1
+            print(f"OK: Parser within {args.max_regression:.0%} (p99 {args.max_p99_regression:.0%}) of the baseline.")
+    if args.command == "profiles":
+        results = benchmark_extraction_profiles(args.pdfs, args.profiles, args.reference, args.repeat)
+        print(format_extraction_profile_report(results, args.reference))
+        if args.strict and any(result['mismatches'] for result in results.values()):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
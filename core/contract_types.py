@@ -0,0 +1,61 @@
+import re
+from dataclasses import dataclass
+from typing import Callable
+
+# Contract type of PDFs the classifier can't place.
+OTHER_CONTRACT_TYPE = "Other"
+
+
+@dataclass(frozen=True)
+class ContractType:
+    """
+    One kind of contract the application knows.
+
+    Attributes:
+        name: Name shown in the contract type selector, e.g. "Legacy".
+        markers: Patterns found on the first page of this kind of contract;
+                 the more of them a first page matches, the likelier the type.
+        output_subdir: Folder under the closings root its outputs go to ("" for the root itself).
+        parser: Function of the raw PDF text returning field name -> value,
+                or None while the type has no parser yet.
+    """
+    name: str
+    markers: tuple[re.Pattern, ...]
+    output_subdir: str = ""
+    parser: Callable[[str], dict] | None = None
+
+
+class ContractTypeRegistry:
+    """
+    The known contract types, in registration order, and a classifier that
+    picks one from a PDF's first page alone: the type with the most matching
+    markers wins (ties go to the type registered first), and a page matching
+    none is left unclassified.
+    """
+
+    def __init__(self, contract_types=()):
+        self._types = {}
+        for contract_type in contract_types:
+            self.register(contract_type)
+
+    def register(self, contract_type: ContractType) -> None:
+        if contract_type.name in self._types:
+            raise ValueError(f"Contract type '{contract_type.name}' is already registered.")
+        self._types[contract_type.name] = contract_type
+
+    def get(self, name: str) -> ContractType | None:
+        return self._types.get(name)
+
+    def names(self) -> list[str]:
+        return list(self._types)
+
+    def classify(self, first_page_text: str | None) -> ContractType | None:
+        """Returns the contract type `first_page_text` most likely belongs to, or None."""
+        if not first_page_text:
+            return None
+        best, best_score = None, 0
+        for contract_type in self._types.values():
+            score = sum(1 for marker in contract_type.markers if marker.search(first_page_text))
+            if score > best_score:
+                best, best_score = contract_type, score
+        return best
@@ -0,0 +1,123 @@
+from dataclasses import dataclass
+from typing import Callable
+
+# Stands for every extracted (non-derived) field in `OutputDocument.inputs`.
+ALL_EXTRACTED_FIELDS = "*"
+
+
+@dataclass(frozen=True)
+class DerivedField:
+    """
+    A value computed from other fields instead of read from the contract, e.g.
+    the combined buyer name. `inputs` may name extracted or other derived
+    fields; `compute` gets one dict holding both.
+    """
+    name: str
+    inputs: tuple[str, ...]
+    compute: Callable[[dict], object]
+
+
+@dataclass(frozen=True)
+class OutputDocument:
+    """A generated output and the fields (extracted or derived) it shows."""
+    name: str
+    inputs: tuple[str, ...]
+
+
+class FieldDependencyGraph:
+    """
+    Which derived fields and output documents depend on which fields, so that
+    an edit to one field recomputes only what depends on it (directly or
+    through other derived fields) and marks only the outputs showing any of
+    those values as dirty.
+
+    Usage:
+        derived = graph.compute(data)
+        data['BYR1NAM1'] = "Jane Doe"
+        recomputed, dirty = graph.recompute(data, derived, {'BYR1NAM1'})
+    """
+
+    def __init__(self, derived_fields, outputs=()):
+        self.derived_fields = {derived.name: derived for derived in derived_fields}
+        self.outputs = tuple(outputs)
+        self._dependents = {}
+        for derived in self.derived_fields.values():
+            for name in derived.inputs:
+                self._dependents.setdefault(name, []).append(derived.name)
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> tuple[str, ...]:
+        order, visiting, done = [], set(), set()
+
+        def visit(name):
+            if name in done or name not in self.derived_fields:
+                return
+            if name in visiting:
+                raise ValueError(f"Derived field '{name}' depends on itself.")
+            visiting.add(name)
+            for input_name in self.derived_fields[name].inputs:
+                visit(input_name)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.derived_fields:
+            visit(name)
+        return tuple(order)
+
+    def affected_fields(self, changed) -> list[str]:
+        """The derived fields that depend on any of `changed`, in the order they must be computed."""
+        affected = set()
+        pending = list(changed)
+        while pending:
+            for dependent in self._dependents.get(pending.pop(), ()):
+                if dependent not in affected:
+                    affected.add(dependent)
+                    pending.append(dependent)
+        return [name for name in self.order if name in affected]
+
+    def affected_outputs(self, changed) -> list[str]:
+        """The outputs showing any of `changed` or a derived field depending on them."""
+        changed = set(changed)
+        touched = changed | set(self.affected_fields(changed))
+        extracted_changed = any(name not in self.derived_fields for name in changed)
+        return [
+            output.name for output in self.outputs
+            if touched.intersection(output.inputs) or (extracted_changed and ALL_EXTRACTED_FIELDS in output.inputs)
+        ]
+
+    def compute(self, data: dict, names=None) -> dict:
+        """
+        Computes the derived fields in `names` (default: all) from `data`,
+        along with any derived fields they need, and returns name -> value.
+        """
+        wanted = set(self.derived_fields if names is None else names)
+        needed = set(wanted)
+        pending = list(wanted)
+        while pending:
+            for input_name in self.derived_fields[pending.pop()].inputs:
+                if input_name in self.derived_fields and input_name not in needed:
+                    needed.add(input_name)
+                    pending.append(input_name)
+        values = dict(data)
+        for name in self.order:
+            if name in needed:
+                values[name] = self.derived_fields[name].compute(values)
+        return {name: values[name] for name in self.order if name in wanted}
+
+    def recompute(self, data: dict, derived: dict, changed) -> tuple[dict, list[str]]:
+        """
+        Updates `derived` (values from `compute`) in place after the fields in
+        `changed` were edited in `data`, recomputing only their dependents.
+
+        Returns:
+            A tuple of (recomputed derived field -> new value, names of the
+            outputs that are now out of date).
+        """
+        values = dict(data)
+        values.update(derived)
+        recomputed = {}
+        for name in self.affected_fields(changed):
+            values[name] = recomputed[name] = self.derived_fields[name].compute(values)
+        derived.update(recomputed)
+        return recomputed, self.affected_outputs(changed)
@@ -0,0 +1,125 @@
+"""
+Saves python-docx documents without recompressing the parts a render left alone.
+
+A generated document differs from its template in a few parts (mostly
+word/document.xml); styles, theme, fonts, settings and media serialize to the
+same bytes as the template's do. `write_docx` serializes the package the way
+python-docx's own save does and compresses only the parts whose bytes differ
+from the packed template: `pack_document` of the parsed template, i.e.
+python-docx's re-serialization of it, deflated once. The rest reuse those
+deflated bytes. The template file's own zip members are never read, so the
+output is what `document.save` would write, not a copy of the template's archive.
+"""
+import time
+import zlib
+import struct
+from dataclasses import dataclass
+
+from docx.opc.pkgwriter import PackageWriter
+
+_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+_CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+_END_RECORD = struct.Struct("<IHHHHIIH")
+_ZIP_VERSION = 20 # 2.0: deflate
+_DEFLATED = 8
+_UTF8_NAME_FLAG = 0x800
+_ZIP32_LIMIT = 0xFFFFFFFF
+
+
+@dataclass(frozen=True)
+class PackedPart:
+    """One zip member: its uncompressed bytes, their CRC-32 and their raw deflate stream."""
+    blob: bytes
+    crc: int
+    compressed: bytes
+
+
+def pack_part(blob: bytes) -> PackedPart:
+    # Same settings as zipfile's ZIP_DEFLATED, which python-docx saves with
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    return PackedPart(blob, zlib.crc32(blob), compressor.compress(blob) + compressor.flush())
+
+
+class _EntryCollector:
+    """Stands in for python-docx's zip writer and keeps the members in the order they are written."""
+
+    def __init__(self):
+        self.entries = []
+
+    def write(self, pack_uri, blob):
+        self.entries.append((pack_uri.membername, blob))
+
+    def close(self):
+        pass
+
+
+def package_entries(document) -> list[tuple[str, bytes]]:
+    """(member name, bytes) of every zip member `document.save` would write, in the same order."""
+    package = document.part.package
+    parts = package.parts
+    for part in parts:
+        part.before_marshal()
+    collector = _EntryCollector()
+    PackageWriter._write_content_types_stream(collector, parts)
+    PackageWriter._write_pkg_rels(collector, package.rels)
+    PackageWriter._write_parts(collector, parts)
+    return collector.entries
+
+
+def pack_document(document) -> dict:
+    """Member name -> PackedPart for every member of `document`, for use as `write_docx`'s `packed_template`."""
+    return {name: pack_part(blob) for name, blob in package_entries(document)}
+
+
+def _dos_date_time(timestamp: float) -> tuple[int, int]:
+    year, month, day, hour, minute, second = time.localtime(timestamp)[:6]
+    return (hour << 11) | (minute << 5) | (second // 2), ((year - 1980) << 9) | (month << 5) | day
+
+
+def write_docx(document, output_path: str, packed_template: dict | None = None) -> tuple[int, int]:
+    """
+    Saves `document` to `output_path` like `document.save`, reusing the
+    deflated bytes in `packed_template` (see `pack_document`) for every member
+    whose serialized bytes equal those packed there instead of compressing it
+    again. Falls back to `document.save` for a package too big for a plain
+    (non-ZIP64) archive.
+
+    Returns:
+        A tuple of (members compressed, members reusing packed bytes).
+    """
+    packed_template = packed_template or {}
+    members = []
+    copied = 0
+    for name, blob in package_entries(document):
+        packed = packed_template.get(name)
+        if packed is not None and packed.blob == blob:
+            copied += 1
+        else:
+            packed = pack_part(blob)
+        members.append((name.encode('utf-8'), packed))
+    archive_size = sum(30 + 46 + 2 * len(name) + len(packed.compressed) for name, packed in members)
+    if archive_size >= _ZIP32_LIMIT or len(members) >= 0xFFFF:
+        document.save(output_path)
+        return len(members), 0
+
+    dos_time, dos_date = _dos_date_time(time.time())
+    central_directory = []
+    with open(output_path, 'wb') as out_file:
+        offset = 0
+        for name, packed in members:
+            flags = 0 if name.isascii() else _UTF8_NAME_FLAG
+            out_file.write(_LOCAL_HEADER.pack(
+                0x04034b50, _ZIP_VERSION, flags, _DEFLATED, dos_time, dos_date,
+                packed.crc, len(packed.compressed), len(packed.blob), len(name), 0
+            ))
+            out_file.write(name)
+            out_file.write(packed.compressed)
+            central_directory.append(_CENTRAL_HEADER.pack(
+                0x02014b50, _ZIP_VERSION, _ZIP_VERSION, flags, _DEFLATED, dos_time, dos_date,
+                packed.crc, len(packed.compressed), len(packed.blob), len(name), 0, 0, 0, 0, 0, offset
+            ) + name)
+            offset += _LOCAL_HEADER.size + len(name) + len(packed.compressed)
+        directory = b"".join(central_directory)
+        out_file.write(directory)
+        out_file.write(_END_RECORD.pack(0x06054b50, 0, 0, len(members), len(members), len(directory), offset, 0))
+    return len(members) - copied, copied
@@ -0,0 +1,156 @@
+import os
+import json
+import hashlib
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "extraction")
+DEFAULT_CACHE_MAX_MB = 256
+
+
+def hash_pdf_file(pdf_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Returns the SHA-256 hex digest of a PDF file's contents."""
+    digest = hashlib.sha256()
+    with open(pdf_path, 'rb') as in_file:
+        for chunk in iter(lambda: in_file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    On-disk cache of extracted PDF text and parsed records, keyed by the
+    SHA-256 of the PDF's contents.
+
+    Each entry is one JSON file holding the raw extracted text (tagged with the
+    extraction method that produced it) and the parsed dict (tagged with the
+    parser version). A parser version bump therefore re-parses from the cached
+    text instead of re-running pdfminer. Entries are evicted least recently
+    used first once the directory grows past `max_bytes`; a hit refreshes the
+    entry's modification time.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_CACHE_MAX_MB * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.text_hits = 0
+        self.text_misses = 0
+        self.record_hits = 0
+        self.record_misses = 0
+        self.evictions = 0
+
+    def _entry_path(self, pdf_hash: str) -> str:
+        return os.path.join(self.cache_dir, f"{pdf_hash}.json")
+
+    def _load_entry(self, pdf_hash: str) -> dict | None:
+        entry_path = self._entry_path(pdf_hash)
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"WARNING: Discarding unreadable extraction cache entry {entry_path}: {e}")
+            self._remove(entry_path)
+            return None
+        try:
+            os.utime(entry_path, None) # Mark as most recently used
+        except OSError:
+            pass
+        return entry if isinstance(entry, dict) else None
+
+    def get_text(self, pdf_hash: str, extraction: str) -> str | None:
+        """Returns the cached text for `pdf_hash` if it was produced by `extraction`, else None."""
+        entry = self._load_entry(pdf_hash)
+        if entry and entry.get('extraction') == extraction and isinstance(entry.get('text'), str):
+            self.text_hits += 1
+            return entry['text']
+        self.text_misses += 1
+        return None
+
+    def get_record(self, pdf_hash: str, extraction: str, parser_version) -> dict | None:
+        """Returns the cached parsed record if both the extraction and parser version match, else None."""
+        entry = self._load_entry(pdf_hash)
+        if (entry and entry.get('extraction') == extraction
+                and entry.get('parser_version') == parser_version
+                and isinstance(entry.get('record'), dict)):
+            self.record_hits += 1
+            return entry['record']
+        self.record_misses += 1
+        return None
+
+    def put(self, pdf_hash: str, extraction: str, text: str, parser_version=None, record: dict | None = None) -> bool:
+        """Stores text (and optionally a parsed record) for `pdf_hash`, then enforces the size bound."""
+        entry = {
+            'extraction': extraction,
+            'text': text,
+            'parser_version': parser_version,
+            'record': record,
+        }
+        entry_path = self._entry_path(pdf_hash)
+        temp_path = f"{entry_path}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(temp_path, entry_path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"WARNING: Could not write extraction cache entry {entry_path}: {e}")
+            self._remove(temp_path)
+            return False
+        self._evict()
+        return True
+
+    def _evict(self) -> None:
+        try:
+            entries = []
+            with os.scandir(self.cache_dir) as it:
+                for dir_entry in it:
+                    if dir_entry.is_file() and dir_entry.name.endswith(".json"):
+                        stat = dir_entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, dir_entry.path))
+        except OSError as e:
+            print(f"WARNING: Could not scan extraction cache {self.cache_dir}: {e}")
+            return
+        total_bytes = sum(size for _, size, _ in entries)
+        entries.sort() # Oldest (least recently used) first
+        for _, size, path in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            if self._remove(path):
+                total_bytes -= size
+                self.evictions += 1
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+    def stats(self) -> dict:
+        """Returns the hit/miss/eviction counters for this cache instance."""
+        return {
+            'text_hits': self.text_hits,
+            'text_misses': self.text_misses,
+            'record_hits': self.record_hits,
+            'record_misses': self.record_misses,
+            'evictions': self.evictions,
+        }
+
+
+def create_extraction_cache(config: dict) -> ExtractionCache | None:
+    """
+    Builds the extraction cache described by the application config.
+    Recognised keys: `extraction_cache_enabled` (default True),
+    `extraction_cache_dir` and `extraction_cache_max_mb`.
+    """
+    config = config or {}
+    if not config.get('extraction_cache_enabled', True):
+        return None
+    cache_dir = config.get('extraction_cache_dir') or DEFAULT_CACHE_DIR
+    try:
+        max_mb = float(config.get('extraction_cache_max_mb', DEFAULT_CACHE_MAX_MB))
+    except (ValueError, TypeError):
+        print(f"Warning: Error parsing extraction_cache_max_mb from config. Using default {DEFAULT_CACHE_MAX_MB}.")
+        max_mb = DEFAULT_CACHE_MAX_MB
+    return ExtractionCache(cache_dir, int(max_mb * 1024 * 1024))
@@ -0,0 +1,656 @@
+import re
+from dataclasses import dataclass, field
+from typing import Callable
+
+from core.metrics import METRICS
+from core.regex_guard import FieldBudgetGuard, FieldTimeout
+from core.section_locator import SectionLocator
+
+# Flags used by field patterns unless a spec entry says otherwise.
+DEFAULT_PATTERN_FLAGS = re.DOTALL | re.IGNORECASE
+# Longest a single field may take before it is abandoned (see ContractSpec.parse).
+DEFAULT_FIELD_TIME_BUDGET_SECONDS = 0.5
+# Most characters one field searches (see ContractSpec.field_input_limit). The
+# spec's patterns are linear, and the slowest takes about 0.2 s on this many
+# characters of adversarial text (see `benchmarks.py regex`), so the limit keeps
+# every field within its budget even where the budget can't be enforced.
+DEFAULT_FIELD_INPUT_LIMIT = 100_000
+# Row statuses of `ContractSpec.parse_many`.
+PARSE_OK = "ok"
+PARSE_PARTIAL = "partial" # At least one field ran past its time budget
+PARSE_FAILED = "failed"
+
+
+# --- Post-processors ---
+
+def clean_phone(phone_str):
+    """Keeps only the digits of a phone number."""
+    if phone_str:
+        return re.sub(r'\D', '', phone_str)
+    return None
+
+
+def clean_currency(currency_str):
+    """Strips '$' and thousands separators from an amount."""
+    if currency_str:
+        return currency_str.replace('$', '').replace(',', '').strip()
+    return None
+
+
+def normalize_state(state_str):
+    """Maps a state name or abbreviation to its two-letter code."""
+    if not state_str:
+        return None
+    state_str_upper = state_str.upper().strip()
+    state_str_upper = re.sub(r'\s*\f\s*', '', state_str_upper)
+    if "MISSISSIPPI" in state_str_upper or state_str_upper == "MS":
+        return "MS"
+    if "TENNESSEE" in state_str_upper or state_str_upper == "TN":
+        return "TN"
+    if "TEXAS" in state_str_upper or state_str_upper == "TX":
+        return "TX"
+    if len(state_str_upper) == 2:
+        return state_str_upper
+    return state_str.strip()[:2].upper()
+
+
+def remove_commas(value):
+    return value.replace(',', '').strip() if value else value
+
+
+def remove_spaces(value):
+    return value.replace(" ", "") if value else value
+
+
+def extract_capture(pattern: re.Pattern, text: str | None, group_index: int = 1):
+    """
+    Searches `text` with a compiled pattern and returns the stripped capture of
+    `group_index`. Fields search the normalized views, which no longer hold
+    DocuSign IDs, DigitalControl markers or runs of whitespace, so captures
+    need no further cleaning. Returns None when the text is empty, nothing
+    matches or the group did not participate.
+    """
+    if not text:
+        return None
+    match = pattern.search(text)
+    if not match or group_index > pattern.groups or match.group(group_index) is None:
+        return None
+    return match.group(group_index).strip()
+
+
+def iter_anchored_matches(pattern: re.Pattern, text: str | None, anchor: re.Pattern, window: int):
+    """
+    Yields the non-overlapping matches of `pattern` in `text`, left to right
+    like `finditer`, looking only at the `window` characters before each match
+    of `anchor` (a pattern for the distinctive tail every match ends with, such
+    as a state and ZIP code) up to that anchor's end.
+
+    A pattern made of several lazy runs can backtrack polynomially across a
+    long text that has none of its tail; bounding every attempt this way keeps
+    the cost linear in the length of the text. Matches that start more than
+    `window` characters before their tail are missed.
+    """
+    if not text:
+        return
+    position = 0
+    for anchor_match in anchor.finditer(text):
+        if anchor_match.end() <= position:
+            continue
+        match = pattern.search(text, max(position, anchor_match.start() - window), anchor_match.end())
+        if match:
+            yield match
+            position = match.end()
+
+
+
+_TOKEN_PATTERN = re.compile(r"\S+")
+
+
+def iter_tokens(text: str | None, start: int = 0, lookahead: int | None = None):
+    """
+    Yields the whitespace-separated tokens of `text` from offset `start` on,
+    as match objects (`group()` is the token, `start()` its offset in `text`),
+    scanning no further than `lookahead` characters past `start`. Tokens are
+    found one at a time as the caller asks for them, and the rest of the
+    document is never copied or split, so a field that needs only the first
+    few tokens after an anchor costs the same on a 3-page contract as on a
+    300-page one. A token running past the lookahead is cut off there.
+    """
+    if not text:
+        return
+    end = len(text) if lookahead is None else min(len(text), start + lookahead)
+    yield from _TOKEN_PATTERN.finditer(text, start, end)
+
+
+# --- Spec building blocks ---
+
+@dataclass(frozen=True)
+class Scope:
+    """
+    A named slice of the document that fields search instead of the whole text.
+    The slice is capture `group` of `pattern` searched in the `parent` text (a
+    view such as "clean", a section, or another scope). When the pattern does
+    not match the scope is `default`, or the whole parent text if
+    `inherit_parent` is set.
+    """
+    name: str
+    pattern: re.Pattern
+    parent: str = "clean"
+    group: int = 1
+    strip: bool = True
+    default: str | None = ""
+    inherit_parent: bool = False
+
+
+@dataclass(frozen=True)
+class ConstantField:
+    """A field with the same value for every contract of this type."""
+    name: str
+    value: object = None
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        return (self.name,)
+
+    def extract(self, context) -> dict:
+        return {self.name: self.value}
+
+
+def _pattern_recorder(counter_prefix: str):
+    """`record(index, matched)` counting "<counter_prefix>.<index>.tried" (and ".matched") in METRICS."""
+    def record(index, matched):
+        METRICS.increment(f"{counter_prefix}.{index}.tried")
+        if matched:
+            METRICS.increment(f"{counter_prefix}.{index}.matched")
+    return record
+
+
+@dataclass(frozen=True)
+class RegexField:
+    """
+    A field read from one capture group. `patterns` are tried in order: the
+    first is the primary pattern, the rest are fallbacks used while the
+    (post-processed) value is still empty. Captures are cleaned with
+    `extract_capture` unless `raw_capture` is set, in which case the group is
+    passed to `post` exactly as matched. `default` is used when nothing matches.
+    If the scope lies in a section and nothing is found there, the patterns are
+    retried on the whole view.
+
+    Every pattern tried is counted in METRICS as
+    "<metrics prefix>.pattern.<name>.<index>.tried" (and ".matched" when it
+    gave a value). `reorderable` marks patterns that are interchangeable
+    alternatives (e.g. spellings of one heading), where any match is as right
+    as any other; only those may be tried in the order given by
+    `ContractSpec.pattern_order` instead of as declared.
+    """
+    name: str
+    patterns: tuple[re.Pattern, ...]
+    scope: str = "clean"
+    group: int = 1
+    post: Callable | None = None
+    raw_capture: bool = False
+    default: object = None
+    reorderable: bool = False
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        return (self.name,)
+
+    @property
+    def alternatives(self) -> tuple[re.Pattern, ...]:
+        """The patterns counted in METRICS, by index."""
+        return self.patterns
+
+    def search(self, text, order=None, record=None):
+        """
+        Runs the patterns over `text` (no widening), in `order` (indices into
+        `patterns`, default as declared), and returns the value, or None.
+        `record(index, matched)` is called for every pattern tried.
+        """
+        value = None
+        for index in order or range(len(self.patterns)):
+            pattern = self.patterns[index]
+            if self.raw_capture:
+                match = pattern.search(text) if text else None
+                value = match.group(self.group) if match else None
+            else:
+                value = extract_capture(pattern, text, self.group)
+            if value is not None and self.post:
+                value = self.post(value)
+            if record:
+                record(index, bool(value))
+            if value:
+                break
+        return value
+
+    def extract(self, context) -> dict:
+        order = context.spec.pattern_order.get(self.name) if self.reorderable else None
+
+        record = _pattern_recorder(f"{context.spec.metrics_prefix}.pattern.{self.name}")
+        value = self.search(context.field_text(self.scope), order, record)
+        if not value and context.can_widen(self.scope):
+            value = self.search(context.field_text(self.scope, widen=True), order, record)
+        if value:
+            context.matched.add(self.name)
+        return {self.name: self.default if value is None else value}
+
+
+@dataclass(frozen=True)
+class ComputedFields:
+    """
+    Fields produced together by a function of one scope's text, for layouts a
+    single capture can't express (name lists, repeated contact blocks). The
+    function returns a dict; any of `names` it leaves out is None. Like
+    RegexField, an empty result from a section is retried on the whole view.
+    `patterns` lists the regexes the function uses, for tools that exercise
+    every pattern of a spec.
+
+    `fallbacks` are further functions of the same text, tried in turn while
+    the result is still empty (every name None). With fallbacks, `compute` and
+    each fallback are counted like RegexField patterns under the first name,
+    "<metrics prefix>.pattern.<names[0]>.<index>.tried", index 0 being
+    `compute`; `patterns[index]` must be the pattern that stage looks for, as
+    it identifies the stage in `PatternStatsStore`. The stages are never
+    reordered: they run from the most precise pattern to the loosest, and a
+    looser one also matches text a stricter one would have split up more
+    exactly, so trying it first would change the values.
+    """
+    names: tuple[str, ...]
+    compute: Callable[[str | None], dict]
+    scope: str = "clean"
+    patterns: tuple[re.Pattern, ...] = ()
+    fallbacks: tuple[Callable[[str | None], dict], ...] = ()
+    reorderable = False
+
+    @property
+    def name(self) -> str:
+        return self.names[0]
+
+    @property
+    def alternatives(self) -> tuple[re.Pattern, ...]:
+        """The pattern each stage (`compute`, then `fallbacks`) looks for, by index; none without fallbacks."""
+        return self.patterns[:1 + len(self.fallbacks)] if self.fallbacks else ()
+
+    def evaluate(self, text, record=None) -> dict:
+        """
+        Runs `compute` and then each of `fallbacks` over `text` (no widening)
+        until one finds a value, and returns its result. `record(index, matched)`
+        is called for every stage tried.
+        """
+        values = {}
+        for index, compute in enumerate((self.compute,) + self.fallbacks):
+            values = compute(text)
+            matched = any(values.get(name) is not None for name in self.names)
+            if record:
+                record(index, matched)
+            if matched:
+                break
+        return values
+
+    def extract(self, context) -> dict:
+        record = _pattern_recorder(f"{context.spec.metrics_prefix}.pattern.{self.name}") if self.fallbacks else None
+        values = self.evaluate(context.field_text(self.scope), record)
+        if not any(values.get(name) is not None for name in self.names) and context.can_widen(self.scope):
+            values = self.evaluate(context.field_text(self.scope, widen=True), record)
+        context.matched.update(name for name in self.names if values.get(name) not in (None, ''))
+        return {name: values.get(name) for name in self.names}
+
+
+@dataclass(frozen=True)
+class FieldGroup:
+    """Fields read from the same part of the form; timed together as "<metrics prefix>.<name>"."""
+    name: str
+    fields: tuple
+
+
+class ExtractionContext:
+    """
+    Per-document state: the text views from `prepare`, the section slices of
+    the spec's section view (located once, in a single pass) and lazily sliced
+    scopes. `widen=True` resolves a name as if every section were its whole
+    view, which is what the fields fall back to when their section comes up empty.
+    `matched` collects the names of the fields whose patterns found a value in
+    the text (rather than leaving them empty or at their default).
+    """
+
+    def __init__(self, spec, raw_text: str):
+        self.spec = spec
+        self.normalized = spec.prepare(raw_text)
+        self.views = {'raw': raw_text}
+        self.views.update(self.normalized.views())
+        self.sections = {}
+        self.located = {} # Section name -> (start, end) in the section view, for every section found
+        self._section_starts = {}
+        if spec.section_locator:
+            view_text = self.views[spec.section_view]
+            self.located = spec.section_locator.locate(view_text)
+            for name, (start, end) in self.located.items():
+                if start > 0 or end < len(view_text):
+                    self.sections[name] = view_text[start:end]
+                    self._section_starts[name] = start
+        self._resolved = {}
+        self.matched = set()
+
+    def raw_offset(self, name: str, index: int) -> int:
+        """Maps `index` in a view or located section back to an offset in the raw text."""
+        if name in self._section_starts:
+            name, index = self.spec.section_view, self._section_starts[name] + index
+        if name == 'raw':
+            return index
+        return self.normalized.raw_offset(name, index)
+
+    def raw_section_bounds(self) -> dict:
+        """Section name -> (start, end) offsets into the raw text for every located section."""
+        return {
+            name: (self.raw_offset(self.spec.section_view, start), self.raw_offset(self.spec.section_view, max(start, end - 1)) + 1)
+            for name, (start, end) in self.located.items()
+        }
+
+    def settled_sections(self) -> frozenset:
+        """
+        Sections more text after this document's could not change: those
+        located with text following them (their end heading, or the next
+        section, was read), and, once the spec's `closing_section` is settled,
+        every section not located at all, as the form has ended without them.
+        """
+        view_length = len(self.views[self.spec.section_view])
+        settled = {name for name, (_, end) in self.located.items() if end < view_length}
+        if self.spec.closing_section in settled:
+            settled.update(self.spec.section_names)
+        return frozenset(settled)
+
+    def can_widen(self, name: str) -> bool:
+        """True if `name` is (or is sliced from) a located section narrower than its view."""
+        while name in self.spec.scopes:
+            name = self.spec.scopes[name].parent
+        return name in self.sections
+
+    def field_text(self, name: str, widen: bool = False) -> str | None:
+        """`text(name, widen)` cut to the spec's `field_input_limit`, as fields search it."""
+        text = self.text(name, widen)
+        limit = self.spec.field_input_limit
+        if text and limit and len(text) > limit:
+            METRICS.increment(f"{self.spec.metrics_prefix}.field_inputs_truncated")
+            return text[:limit]
+        return text
+
+    def text(self, name: str, widen: bool = False) -> str | None:
+        if name in self.views:
+            return self.views[name]
+        if name in self.spec.section_names:
+            if not widen and name in self.sections:
+                return self.sections[name]
+            return self.views[self.spec.section_view] # Section not found, or widened
+        key = (name, widen)
+        if key in self._resolved:
+            return self._resolved[key]
+        scope = self.spec.scopes[name]
+        parent_text = self.text(scope.parent, widen)
+        match = scope.pattern.search(parent_text) if parent_text else None
+        if match:
+            value = match.group(scope.group)
+            if scope.strip:
+                value = value.strip()
+        elif scope.inherit_parent:
+            value = parent_text
+        else:
+            value = scope.default
+        self._resolved[key] = value
+        return value
+
+
+@dataclass
+class ParsedColumns:
+    """
+    Column-oriented results of `ContractSpec.parse_many`: `columns` maps every
+    field name, in output order, to one value per input text. `status` holds
+    PARSE_OK, PARSE_PARTIAL or PARSE_FAILED per row and `errors` the reason a
+    row failed (None otherwise); a failed row has only its constant fields set.
+    """
+    columns: dict
+    status: list
+    errors: list
+
+    def __len__(self) -> int:
+        return len(self.status)
+
+    @property
+    def field_names(self) -> list[str]:
+        return list(self.columns)
+
+    def row(self, index: int) -> dict:
+        """The fields of one row as `ContractSpec.parse` would return them."""
+        return {name: column[index] for name, column in self.columns.items()}
+
+
+@dataclass
+class ParseReport:
+    """
+    What `ContractSpec.parse_report` found in one document: the field values,
+    the names of the fields whose patterns matched (constants and fields left
+    empty or at their default are not) and section name -> (start, end) offsets
+    into the raw text of every section located.
+    """
+    data: dict
+    matched: frozenset
+    sections: dict
+
+
+@dataclass
+class ContractSpec:
+    """
+    Declarative description of how to read one contract type.
+
+    Attributes:
+        name: The contract type, e.g. "Legacy".
+        prepare: Function of the raw PDF text returning a `NormalizedText`,
+                 whose views fields and scopes search ("raw" is always available).
+        groups: FieldGroups in output order.
+        scopes: Scopes available to fields, by name.
+        sections: `Section`s of the form, located in `section_view` and usable
+                  as field or scope names; a section that isn't found is the whole view.
+        section_view: The view sections are located in.
+        metrics_prefix: Prefix of the per-group timings recorded in METRICS.
+        field_time_budget: Seconds one field may take (scope lookups included)
+                           before it is abandoned and left at its default; None
+                           for no limit. Only enforced where `FieldBudgetGuard` can be
+                           (not on Windows); `field_input_limit` bounds fields everywhere.
+        field_input_limit: Most characters of its scope a field searches; the
+                           rest is ignored (counted as "<metrics prefix>.field_inputs_truncated").
+                           None for no limit.
+        pattern_order: Field name -> order (indices) to try the patterns of a
+                       reorderable RegexField in, e.g. from
+                       `PatternStatsStore.pattern_order`; see `set_pattern_order`.
+        field_sections: Field name -> the section it is printed in, for fields
+                        whose scope is a whole view; other fields are in the
+                        section their scope is (sliced from), if any.
+        closing_section: The section that ends the form; once it has been read
+                         no section missing so far can still follow (see `pending_fields`).
+    """
+    name: str
+    prepare: Callable[[str], dict]
+    groups: tuple[FieldGroup, ...]
+    scopes: dict = field(default_factory=dict)
+    sections: tuple = ()
+    section_view: str = "clean"
+    metrics_prefix: str = "parse"
+    field_time_budget: float | None = DEFAULT_FIELD_TIME_BUDGET_SECONDS
+    field_input_limit: int | None = DEFAULT_FIELD_INPUT_LIMIT
+    pattern_order: dict = field(default_factory=dict)
+    field_sections: dict = field(default_factory=dict)
+    closing_section: str | None = None
+
+    def __post_init__(self):
+        self.section_names = frozenset(section.name for section in self.sections)
+        self.section_locator = SectionLocator(self.sections) if self.sections else None
+        self._heading_pattern = re.compile(
+            "|".join(f"(?:{heading})" for section in self.sections for heading in (section.start, section.end) if heading),
+            re.IGNORECASE
+        ) if self.sections else None
+        seen = set()
+        for name in self.field_names():
+            if name in seen:
+                raise ValueError(f"Field '{name}' is defined more than once in the {self.name} contract spec.")
+            seen.add(name)
+
+    def set_pattern_order(self, pattern_order: dict | None) -> None:
+        """
+        Replaces `pattern_order`, keeping only entries for reorderable
+        RegexFields that list each of the field's patterns exactly once.
+        """
+        fields = {
+            spec_field.name: spec_field
+            for group in self.groups for spec_field in group.fields if isinstance(spec_field, RegexField)
+        }
+        self.pattern_order = {
+            name: tuple(order) for name, order in (pattern_order or {}).items()
+            if name in fields and fields[name].reorderable
+            and sorted(order) == list(range(len(fields[name].patterns)))
+        }
+
+    def field_names(self) -> list[str]:
+        """Every field this spec produces, in output order."""
+        return [name for group in self.groups for spec_field in group.fields for name in spec_field.names]
+
+    def field_section(self, spec_field) -> str | None:
+        """The section `spec_field` is printed in (see `field_sections`), or None if it has none."""
+        for name in spec_field.names:
+            if name in self.field_sections:
+                return self.field_sections[name]
+        name = getattr(spec_field, 'scope', None)
+        while name in self.scopes:
+            name = self.scopes[name].parent
+        return name if name in self.section_names else None
+
+    def has_section_heading(self, raw_text: str) -> bool:
+        """True if `raw_text` holds the start or end heading of any section, as they are matched in the section view."""
+        if self._heading_pattern is None or not raw_text:
+            return False
+        view_text = self.prepare(raw_text).views().get(self.section_view, raw_text)
+        return self._heading_pattern.search(view_text) is not None
+
+    def pending_fields(self, raw_text: str) -> list[str]:
+        """
+        The fields whose values could still change if more text were appended
+        to `raw_text`, in output order: those whose section isn't settled (see
+        `ExtractionContext.settled_sections`), including every field printed
+        in no section. A field its settled section doesn't hold is absent from
+        the form; fields never wait for the retry on the whole view, which only
+        stands in for sections that weren't located. Constant fields are never pending.
+        """
+        settled = ExtractionContext(self, raw_text).settled_sections()
+        return [
+            name
+            for group in self.groups for spec_field in group.fields
+            if not isinstance(spec_field, ConstantField) and self.field_section(spec_field) not in settled
+            for name in spec_field.names
+        ]
+
+    def _extract_fields(self, context, guard, laps, skip_constants: bool = False, only=None) -> tuple[dict, bool]:
+        """
+        Runs the fields over one document's context; returns (values, whether
+        any field timed out). With `only`, fields producing none of those
+        names are skipped, and so are the laps of groups left with nothing to run.
+        """
+        data = {}
+        timed_out = False
+        for group in self.groups:
+            fields_run = 0
+            for spec_field in group.fields:
+                if skip_constants and isinstance(spec_field, ConstantField):
+                    continue
+                if only is not None and only.isdisjoint(spec_field.names):
+                    continue
+                fields_run += 1
+                try:
+                    with guard.field():
+                        values = spec_field.extract(context)
+                except FieldTimeout:
+                    values = {name: getattr(spec_field, 'default', None) for name in spec_field.names}
+                    timed_out = True
+                    METRICS.increment(f"{self.metrics_prefix}.field_timeouts")
+                    print(f"WARNING: {', '.join(spec_field.names)} took longer than "
+                          f"{self.field_time_budget * 1000:.0f} ms and was left empty.")
+                data.update(values)
+            if fields_run or only is None:
+                laps.lap(group.name)
+        return data, timed_out
+
+    def parse(self, raw_text: str, only=None) -> dict:
+        """
+        Runs every field of the spec over `raw_text` and returns field name -> value.
+        See `parse_report` for the arguments.
+        """
+        return self.parse_report(raw_text, only).data
+
+    def parse_report(self, raw_text: str, only=None) -> ParseReport:
+        """
+        Runs every field of the spec over `raw_text` and returns the values
+        together with which fields matched and where the sections are (see ParseReport).
+
+        `only` restricts parsing to the fields producing any of those names, for
+        callers that need a few values fast (e.g. the folder name); the result
+        then holds just the names of the fields that ran (a ComputedFields
+        returns all of its names) and the document is counted as
+        "<metrics prefix>.partial_documents" instead of ".documents". Unknown
+        names raise ValueError.
+
+        A field that runs past `field_time_budget` is abandoned: its names get
+        the field's default (None unless the field sets one), a warning is
+        printed and "<metrics prefix>.field_timeouts" is incremented, and the
+        remaining fields are parsed as usual.
+        """
+        if only is not None:
+            only = frozenset(only)
+            unknown = only.difference(self.field_names())
+            if unknown:
+                raise ValueError(f"Unknown {self.name} contract field(s): {', '.join(sorted(unknown))}")
+        laps = METRICS.stopwatch(self.metrics_prefix)
+        context = ExtractionContext(self, raw_text)
+        laps.lap("preprocess") # Includes locating the sections
+        with FieldBudgetGuard(self.field_time_budget) as guard:
+            data, _ = self._extract_fields(context, guard, laps, only=only)
+        METRICS.increment(f"{self.metrics_prefix}.documents" if only is None else f"{self.metrics_prefix}.partial_documents")
+        return ParseReport(data, frozenset(context.matched), context.raw_section_bounds())
+
+    def parse_many(self, texts) -> ParsedColumns:
+        """
+        Parses every text of `texts` like `parse` and returns the values as
+        columns (see ParsedColumns) instead of one dict per document.
+
+        The time budget guard is set up once for the whole batch, constant
+        fields are filled in once per column, and each value goes straight to
+        its column. A text that makes parsing raise is recorded as a
+        PARSE_FAILED row instead of stopping the batch; one where a field ran
+        out of time is PARSE_PARTIAL.
+        """
+        constants = {
+            spec_field.name: spec_field.value
+            for group in self.groups for spec_field in group.fields if isinstance(spec_field, ConstantField)
+        }
+        field_names = self.field_names()
+        extracted = {name: [] for name in field_names if name not in constants}
+        status, errors = [], []
+        with FieldBudgetGuard(self.field_time_budget) as guard:
+            for raw_text in texts:
+                laps = METRICS.stopwatch(self.metrics_prefix)
+                try:
+                    context = ExtractionContext(self, raw_text)
+                    laps.lap("preprocess")
+                    data, timed_out = self._extract_fields(context, guard, laps, skip_constants=True)
+                except Exception as e:
+                    print(f"ERROR: Could not parse row {len(status)} as a {self.name} contract: {e}")
+                    data = {}
+                    status.append(PARSE_FAILED)
+                    errors.append(str(e))
+                else:
+                    status.append(PARSE_PARTIAL if timed_out else PARSE_OK)
+                    errors.append(None)
+                for name, column in extracted.items():
+                    column.append(data.get(name))
+        METRICS.increment(f"{self.metrics_prefix}.documents", len(status))
+        columns = {
+            name: [constants[name]] * len(status) if name in constants else extracted[name]
+            for name in field_names
+        }
+        return ParsedColumns(columns, status, errors)
@@ -0,0 +1,128 @@
+import os
+import re
+import json
+from bisect import bisect_right
+from itertools import accumulate
+
+DEFAULT_FORM_LAYOUTS_PATH = os.path.join(".cache", "form_layouts.json")
+
+# The Legacy form prints its revision date in the page footer ("Revised 01/15/24"),
+# so the first page alone identifies which revision of the form we are reading.
+FORM_REVISION_PATTERN = re.compile(r"Revised\s+(\d{2})/(\d{2})/(\d{2})", re.IGNORECASE)
+
+def fingerprint_form(first_page_text: str) -> str | None:
+    """
+    Identifies the form revision from the text of a contract's first page.
+    Returns a key like "revised-01-15-24", or None if no revision stamp is found.
+    """
+    if not first_page_text:
+        return None
+    match = FORM_REVISION_PATTERN.search(first_page_text)
+    if not match:
+        return None
+    return "revised-{}-{}-{}".format(*match.groups())
+
+
+def locate_section_pages(page_texts, section_bounds: dict) -> dict:
+    """
+    Finds the pages each section falls on.
+
+    Args:
+        page_texts: The text of each page, in page order.
+        section_bounds: Section name -> (start, end) offsets into the
+                        concatenated page texts, e.g. `ParseReport.sections`.
+
+    Returns:
+        A dict of section name -> sorted list of zero-based page numbers.
+    """
+    page_ends = list(accumulate(len(page_text) for page_text in page_texts))
+    if not page_ends:
+        return {}
+    last_page = len(page_ends) - 1
+    section_pages = {}
+    for name, (start, end) in section_bounds.items():
+        start_page = min(bisect_right(page_ends, start), last_page)
+        end_page = min(bisect_right(page_ends, max(start, end - 1)), last_page)
+        section_pages[name] = list(range(start_page, end_page + 1))
+    return section_pages
+
+
+class FormLayoutStore:
+    """
+    Persisted, learned map from form fingerprint to the pages that hold each
+    section of that form, plus the fields whose patterns matched in a full extraction. Stored as
+    one JSON file; every `learn` re-reads the file before writing so separate
+    processes don't drop each other's layouts, and `get` re-reads it once it
+    has changed, so a layout learned in a worker process (which works on a
+    pickled copy of the store) is used by the parent and later workers.
+    """
+
+    def __init__(self, path: str = DEFAULT_FORM_LAYOUTS_PATH):
+        self.path = path
+        self._stamp = None # (mtime_ns, size) of the file when `layouts` was read
+        self.layouts = self._read()
+
+    def _file_stamp(self) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read(self) -> dict:
+        self._stamp = self._file_stamp()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                layouts = json.load(f)
+            return layouts if isinstance(layouts, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"WARNING: Ignoring unreadable form layout file {self.path}: {e}")
+            return {}
+
+    def get(self, fingerprint: str | None) -> dict | None:
+        """Returns the learned layout for `fingerprint` ({'pages', 'sections', 'fields'}), or None."""
+        if not fingerprint:
+            return None
+        if self._file_stamp() != self._stamp: # Learned by another process since
+            self.layouts = self._read()
+        return self.layouts.get(fingerprint)
+
+    def learn(self, fingerprint: str | None, page_texts, report) -> dict | None:
+        """
+        Records which pages hold each section for `fingerprint`, and which
+        fields matched, from the `ParseReport` of a full extraction of `page_texts`.
+        """
+        if not fingerprint:
+            return None
+        sections = locate_section_pages(page_texts, report.sections)
+        if not sections:
+            return None
+        pages = sorted({0}.union(*sections.values()))
+        layout = {'pages': pages, 'sections': sections, 'fields': sorted(report.matched)}
+        self.layouts = self._read()
+        self.layouts[fingerprint] = layout
+        temp_path = f"{self.path}.tmp"
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.layouts, f, indent=2, sort_keys=True)
+            os.replace(temp_path, self.path)
+            print(f"INFO: Learned page layout for form '{fingerprint}': pages {[p + 1 for p in pages]}")
+        except OSError as e:
+            print(f"WARNING: Could not save form layouts to {self.path}: {e}")
+        return layout
+
+
+def create_form_layout_store(config: dict) -> FormLayoutStore | None:
+    """
+    Builds the form layout store described by the application config.
+    Recognised keys: `targeted_extraction_enabled` (default True) and `form_layouts_path`.
+    """
+    config = config or {}
+    if not config.get('targeted_extraction_enabled', True):
+        return None
+    return FormLayoutStore(config.get('form_layouts_path') or DEFAULT_FORM_LAYOUTS_PATH)
@@ -0,0 +1,343 @@
+import re
+from datetime import datetime
+
+from core.field_spec import (
+    DEFAULT_PATTERN_FLAGS, ComputedFields, ConstantField, ContractSpec, FieldGroup, RegexField, Scope,
+    clean_currency, clean_phone, iter_anchored_matches, iter_tokens, normalize_state, remove_commas, remove_spaces,
+)
+from core.section_locator import Section
+from core.text_normalization import NormalizedText, normalize_text_views
+
+
+def prepare_legacy_text_views(original_text_from_pdf: str) -> NormalizedText:
+    """
+    Builds the text views the Legacy spec searches, in one pass: "sensitive"
+    (DocuSign and pipe artifacts removed, spacing kept, e.g. for buyer names)
+    and "clean" (additionally with runs of whitespace collapsed, used by most fields).
+    """
+    return normalize_text_views(original_text_from_pdf)
+
+
+# --- Fields that need more than one capture ---
+
+SETTDATE_ANCHOR = "Home is to close on or before"
+# The date block is filled in right after the anchor; tokens further away than
+# this are never read.
+SETTDATE_LOOKAHEAD = 2000
+_DATE_PATTERN = re.compile(r"\d{1,2}/\d{1,2}/\d{4}")
+
+
+def _parse_date_or_min(date_str):
+    try:
+        return datetime.strptime(date_str, "%m/%d/%Y")
+    except ValueError:
+        return datetime.min
+
+
+def extract_settlement_date(raw_text: str) -> dict:
+    """
+    SETTDATE: the closing date block after the anchor is one token of dates
+    joined by slashes; the first token with more than four "/" within
+    SETTDATE_LOOKAHEAD characters ends the block and the latest date in it wins.
+    """
+    idx = raw_text.find(SETTDATE_ANCHOR) if raw_text else -1
+    if idx == -1:
+        return {}
+    for token_match in iter_tokens(raw_text, idx + len(SETTDATE_ANCHOR), SETTDATE_LOOKAHEAD): # walk tokens after anchor
+        token = token_match.group()
+        if token.count('/') > 4:                             # first token with >4 "/" ends block
+            # keep only digits, slashes, and spaces
+            filtered = ''.join(
+                ch if (ch.isdigit() or ch == '/' or ch == ' ') else ' '
+                for ch in token
+            )
+            dates = _DATE_PATTERN.findall(filtered)
+            if dates:
+                return {'SETTDATE': max(dates, key=_parse_date_or_min)}   # latest date wins
+            return {}
+    return {}
+
+
+_TITLE_BLOCK_PATTERN = re.compile(r"wishes to take title as follows:\s*(.*?)(?=\s*Please List whether BUYER is:|\s*Single Person|\s*Married Person|\s*Investor|$)", re.IGNORECASE | re.DOTALL)
+# The word run ending in "Please" at the end of the names. `(?<!\w)` and the
+# `(?<!\s)` of the separator below start matches only where they can succeed,
+# so long words or whitespace runs aren't rescanned from every position (and
+# as "and" can't start with whitespace, giving back part of the run never helps).
+_TRAILING_PLEASE_PATTERN = re.compile(r"(?<!\w)\w*Please$", re.IGNORECASE)
+_AND_SEPARATOR_PATTERN = re.compile(r"(?<!\s)\s+and\s+", re.IGNORECASE)
+_WIDE_GAP_PATTERN = re.compile(r"\s{3,}")
+
+
+def extract_buyer_names(text_for_sensitive_parsing: str) -> dict:
+    """BYR1NAM1/BYR1NAM2/BYR1REL1 from the "take title as follows" block (needs original spacing)."""
+    byr1_name, byr2_name, byr1_rel = None, None, ''
+    title_block_match = _TITLE_BLOCK_PATTERN.search(text_for_sensitive_parsing) if text_for_sensitive_parsing is not None else None
+    if title_block_match:
+        raw_names_str = title_block_match.group(1).strip()
+        cleaned_names_str = raw_names_str
+        if cleaned_names_str.lower().endswith("please"):
+            match_please_end = _TRAILING_PLEASE_PATTERN.search(cleaned_names_str)
+            if match_please_end and "\n" not in cleaned_names_str[:match_please_end.start()]: # Names on one line only
+                word_before_please = match_please_end.group(0)[:-6]
+                cleaned_names_str = (cleaned_names_str[:match_please_end.start()] + word_before_please).strip()
+        if " and " in cleaned_names_str.lower():
+            parts = _AND_SEPARATOR_PATTERN.split(cleaned_names_str, maxsplit=1)
+            byr1_name = parts[0].strip()
+            if len(parts) > 1 and parts[1].strip():
+                byr2_name = parts[1].strip()
+                byr1_rel = 'and'
+        elif _WIDE_GAP_PATTERN.search(cleaned_names_str):
+            parts = _WIDE_GAP_PATTERN.split(cleaned_names_str, maxsplit=1)
+            byr1_name = parts[0].strip()
+            if len(parts) > 1 and parts[1].strip():
+                byr2_name = parts[1].strip()
+                byr1_rel = 'and'
+        else:
+            byr1_name = cleaned_names_str.strip()
+    return {'BYR1NAM1': byr1_name, 'BYR1NAM2': byr2_name, 'BYR1REL1': byr1_rel}
+
+
+_BUYER_CONTACTS_PATTERN = re.compile(r"(\d+[\w\s\.,#-]*?(?:Street|St|Road|Rd|Drive|Dr|Avenue|Ave|Lane|Ln|Cove|Cv|Court|Ct|Place|Pl|Boulevard|Blvd))\s+([A-Za-z\s'-]+?)\s+(MS|TN|TX|MISSISSIPPI|TENNESSEE|TEXAS)\s+(\d{5})\s*\(?(\d{3})\)?\s*(\d{3}-\d{4})\s+([\w\.@-]+)", re.IGNORECASE)
+_BUYER_CONTACTS_FALLBACK_PATTERN = re.compile(r"(\d+[\w\s\.,#-]*?\s\w+)\s+([A-Za-z\s'-]+?)\s+(MS|TN|TX|MISSISSIPPI|TENNESSEE|TEXAS)\s+(\d{5})\s*\(?(\d{3})\)?\s*(\d{3}-\d{4})\s+([\w\.@-]+)", re.IGNORECASE)
+# Every buyer's entry ends in state, ZIP, phone and email; the lazy address and
+# city runs before it are only tried on this many characters before that tail.
+_BUYER_CONTACT_TAIL_PATTERN = re.compile(r"(?:MS|TN|TX|MISSISSIPPI|TENNESSEE|TEXAS)\s+\d{5}\s*\(?\d{3}\)?\s*\d{3}-\d{4}\s+[\w\.@-]+", re.IGNORECASE)
+BUYER_CONTACT_WINDOW = 300
+
+
+def extract_buyer_contacts(contact_details_str: str | None) -> dict:
+    """Address, phone and email of the first buyer, plus phone and email of the second."""
+    return _buyer_contact_values(contact_details_str, _BUYER_CONTACTS_PATTERN)
+
+
+def extract_buyer_contacts_loose(contact_details_str: str | None) -> dict:
+    """`extract_buyer_contacts` for entries whose street doesn't end in a known suffix."""
+    return _buyer_contact_values(contact_details_str, _BUYER_CONTACTS_FALLBACK_PATTERN)
+
+
+def _buyer_contact_values(contact_details_str: str | None, pattern: re.Pattern) -> dict:
+    if contact_details_str is None:
+        return {}
+    buyer_contacts = [
+        match.groups() for match in
+        iter_anchored_matches(pattern, contact_details_str, _BUYER_CONTACT_TAIL_PATTERN, BUYER_CONTACT_WINDOW)
+    ]
+    values = {}
+    if len(buyer_contacts) > 0:
+        b1 = buyer_contacts[0]
+        values['BYR1ADR1'] = b1[0].strip()
+        values['BYR1ADR2'] = f"{b1[1].strip()}, {normalize_state(b1[2])} {b1[3].strip()}"
+        values['BYR1CELL1'] = clean_phone(f"{b1[4]}{b1[5]}")
+        values['BYR1EMAIL'] = b1[6].strip()
+    if len(buyer_contacts) > 1:
+        b2 = buyer_contacts[1]
+        values['BYR1CELL2'] = clean_phone(f"{b2[4]}{b2[5]}")
+        values['BYR1EMAIL2'] = b2[6].strip()
+    return values
+
+
+_PROPERTY_PATTERN = re.compile(r"Lot\s+([\w\d]+)(?:\s*Plan/Elevation\s+[\w\s\d.-]+?)?\s*Subdivision\s+([\w\s\d.-]+?Phase\s*\d+|[\w\s\d.-]+?Section\s*\w+\s*Phase\s*\d+|[\w\s\d.-]+?)\s*Address\s+([\d\w\s.-]+?(?:Lane|Drive|Road|Cove|Street|St|Ave|Dr))\s+([A-Za-z\s'-]+?)\s+(MISSISSIPPI|MS|TENNESSEE|TN)\s+(\d{5})", re.IGNORECASE | re.DOTALL)
+_PROPERTY_FALLBACK_PATTERN = re.compile(r"Lot\s+([\w\d]+).*?Subdivision\s+(.*?)\s*Address\s+([\d\w\s.-]+)\s+([A-Za-z\s'-]+?)\s+(MISSISSIPPI|MS|TENNESSEE|TN)\s+(\d{5})", re.IGNORECASE | re.DOTALL)
+# Both property patterns end in the state and ZIP; see BUYER_CONTACT_WINDOW.
+_PROPERTY_TAIL_PATTERN = re.compile(r"(?:MISSISSIPPI|MS|TENNESSEE|TN)\s+\d{5}", re.IGNORECASE)
+PROPERTY_WINDOW = 400
+
+
+def extract_property(globally_cleaned_text: str) -> dict:
+    """Lot, subdivision and street address of the property."""
+    prop_match = next(iter_anchored_matches(_PROPERTY_PATTERN, globally_cleaned_text, _PROPERTY_TAIL_PATTERN, PROPERTY_WINDOW), None)
+    if prop_match:
+        return {
+            'LORU': "Lot",
+            'LOTUNIT': prop_match.group(1).strip(),
+            'SUBDIVN': prop_match.group(2).strip(),
+            'PROPSTRE': prop_match.group(3).strip(),
+            'PROPCITY': prop_match.group(4).strip(),
+            'STATELET': normalize_state(prop_match.group(5)),
+            'PROPZIP': prop_match.group(6).strip(),
+        }
+    return {}
+
+
+def extract_property_loose(globally_cleaned_text: str) -> dict:
+    """`extract_property` for layouts the strict pattern can't split; the city is cut off the street afterwards."""
+    prop_match_fallback = next(iter_anchored_matches(_PROPERTY_FALLBACK_PATTERN, globally_cleaned_text, _PROPERTY_TAIL_PATTERN, PROPERTY_WINDOW), None)
+    if not prop_match_fallback:
+        return {}
+    full_addr = prop_match_fallback.group(3).strip()
+    city_prop = prop_match_fallback.group(4).strip()
+    if city_prop.lower() in full_addr.lower() and full_addr.lower() != city_prop.lower():
+        parts = full_addr.rsplit(city_prop, 1)
+        street = parts[0].strip() if len(parts) > 1 and parts[0].strip() else full_addr
+    else:
+        street = full_addr
+    return {
+        'LORU': "Lot",
+        'LOTUNIT': prop_match_fallback.group(1).strip(),
+        'SUBDIVN': prop_match_fallback.group(2).strip(),
+        'PROPSTRE': street,
+        'PROPCITY': city_prop,
+        'STATELET': normalize_state(prop_match_fallback.group(5)),
+        'PROPZIP': prop_match_fallback.group(6).strip(),
+    }
+
+
+_SELLING_ADDRESS_PATTERN = re.compile(r"Address:\s*([\w\s\.\d#-]+(?:Street|Parkway|Road|Rd)?(?:,\s*\#?\w+)?)\s*,\s*([A-Za-z\s'-]+?)\s*,\s*(MISSISSIPPI|MS|TENNESSEE|TN|TEXAS|TX)(?:,\s*(\d{5})(?:,\s*United States of America)?)?", re.IGNORECASE)
+_SELLING_ZIP_PATTERN = re.compile(r"(?:MISSISSIPPI|MS|TENNESSEE|TN|TEXAS|TX)(?:,\s*United States of America)?\s*(\d{5})", re.IGNORECASE)
+
+
+def extract_selling_agency_address(selling_agent_block_text: str) -> dict:
+    """AG702AD1 (street) and AG702AD2 ("City, ST zip") of the selling agency."""
+    if not selling_agent_block_text:
+        return {}
+    s_addr_match = _SELLING_ADDRESS_PATTERN.search(selling_agent_block_text)
+    if not s_addr_match:
+        return {}
+    city_s = s_addr_match.group(2).strip().replace(',', '')
+    state_s = normalize_state(s_addr_match.group(3))
+    zip_s = None
+    if s_addr_match.group(4):
+        zip_s = s_addr_match.group(4).strip()
+    else:
+        zip_s_alt_match = _SELLING_ZIP_PATTERN.search(selling_agent_block_text)
+        if zip_s_alt_match:
+            zip_s = zip_s_alt_match.group(1).strip()
+    return {
+        'AG702AD1': s_addr_match.group(1).strip(),
+        'AG702AD2': f"{city_s}, {state_s} {zip_s}" if zip_s else f"{city_s}, {state_s}",
+    }
+
+
+LISTING_AGENT_COMMISSION_PCT = 2.0
+
+
+def add_listing_agent_commission(buyer_agent_pct):
+    """COMPCT: the listing agent's fixed share plus the buyer's agent compensation."""
+    try:
+        return f"{LISTING_AGENT_COMMISSION_PCT + float(buyer_agent_pct)}%"
+    except ValueError:
+        return None
+
+
+# --- The spec ---
+
+# Headings of the form, in form order. Each field searches only its section;
+# a field that finds nothing there is retried on the whole text, so sections
+# only need to be right for well-formed contracts.
+LEGACY_SECTIONS = (
+    Section('parties', r"Parties\s*-", end=r"hereby agree"),
+    Section('property', r"Lot\s+\w"),
+    Section('price', r"Full Purchase Price"),
+    Section('deposit', r"Deposit held by"),
+    Section('closing_date', SETTDATE_ANCHOR),
+    Section('title', r"wishes to take title as follows"),
+    Section('compensation', r"buyer’s agent compensation of"),
+    Section('agency', r"AGENCY DISCLOSURE", end=r"\d{1,2}\.\s*ARBITRATION"),
+    Section('selling_agency', r"Selling Agency", end=r"\d{1,2}\.\s*ARBITRATION"),
+)
+
+LEGACY_SCOPES = {
+    scope.name: scope for scope in (
+        Scope('buyer_contacts', re.compile(r"hereafter called BUYER\(s\), whose address, phone numbers, and email address(?:es)? are listed below\s*(.*?)\s*hereby agree", re.DOTALL | re.IGNORECASE),
+              parent='parties', strip=False, default=None),
+        Scope('agency_disclosure', re.compile(r"AGENCY DISCLOSURE\s*-\s*\(check one\):(.*?)(?=13\.\s*ARBITRATION|14\.\s*ARBITRATION|SIGNING BELOW|BY SIGNING BELOW|Property Condition Disclosure|$)", re.DOTALL | re.IGNORECASE),
+              parent='agency', inherit_parent=True),
+        Scope('listing_agent', re.compile(r"Listing Agency\s*(.*?)(?=Selling Agency|$)", re.DOTALL | re.IGNORECASE),
+              parent='agency_disclosure'),
+        Scope('selling_agent', re.compile(r"Selling Agency\s*(.*?)(?=13\.\s*ARBITRATION|14\.\s*ARBITRATION|Revised\s+\d{2}/\d{2}/\d{2}|$)", re.DOTALL | re.IGNORECASE),
+              parent='agency_disclosure'),
+    )
+}
+
+LEGACY_FIELD_GROUPS = (
+    FieldGroup('parties', (
+        ConstantField('COUNTY', "DeSoto"),
+        ConstantField('SLR1ADR1', "5740 Getwell Road Building 8B"),
+        ConstantField('SLR1ADR2', "Southaven, MS 38672"),
+        ConstantField('AG701FRM', "Legacy Homes Realty, LLC"),
+        ConstantField('AG701LIC', "24125"),
+        ConstantField('AG701AD1', "5740 Getwell Rd Bldg 8B"),
+        ConstantField('AG701AD2', "Southaven, MS 38672"),
+        ConstantField('AG701PH', "6629322282"),
+        ConstantField('INCITY', 'X'),
+        ConstantField('INCOUNTY', 'X'),
+        ConstantField('DEPHELD', 'Seller'),
+        ConstantField('POSSION', 'Fee Simple'),
+        ConstantField('UNDNAME', 'Chicago Title Insurance Company'),
+        RegexField('SLR1NAM1', (re.compile(r"Parties\s*-\s*(LEGACY NEW HOMES, LLC.*?)\s*hereafter called SELLER", DEFAULT_PATTERN_FLAGS),), scope='parties'),
+        ConstantField('SLR1REL1', ''),
+        ConstantField('SLR1NAM2'),
+        ConstantField('SLR1CELL1'),
+        ConstantField('SLR1EMAIL'),
+        ConstantField('SLR1CELL2'),
+        ConstantField('SLR1EMAIL2'),
+        ConstantField('PARCELID'),
+        ConstantField('PLISTINGAGENT', '2%'),
+        ConstantField('MTDTTYPE', 'Deed of Trust'),
+    )),
+    FieldGroup('price_deposit', (
+        RegexField('SALEPRIC', (re.compile(r"Full Purchase Price\s*\$?([\d,]+\.\d{2})", DEFAULT_PATTERN_FLAGS),), scope='price', post=clean_currency),
+        RegexField('DEPOSIT', (
+            re.compile(r"Deposit held by\s*LEGACY NEW HOMES,LLC\s*\$?([\d,]+\.\d{2})", DEFAULT_PATTERN_FLAGS),
+            re.compile(r"DEPOSIT Held by Legacy New Homes, LLC\s*\$?([\d,]+\.\d{2})", DEFAULT_PATTERN_FLAGS),
+        ), scope='deposit', post=clean_currency, reorderable=True), # Two spellings of the same heading
+    )),
+    FieldGroup('closing_date', (
+        ComputedFields(('SETTDATE',), extract_settlement_date, scope='raw', patterns=(_DATE_PATTERN,)),
+    )),
+    FieldGroup('title', (
+        ComputedFields(('BYR1NAM1', 'BYR1NAM2', 'BYR1REL1'), extract_buyer_names, scope='sensitive',
+                       patterns=(_TITLE_BLOCK_PATTERN, _TRAILING_PLEASE_PATTERN, _AND_SEPARATOR_PATTERN, _WIDE_GAP_PATTERN)),
+    )),
+    FieldGroup('buyer_contacts', (
+        ComputedFields(('BYR1ADR1', 'BYR1ADR2', 'BYR1CELL1', 'BYR1EMAIL', 'BYR1CELL2', 'BYR1EMAIL2'), extract_buyer_contacts, scope='buyer_contacts',
+                       patterns=(_BUYER_CONTACTS_PATTERN, _BUYER_CONTACTS_FALLBACK_PATTERN, _BUYER_CONTACT_TAIL_PATTERN),
+                       fallbacks=(extract_buyer_contacts_loose,)),
+    )),
+    FieldGroup('property', (
+        ComputedFields(('LORU', 'LOTUNIT', 'SUBDIVN', 'PROPSTRE', 'PROPCITY', 'STATELET', 'PROPZIP'), extract_property, scope='property',
+                       patterns=(_PROPERTY_PATTERN, _PROPERTY_FALLBACK_PATTERN, _PROPERTY_TAIL_PATTERN),
+                       fallbacks=(extract_property_loose,)),
+    )),
+    FieldGroup('agency', (
+        RegexField('AG701NAM', (re.compile(r"Listing Agent\s+([\w\s,-]+?)(?=\s*Business Phone)", DEFAULT_PATTERN_FLAGS),), scope='listing_agent', post=remove_commas),
+        RegexField('AG701MO', (re.compile(r"Listing Agent\s+[\w\s,-]+?Business Phone\s*([()\d\s-]+?)(?=\s*Address|\s*Email)", re.IGNORECASE),),
+                   scope='listing_agent', post=clean_phone, raw_capture=True),
+        RegexField('AG701EMAIL', (re.compile(r"Email\s+([\w\.@-]+?)(?=\s+License #:\s*Agent|\s*$)", DEFAULT_PATTERN_FLAGS),), scope='listing_agent'),
+        # Ends at the ARBITRATION heading too: with no selling agency, a listing block
+        # not cut off by the disclosure heading would otherwise run on into the addenda
+        RegexField('AG701CONTLIC', (re.compile(r"License #:\s*Agent\s*(.*?)(?=Selling Agency|\d{1,2}\.\s*ARBITRATION|$)", DEFAULT_PATTERN_FLAGS),), scope='listing_agent'),
+        RegexField('AG702FRM', (re.compile(r"^([\w\s.,'&@#-]+?)(?<!\s)(?=\s*(?:Selling Agent|Business Phone))", DEFAULT_PATTERN_FLAGS),), scope='selling_agent'),
+        RegexField('AG702LIC', (re.compile(r"License #:\s*Firm\s*([S\d][\w-]+?)(?=\s*License #:\s*Agent|\s*Email:|$)", DEFAULT_PATTERN_FLAGS),), scope='selling_agent', post=remove_spaces),
+        ComputedFields(('AG702AD1', 'AG702AD2'), extract_selling_agency_address, scope='selling_agent',
+                       patterns=(_SELLING_ADDRESS_PATTERN, _SELLING_ZIP_PATTERN)),
+        RegexField('AG702PH', (re.compile(r"Business Phone\s*([()\d\s-]+?)(?=\s+Address:|\s+Selling Agent)", DEFAULT_PATTERN_FLAGS),), scope='selling_agent', post=clean_phone),
+        RegexField('AG702NAM', (re.compile(r"Selling Agent\s+([\w\s,-]+?)(?=\s*Business Phone|,Business Phone)", DEFAULT_PATTERN_FLAGS),), scope='selling_agent', post=remove_commas),
+        RegexField('AG702MO', (re.compile(r"Selling Agent\s+[\w\s,-]+?Business Phone\s*([()\d\s-]+?)(?=\s*Address|\s*Email)", re.IGNORECASE),),
+                   scope='selling_agent', post=clean_phone, raw_capture=True),
+        RegexField('AG702EMAIL', (re.compile(r"Email:\s*([\w\.@-]+)", DEFAULT_PATTERN_FLAGS),), scope='selling_agent'),
+        RegexField('AG702CONTLIC', (
+            # Anything found after a later "Selling Agency" is also found after the first, so
+            # the first is the only one tried instead of rescanning from each: a lookahead
+            # never backtracks once matched, and the backreference (group 1) consumes it.
+            re.compile(r"\A(?=(.*?Selling Agency))\1.*?License #:\s*Firm\s*(?:[S]-)?\d[\w-]*\s*License #:\s*Agent\s*(.{1,20}?)(?=\s*\d{1,2}\.\s*ARBITRATION)", DEFAULT_PATTERN_FLAGS),
+            re.compile(r"\A(?=(.*?Selling Agency))\1.*?License #:\s*Agent\s*(.{1,20}?)(?=\s*\d{1,2}\.\s*ARBITRATION)", DEFAULT_PATTERN_FLAGS),
+        ), scope='selling_agency', group=2),
+    )),
+    FieldGroup('compensation', (
+        RegexField('COMPCT', (re.compile(r"buyer’s agent compensation of\s+(\d+)%", re.IGNORECASE),), scope='compensation',
+                   post=add_listing_agent_commission, default=f"{LISTING_AGENT_COMMISSION_PCT}%"),
+    )),
+)
+
+LEGACY_CONTRACT_SPEC = ContractSpec(
+    name="Legacy",
+    prepare=prepare_legacy_text_views,
+    groups=LEGACY_FIELD_GROUPS,
+    scopes=LEGACY_SCOPES,
+    sections=LEGACY_SECTIONS,
+    # The closing date and buyer names are read from whole views, but printed in these sections
+    field_sections={'SETTDATE': 'closing_date', 'BYR1NAM1': 'title', 'BYR1NAM2': 'title', 'BYR1REL1': 'title'},
+    # The form always closes the AGENCY DISCLOSURE block with a numbered ARBITRATION heading
+    closing_section='agency',
+)
@@ -0,0 +1,238 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+from core.utils import DEFAULT_ROOT_FOLDER
+
+# Upper bounds (in seconds) of the latency histogram buckets. Anything slower
+# than the last bound lands in a final overflow bucket.
+LATENCY_BUCKET_BOUNDS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+METRICS_EXPORT_FORMATS = ("json", "text")
+
+
+class Histogram:
+    """Latency histogram with fixed buckets, plus count, sum, min and max."""
+
+    def __init__(self, bounds=LATENCY_BUCKET_BOUNDS):
+        self.bounds = tuple(bounds)
+        self.bucket_counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, seconds: float) -> None:
+        index = 0
+        while index < len(self.bounds) and seconds > self.bounds[index]:
+            index += 1
+        self.bucket_counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def quantile(self, q: float) -> float | None:
+        """Estimates the q-th quantile (0-1) as the upper bound of the bucket it falls in, capped at max."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.bucket_counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                bound = self.bounds[index] if index < len(self.bounds) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'min': self.min,
+            'max': self.max,
+            'bounds': list(self.bounds),
+            'buckets': list(self.bucket_counts),
+        }
+
+    def merge_dict(self, snapshot: dict) -> None:
+        """Adds a histogram produced by `to_dict` (e.g. in another process) to this one."""
+        if tuple(snapshot.get('bounds', ())) != self.bounds:
+            raise ValueError("Cannot merge histograms with different bucket bounds.")
+        for index, bucket_count in enumerate(snapshot['buckets']):
+            self.bucket_counts[index] += bucket_count
+        self.count += snapshot['count']
+        self.total += snapshot['sum']
+        for key, pick in (('min', min), ('max', max)):
+            other = snapshot.get(key)
+            if other is not None:
+                current = getattr(self, key)
+                setattr(self, key, other if current is None else pick(current, other))
+
+
+class Stopwatch:
+    """
+    Records consecutive stages of one operation: each `lap(name)` observes the
+    time since the previous lap (or since creation) as `<prefix>.<name>`.
+    """
+
+    def __init__(self, registry, prefix: str):
+        self.registry = registry
+        self.prefix = prefix
+        self.last = time.perf_counter()
+
+    def lap(self, name: str) -> None:
+        now = time.perf_counter()
+        self.registry.observe(f"{self.prefix}.{name}", now - self.last)
+        self.last = now
+
+
+class MetricsRegistry:
+    """
+    Process-wide store of named counters and latency histograms. Names are
+    dotted by stage, e.g. "pdf.page_interpret", "parse.property" or
+    "label.render". Worker processes keep their own registry; their
+    `snapshot()` can be folded into the parent's with `merge()`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str):
+        """Context manager observing the time spent in its block as `name`, even if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def stopwatch(self, prefix: str) -> Stopwatch:
+        return Stopwatch(self, prefix)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+
+    def snapshot(self) -> dict:
+        """Returns a JSON-serialisable copy of every counter and histogram."""
+        with self._lock:
+            return {
+                'counters': dict(self.counters),
+                'histograms': {name: histogram.to_dict() for name, histogram in self.histograms.items()},
+            }
+
+    def merge(self, snapshot: dict | None) -> None:
+        """Adds the counters and histograms of another registry's `snapshot()` to this one."""
+        if not snapshot:
+            return
+        with self._lock:
+            for name, amount in snapshot.get('counters', {}).items():
+                self.counters[name] = self.counters.get(name, 0) + amount
+            for name, histogram_snapshot in snapshot.get('histograms', {}).items():
+                histogram = self.histograms.get(name)
+                if histogram is None:
+                    histogram = self.histograms[name] = Histogram(histogram_snapshot['bounds'])
+                histogram.merge_dict(histogram_snapshot)
+
+    def format_text(self) -> str:
+        """Formats the registry as a text table (times in milliseconds)."""
+        with self._lock:
+            lines = [f"{'Stage':<28} {'Count':>7} {'Total ms':>10} {'Mean ms':>9} {'p50 ms':>8} {'p95 ms':>8} {'Max ms':>8}"]
+            for name in sorted(self.histograms):
+                histogram = self.histograms[name]
+                mean = histogram.total / histogram.count if histogram.count else 0.0
+                lines.append(
+                    f"{name:<28} {histogram.count:>7} {histogram.total * 1000:>10.1f} {mean * 1000:>9.2f} "
+                    f"{(histogram.quantile(0.5) or 0) * 1000:>8.2f} {(histogram.quantile(0.95) or 0) * 1000:>8.2f} "
+                    f"{(histogram.max or 0) * 1000:>8.2f}"
+                )
+            if self.counters:
+                lines.append("")
+                lines.append(f"{'Counter':<28} {'Value':>7}")
+                for name in sorted(self.counters):
+                    lines.append(f"{name:<28} {self.counters[name]:>7}")
+            return "\n".join(lines)
+
+
+# The registry every pipeline stage reports to.
+METRICS = MetricsRegistry()
+
+
+def get_metrics_logs_dir(config: dict) -> str:
+    """
+    Returns the Logs directory created by `core.utils.create_standard_dirs`
+    under the `standard_dirs_root` config key (default DEFAULT_ROOT_FOLDER).
+    """
+    root_folder = (config or {}).get('standard_dirs_root') or DEFAULT_ROOT_FOLDER
+    return os.path.join(root_folder, "Logs")
+
+
+def export_metrics_snapshot(logs_dir: str, export_format: str = "json", registry: MetricsRegistry = METRICS, label: str | None = None) -> tuple[str | None, str | None]:
+    """
+    Writes a snapshot of `registry` to a timestamped file in `logs_dir`.
+
+    Args:
+        logs_dir: Directory to write into (created if missing).
+        export_format: "json" (machine readable) or "text" (the `format_text` table).
+        registry: The registry to export.
+        label: Optional description of the run (e.g. the PDFs processed), stored in the file.
+
+    Returns:
+        A tuple containing:
+            - path (str | None): The file written, or None on failure.
+            - error_message (str | None): Why the export failed, otherwise None.
+    """
+    if export_format not in METRICS_EXPORT_FORMATS:
+        return None, f"Unknown metrics export format '{export_format}'. Expected one of: {', '.join(METRICS_EXPORT_FORMATS)}"
+    created_at = datetime.now()
+    extension = "json" if export_format == "json" else "txt"
+    path = os.path.join(logs_dir, f"metrics-{created_at:%Y%m%d-%H%M%S-%f}.{extension}")
+    try:
+        os.makedirs(logs_dir, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            if export_format == "json":
+                snapshot = registry.snapshot()
+                snapshot['created_at'] = created_at.isoformat(timespec='seconds')
+                snapshot['label'] = label
+                json.dump(snapshot, f, indent=2, sort_keys=True)
+            else:
+                f.write(f"Metrics snapshot {created_at.isoformat(timespec='seconds')}\n")
+                if label:
+                    f.write(f"{label}\n")
+                f.write("\n" + registry.format_text() + "\n")
+    except OSError as e:
+        return None, f"Could not write metrics snapshot to {path}: {e}"
+    print(f"INFO: Metrics snapshot written to {path}")
+    return path, None
+
+
+def export_metrics_for_config(config: dict, registry: MetricsRegistry = METRICS, label: str | None = None) -> tuple[str | None, str | None]:
+    """
+    Exports `registry` as configured: `metrics_export_format` ("json", "text"
+    or "none"; default "json") into the Logs dir from `get_metrics_logs_dir`.
+    Returns (None, None) when exporting is turned off.
+    """
+    export_format = str((config or {}).get('metrics_export_format', "json")).lower()
+    if export_format == "none":
+        return None, None
+    return export_metrics_snapshot(get_metrics_logs_dir(config), export_format, registry, label)
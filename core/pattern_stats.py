@@ -0,0 +1,144 @@
+"""
+Persisted per-pattern match statistics of the contract specs.
+
+Run from the project root to see which patterns match and which never do:
+    python -m core.pattern_stats [path]
+"""
+import os
+import re
+import sys
+import json
+
+from core.field_spec import ComputedFields, RegexField
+
+DEFAULT_PATTERN_STATS_PATH = os.path.join(".cache", "pattern_stats.json")
+# Matches a reorderable field needs to have seen before its patterns are reordered.
+MIN_MATCHES_TO_REORDER = 10
+
+# Counters recorded by `RegexField.extract` and `ComputedFields.extract` as
+# "<metrics prefix>.pattern.<field>.<index>.<tried|matched>".
+_PATTERN_COUNTER_PATTERN = re.compile(r"\.pattern\.(?P<field>[^.]+)\.(?P<index>\d+)\.(?P<kind>tried|matched)$")
+
+
+def _counted_fields(spec) -> dict:
+    """Field name -> every RegexField and ComputedFields (by first name) of `spec` that counts its patterns."""
+    return {
+        spec_field.name: spec_field
+        for group in spec.groups for spec_field in group.fields
+        if isinstance(spec_field, (RegexField, ComputedFields)) and spec_field.alternatives
+    }
+
+
+class PatternStatsStore:
+    """
+    How often each pattern of each RegexField (and each stage of a
+    ComputedFields with fallbacks, under its first name) was tried and
+    matched, per spec, accumulated across runs in one JSON file. Patterns are keyed by their
+    source, so editing or reordering a field's patterns never credits one
+    pattern with another's history. Like `FormLayoutStore`, the file is
+    re-read before every write so separate processes don't drop each other's counts.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATTERN_STATS_PATH):
+        self.path = path
+        self.stats = self._read()
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                stats = json.load(f)
+            return stats if isinstance(stats, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"WARNING: Ignoring unreadable pattern statistics file {self.path}: {e}")
+            return {}
+
+    def record_metrics(self, spec, snapshot: dict) -> None:
+        """Adds the pattern counters of a METRICS `snapshot()` for `spec` to the store and saves it."""
+        fields = _counted_fields(spec)
+        prefix = f"{spec.metrics_prefix}.pattern."
+        counts = {}
+        for name, amount in (snapshot or {}).get('counters', {}).items():
+            if not name.startswith(prefix):
+                continue
+            match = _PATTERN_COUNTER_PATTERN.search(name, len(spec.metrics_prefix))
+            spec_field = fields.get(match.group('field')) if match else None
+            index = int(match.group('index')) if match else -1
+            if spec_field is None or index >= len(spec_field.alternatives):
+                continue
+            source = spec_field.alternatives[index].pattern
+            entry = counts.setdefault(spec_field.name, {}).setdefault(source, {'tried': 0, 'matched': 0})
+            entry[match.group('kind')] += amount
+        if not counts:
+            return
+        self.stats = self._read()
+        spec_stats = self.stats.setdefault(spec.name, {})
+        for field_name, sources in counts.items():
+            field_stats = spec_stats.setdefault(field_name, {})
+            for source, entry in sources.items():
+                stored = field_stats.setdefault(source, {'tried': 0, 'matched': 0})
+                stored['tried'] += entry['tried']
+                stored['matched'] += entry['matched']
+        temp_path = f"{self.path}.tmp"
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.stats, f, indent=2, sort_keys=True)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"WARNING: Could not save pattern statistics to {self.path}: {e}")
+
+    def field_stats(self, spec, field_name: str) -> list[dict]:
+        """{'pattern', 'tried', 'matched'} for each current pattern of `field_name`, in declared order."""
+        spec_field = _counted_fields(spec)[field_name]
+        stored = self.stats.get(spec.name, {}).get(field_name, {})
+        return [
+            {'pattern': pattern.pattern, **stored.get(pattern.pattern, {'tried': 0, 'matched': 0})}
+            for pattern in spec_field.alternatives
+        ]
+
+    def pattern_order(self, spec) -> dict:
+        """
+        Field name -> pattern indices, most matches first, for every
+        reorderable field of `spec` with at least MIN_MATCHES_TO_REORDER
+        recorded matches (ties keep the declared order). Suitable for
+        `ContractSpec.pattern_order`.
+        """
+        order = {}
+        for field_name, spec_field in _counted_fields(spec).items():
+            if not spec_field.reorderable or len(spec_field.alternatives) < 2:
+                continue
+            matches = [entry['matched'] for entry in self.field_stats(spec, field_name)]
+            if sum(matches) >= MIN_MATCHES_TO_REORDER:
+                order[field_name] = tuple(sorted(range(len(matches)), key=lambda index: -matches[index]))
+        return order
+
+    def format_text(self, spec) -> str:
+        """Formats the statistics of `spec` as a text table; patterns tried but never matched are flagged."""
+        lines = [f"{'Field':<14} {'#':>2} {'Tried':>8} {'Matched':>8} {'Rate':>6}  Pattern"]
+        for field_name in _counted_fields(spec):
+            for index, entry in enumerate(self.field_stats(spec, field_name)):
+                rate = f"{entry['matched'] / entry['tried']:.0%}" if entry['tried'] else "-"
+                flag = "  NEVER MATCHED" if entry['tried'] and not entry['matched'] else ""
+                lines.append(f"{field_name:<14} {index:>2} {entry['tried']:>8} {entry['matched']:>8} {rate:>6}  "
+                             f"{entry['pattern'][:60]}{flag}")
+        return "\n".join(lines)
+
+
+def create_pattern_stats_store(config: dict) -> PatternStatsStore | None:
+    """
+    Builds the pattern statistics store described by the application config.
+    Recognised keys: `adaptive_pattern_order_enabled` (default True) and `pattern_stats_path`.
+    """
+    config = config or {}
+    if not config.get('adaptive_pattern_order_enabled', True):
+        return None
+    return PatternStatsStore(config.get('pattern_stats_path') or DEFAULT_PATTERN_STATS_PATH)
+
+
+if __name__ == "__main__":
+    from core.legacy_contract_spec import LEGACY_CONTRACT_SPEC
+    print(PatternStatsStore(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATTERN_STATS_PATH).format_text(LEGACY_CONTRACT_SPEC))
@@ -0,0 +1,70 @@
+"""
+One read of a PDF shared by every stage that needs its contents.
+
+Wherever the core API takes a PDF path it also takes a `PdfBuffer`: the
+content hash (extraction cache key), pdfminer and the copy into the client
+folder then all work from the bytes read once, instead of going back to the
+file (on a network intake share, once per stage).
+"""
+import io
+import hashlib
+
+from core.metrics import METRICS
+from core.extraction_cache import hash_pdf_file
+
+
+class PdfBuffer:
+    """
+    The contents of the PDF at `path`. `data` may be any bytes-like object,
+    including an `mmap` (sent to worker processes as `bytes`). Formats as its
+    path, so log messages read as before.
+
+    Usage:
+        pdf = PdfBuffer.read("contract.pdf")
+        get_initial_legacy_folder_name_and_data(pdf, cache)
+        copy_pdf_to_folder(pdf, folder, "contract.pdf")
+    """
+
+    def __init__(self, path: str, data):
+        self.path = path
+        self.data = data
+        self._sha256 = None
+
+    @classmethod
+    def read(cls, path: str) -> "PdfBuffer":
+        """Reads the whole file at `path`. Raises OSError like `open`."""
+        with METRICS.timer("pdf.read"):
+            with open(path, 'rb') as in_file:
+                data = in_file.read()
+        METRICS.increment("pdf.bytes_read", len(data))
+        return cls(path, data)
+
+    @property
+    def sha256(self) -> str:
+        """SHA-256 hex digest of the contents, the same as `hash_pdf_file(path)`."""
+        if self._sha256 is None:
+            self._sha256 = hashlib.sha256(self.data).hexdigest()
+        return self._sha256
+
+    def open(self) -> io.BytesIO:
+        """A new binary stream over the contents (without copying `bytes` data)."""
+        return io.BytesIO(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __str__(self) -> str:
+        return str(self.path)
+
+    def __getstate__(self):
+        return {'path': self.path, 'data': bytes(self.data), '_sha256': self._sha256}
+
+
+def open_pdf(pdf):
+    """A binary stream over `pdf`, a path or a `PdfBuffer`, for use in a `with` block."""
+    return pdf.open() if isinstance(pdf, PdfBuffer) else open(pdf, 'rb')
+
+
+def pdf_content_hash(pdf) -> str:
+    """SHA-256 hex digest of `pdf`, a path or a `PdfBuffer`; reads the file only for a path."""
+    return pdf.sha256 if isinstance(pdf, PdfBuffer) else hash_pdf_file(pdf)
@@ -0,0 +1,153 @@
+"""
+Puts a contract's PDF into its client folder as cheaply as the file system allows.
+
+`place_file` tries the configured methods in order and returns the first that
+worked:
+- `reflink`: a copy-on-write clone (Linux FICLONE: Btrfs, XFS, bcachefs...). No data is copied.
+- `hardlink`: a second name for the same file on the same volume. No data is
+  copied, but the two names share their contents: a PDF edited in place in
+  the client folder changes the original too, so it is not tried by default.
+- `copy_file_range`, `sendfile`: the kernel copies the data, never passing it through Python.
+- `copy`: `shutil.copy2`.
+Methods the platform or volume doesn't support are skipped. Every method but
+`hardlink` also copies the permissions and timestamps, as `shutil.copy2` does.
+When the caller already holds the file's contents (a `PdfBuffer`), the first
+of the data copying methods (`copy_file_range`, `sendfile`, `copy`) writes
+them from memory instead, reported as `buffer`, so the source is not read again.
+"""
+import os
+import sys
+import errno
+import shutil
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+
+from core.metrics import METRICS
+
+PLACEMENT_METHODS = ("reflink", "hardlink", "copy_file_range", "sendfile", "copy")
+# Methods that read the source's data, which a caller holding it in memory skips
+_DATA_METHODS = ("copy_file_range", "sendfile", "copy")
+DEFAULT_PLACEMENT_METHODS = ("reflink", "copy_file_range", "sendfile", "copy")
+
+_FICLONE = 0x40049409 # _IOW(0x94, 9, int) from linux/fs.h
+
+
+def _reflink(source_file, destination_file) -> None:
+    if fcntl is None or not sys.platform.startswith("linux"):
+        raise OSError(errno.EOPNOTSUPP, "reflinks are not supported on this platform")
+    fcntl.ioctl(destination_file.fileno(), _FICLONE, source_file.fileno())
+
+
+def _copy_file_range(source_file, destination_file) -> None:
+    if not hasattr(os, "copy_file_range"):
+        raise OSError(errno.EOPNOTSUPP, "copy_file_range is not supported on this platform")
+    remaining = os.fstat(source_file.fileno()).st_size
+    while remaining > 0:
+        copied = os.copy_file_range(source_file.fileno(), destination_file.fileno(), remaining)
+        if copied == 0:
+            break
+        remaining -= copied
+
+
+def _sendfile(source_file, destination_file) -> None:
+    if not hasattr(os, "sendfile") or not sys.platform.startswith("linux"): # Elsewhere it only writes to sockets
+        raise OSError(errno.EOPNOTSUPP, "sendfile between files is not supported on this platform")
+    size = os.fstat(source_file.fileno()).st_size
+    offset = 0
+    while offset < size:
+        sent = os.sendfile(destination_file.fileno(), source_file.fileno(), offset, size - offset)
+        if sent == 0:
+            break
+        offset += sent
+
+
+_DATA_COPIERS = {
+    "reflink": _reflink,
+    "copy_file_range": _copy_file_range,
+    "sendfile": _sendfile,
+}
+
+
+def _place_with(method: str, source_path: str, temp_path: str, data=None) -> None:
+    """Creates `temp_path` as a copy of (or, for `hardlink`, a link to) `source_path` with `method`."""
+    if method == "hardlink":
+        os.link(source_path, temp_path)
+    elif method == "buffer":
+        with open(temp_path, 'wb') as destination_file:
+            destination_file.write(data)
+        shutil.copystat(source_path, temp_path)
+    elif method == "copy":
+        shutil.copy2(source_path, temp_path)
+    else:
+        with open(source_path, 'rb') as source_file, open(temp_path, 'wb') as destination_file:
+            _DATA_COPIERS[method](source_file, destination_file)
+        shutil.copystat(source_path, temp_path)
+
+
+def place_file(source_path: str, destination_path: str, methods=DEFAULT_PLACEMENT_METHODS, data=None) -> str:
+    """
+    Puts a copy of `source_path` at `destination_path`, replacing any file
+    there, with the first of `methods` (see PLACEMENT_METHODS) that works.
+    The file is made under a temporary name and renamed into place, so an
+    existing destination is never truncated: it may be a hardlink to the source.
+    `data`, the source's contents if the caller has them, replaces the data
+    copying methods with one `buffer` write.
+
+    Returns:
+        The method used.
+
+    Raises:
+        shutil.SameFileError: If both paths name the same directory entry.
+        OSError: The last method's error if none of them worked.
+    """
+    if os.path.normcase(os.path.realpath(source_path)) == os.path.normcase(os.path.realpath(destination_path)):
+        raise shutil.SameFileError(f"{source_path!r} and {destination_path!r} are the same file")
+    temp_path = f"{destination_path}.tmp"
+    last_error = OSError(errno.EINVAL, "no placement method configured")
+    if data is not None:
+        methods = [method for method in methods if method not in _DATA_METHODS]
+        methods.append("buffer")
+    for method in methods:
+        try:
+            if os.path.lexists(temp_path):
+                os.remove(temp_path)
+            with METRICS.timer(f"pdf.place.{method}"):
+                _place_with(method, source_path, temp_path, data)
+                os.replace(temp_path, destination_path)
+            METRICS.increment(f"pdf.placed.{method}")
+            return method
+        except OSError as e:
+            last_error = e
+            METRICS.increment(f"pdf.place_failed.{method}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+    raise last_error
+
+
+def get_placement_methods(config: dict) -> tuple[str, ...]:
+    """
+    Reads `pdf_placement_methods` (a list, or a comma separated string, of
+    PLACEMENT_METHODS in the order to try them) from the config. Unknown names
+    are ignored; `copy` is always tried last if it isn't listed, so a PDF is always placed somehow.
+    Defaults to DEFAULT_PLACEMENT_METHODS.
+    """
+    configured = (config or {}).get('pdf_placement_methods')
+    if not configured:
+        return DEFAULT_PLACEMENT_METHODS
+    if isinstance(configured, str):
+        configured = configured.split(',')
+    methods = []
+    for method in configured:
+        method = str(method).strip()
+        if method not in PLACEMENT_METHODS:
+            print(f"Warning: Unknown pdf_placement_methods entry '{method}' in config. Ignoring it.")
+        elif method not in methods:
+            methods.append(method)
+    if "copy" not in methods:
+        methods.append("copy")
+    return tuple(methods)
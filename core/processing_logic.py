@@ -1,341 +1,362 @@
+import io
 import re
 import os
+import time
 import shutil # Import shutil
 import yaml # For saving config
-from io import StringIO
-from datetime import datetime
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pdfminer.converter import TextConverter
-from pdfminer.layout import LAParams
-from pdfminer.pdfdocument import PDFDocument
+from pdfminer.layout import LAParams, LTChar, LTContainer
 from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
 from pdfminer.pdfpage import PDFPage
-from pdfminer.pdfparser import PDFParser
-import docx # Added for python-docx interaction
-from docxtpl import DocxTemplate # Added for docxtpl
+from core.pdf_buffer import PdfBuffer, open_pdf, pdf_content_hash
+from core.form_layouts import fingerprint_form
+from core.metrics import METRICS
+from core.template_cache import TEMPLATE_CACHE
+from core.pdf_placement import DEFAULT_PLACEMENT_METHODS, get_placement_methods, place_file
+from core.setup_templates import CD_STATEMENT, PURCHASE_TRANSACTION, get_setup_docs_template
+from core.field_spec import ContractSpec, ParsedColumns
+from core.contract_types import ContractType, ContractTypeRegistry
+from core.derived_fields import ALL_EXTRACTED_FIELDS, DerivedField, FieldDependencyGraph, OutputDocument
+from core.legacy_contract_spec import LEGACY_CONTRACT_SPEC
 
 # CONFIG_FILE_PATH = "config.py" # Removed, config handled by AppController
 
-def extract_text_from_pdf(pdf_path):
+class ContentOrderTextConverter(TextConverter):
     """
-    Extracts text content from a PDF file.
-    The extracted text is returned as a single string.
+    Text converter for the "fast" extraction profile. pdfminer's layout analysis
+    (character grouping, line/box detection and box ordering) is skipped; the
+    characters are written in content-stream order, with a line break whenever
+    the baseline moves and a space wherever there is a visible horizontal gap.
+    """
+
+    def receive_layout(self, ltpage):
+        def iter_chars(item):
+            if isinstance(item, LTChar):
+                yield item
+            elif isinstance(item, LTContainer):
+                for child in item:
+                    yield from iter_chars(child)
+
+        pieces = []
+        previous = None
+        for char in iter_chars(ltpage):
+            if previous is not None:
+                if abs(char.y0 - previous.y0) > previous.height / 2:
+                    pieces.append("\n")
+                elif char.x0 - previous.x1 > previous.width / 4 and not pieces[-1].isspace():
+                    pieces.append(" ")
+            pieces.append(char.get_text())
+            previous = char
+        if pieces:
+            pieces.append("\n")
+        pieces.append("\f")
+        self.write_text("".join(pieces))
+
+
+class PageTextSink:
+    """
+    Output target for pdfminer's TextConverter that hands text out one page at a
+    time. Draining joins the page's pieces once and forgets them, so unlike
+    StringIO + getvalue() no second copy is made and nothing from earlier pages
+    is retained.
+    """
+    mode = "w" # Tells pdfminer this is a text (not binary) stream
+
+    def __init__(self):
+        self._pieces = []
+
+    def write(self, text: str) -> int:
+        self._pieces.append(text)
+        return len(text)
+
+    def drain(self) -> str:
+        """Returns everything written since the last drain and empties the sink."""
+        text = "".join(self._pieces)
+        self._pieces = []
+        return text
+
+
+# pdfminer layout settings for each extraction profile:
+# - "full": pdfminer's default layout analysis (the original behaviour).
+# - "fast": no layout analysis at all, see `ContentOrderTextConverter`.
+# - "tuned": keeps line and box grouping but skips the box-ordering pass
+#   (boxes_flow=None) and vertical-text detection, which Legacy forms don't need.
+EXTRACTION_PROFILES = {
+    "full": LAParams(),
+    "fast": None,
+    "tuned": LAParams(boxes_flow=None, detect_vertical=False, all_texts=False),
+}
+DEFAULT_EXTRACTION_PROFILE = "full"
+
+
+def get_extraction_profile(config: dict) -> str:
     """
-    output_string = StringIO()
-    with open(pdf_path, 'rb') as in_file:
-        parser = PDFParser(in_file)
-        doc = PDFDocument(parser)
+    Reads the extraction profile from the provided config dictionary.
+    Defaults to DEFAULT_EXTRACTION_PROFILE if missing or unknown.
+    """
+    profile = (config or {}).get('extraction_profile', DEFAULT_EXTRACTION_PROFILE)
+    if profile not in EXTRACTION_PROFILES:
+        print(f"Warning: Unknown extraction_profile '{profile}' in config. Using '{DEFAULT_EXTRACTION_PROFILE}'.")
+        return DEFAULT_EXTRACTION_PROFILE
+    return profile
+
+
+def iter_text_from_pdf_pages(pdf_path, profile: str = DEFAULT_EXTRACTION_PROFILE, pagenos=None, caching: bool = True):
+    """
+    Extracts text content from a PDF file one page at a time.
+    Each yielded string is the text pdfminer produced for that page (including
+    its trailing form feed), so joining every yielded page gives exactly the
+    output of `extract_text_from_pdf`. Pages are only interpreted when the
+    consumer asks for them; closing the generator early stops extraction.
+    `pdf_path` may also be a `PdfBuffer`, which is parsed from memory.
+    `profile` selects one of EXTRACTION_PROFILES. `pagenos` optionally restricts
+    extraction to a set of zero-based page numbers (yielded in page order).
+    With `caching` False pdfminer does not keep parsed PDF objects (content
+    streams, images) around after their page is done, which keeps memory flat
+    on very long documents at a small speed cost.
+    """
+    if profile not in EXTRACTION_PROFILES:
+        raise ValueError(f"Unknown extraction profile '{profile}'. Expected one of: {', '.join(EXTRACTION_PROFILES)}")
+    page_output = PageTextSink()
+    METRICS.increment("pdf.documents")
+    load_start = time.perf_counter()
+    with open_pdf(pdf_path) as in_file:
         rsrcmgr = PDFResourceManager()
-        laparams = LAParams()
-        device = TextConverter(rsrcmgr, output_string, laparams=laparams)
+        laparams = EXTRACTION_PROFILES[profile]
+        if laparams is None:
+            device = ContentOrderTextConverter(rsrcmgr, page_output)
+        else:
+            device = TextConverter(rsrcmgr, page_output, laparams=laparams)
         interpreter = PDFPageInterpreter(rsrcmgr, device)
         print(f"Processing PDF: {pdf_path}")
-        for i, page in enumerate(PDFPage.create_pages(doc)):
-            print(f"  Processing page {i + 1}...")
-            interpreter.process_page(page)
-        print("PDF processing complete.")
-    return output_string.getvalue()
+        pages_processed = 0
+        for page in PDFPage.get_pages(in_file, pagenos=pagenos, caching=caching):
+            # Opening the file and parsing up to the first page object counts as "open"
+            METRICS.observe("pdf.page_load" if pages_processed else "pdf.open", time.perf_counter() - load_start)
+            with METRICS.timer("pdf.page_interpret"):
+                interpreter.process_page(page)
+            METRICS.increment("pdf.pages")
+            pages_processed += 1
+            yield page_output.drain()
+            load_start = time.perf_counter()
+        print(f"PDF processing complete ({pages_processed} page(s)).")
+
+
+def extract_text_from_pdf(pdf_path, profile: str = DEFAULT_EXTRACTION_PROFILE):
+    """
+    Extracts text content from a PDF file.
+    The extracted text is returned as a single string.
+    """
+    return "".join(iter_text_from_pdf_pages(pdf_path, profile))
 
 
-# New function to check folder existence
-def check_folder_exists(target_folder_path: str) -> bool:
-    """Checks if a folder or file already exists at the given path."""
-    return os.path.exists(target_folder_path)
+def collect_legacy_contract_text(pages, spec: ContractSpec = LEGACY_CONTRACT_SPEC) -> str:
+    """
+    Consumes page texts (e.g. from `iter_text_from_pdf_pages`) as they arrive and
+    stops pulling pages as soon as no field of `spec` is pending (see
+    `ContractSpec.pending_fields`): every field's section has been read to its
+    end, or the form has closed without it. The pending fields are only
+    checked again after a page holding a section heading, the only pages that
+    can settle a section. Addenda and disclosure pages after that point are
+    never interpreted.
 
+    Args:
+        pages: An iterable of page texts, in document order.
+        spec: The contract spec whose fields are extracted from the text.
 
-def preprocess_text_initial(text):
-    """
-    Initial preprocessing: Removes DocuSign IDs, DigitalControls, pipe chars.
-    DOES NOT NORMALIZE MULTIPLE SPACES TO ONE.
+    Returns:
+        The concatenated text of the pages that were consumed.
     """
-    if text is None:
-        return None
-    text = re.sub(r"Docusign Envelope ID: [\w-]+\s*\f?", "", text, flags=re.IGNORECASE)
-    text = re.sub(r"\|[\w-]+DigitalControl_[\w_]+?\s*", " ", text)
-    text = re.sub(r"\s+\|\s+", " ", text)
-    text = re.sub(r"\|\s+", " ", text)
-    text = re.sub(r"\s+\|", " ", text)
-    return text.strip()
+    collected = []
+    pending = None
+    previous_tail = ""
+    pages_iter = iter(pages)
+    try:
+        for page_text in pages_iter:
+            collected.append(page_text)
+            # Keep a little of the previous page in case a heading straddles the page break
+            window = previous_tail + page_text
+            previous_tail = window[-64:]
+            if not spec.has_section_heading(window):
+                continue
+            pending = spec.pending_fields("".join(collected))
+            if not pending:
+                print(f"INFO: All {spec.name} contract fields settled after {len(collected)} page(s); skipping remaining pages.")
+                break
+        else:
+            if pending:
+                print(f"INFO: {spec.name} contract fields still unsettled at the last page: {', '.join(pending)}")
+        return "".join(collected)
+    finally:
+        close_pages = getattr(pages_iter, 'close', None)
+        if close_pages:
+            close_pages()
 
 
+def extract_legacy_contract_text(pdf_path, profile: str = DEFAULT_EXTRACTION_PROFILE) -> str:
+    """
+    Extracts only as much text from a Legacy contract PDF as
+    `parse_any_legacy_contract_text` needs, stopping once every field is
+    settled instead of interpreting trailing addenda. pdfminer's object
+    caching is off, so a packet whose fields never settle (e.g. hundreds of
+    pages of scanned exhibits) is read with memory growing only by its text.
+    """
+    return collect_legacy_contract_text(iter_text_from_pdf_pages(pdf_path, profile, caching=False))
+
 
-def normalize_multiple_spaces_in_text(text_segment):
-    """Utility to reduce multiple spaces to one for text segments."""
-    if text_segment is None:
-        return None
-    return re.sub(r"\s{2,}", " ", text_segment)
+def read_legacy_contract(pdf_path, profile: str = DEFAULT_EXTRACTION_PROFILE, layouts=None) -> tuple[str, dict]:
+    """
+    Extracts and parses a Legacy contract PDF.
 
+    With a `FormLayoutStore`, the form revision is fingerprinted from the first
+    page. If the store has learned where that revision's sections fall, only
+    those pages are passed to pdfminer (via `pagenos`). When a learned section
+    is not found in the targeted text, or a field whose pattern matched when
+    the layout was learned doesn't match there, the document is extracted in
+    full instead. Every full extraction (re)teaches the store.
 
+    Args:
+        pdf_path: The path to the Legacy contract PDF.
+        profile: The extraction profile (see EXTRACTION_PROFILES).
+        layouts: Optional `FormLayoutStore`.
 
-def preprocess_text_globally(text):
-    """
-    General preprocessing: Applies initial cleaning and then normalizes multiple spaces.
-    This is a global cleaner used before detailed parsing.
+    Returns:
+        A tuple of (raw_text, extracted_data).
     """
-    if text is None:
-        return None
-    text = preprocess_text_initial(text)
-    text = normalize_multiple_spaces_in_text(text)
-    return text
+    if layouts is None:
+        raw_text = extract_legacy_contract_text(pdf_path, profile)
+        return raw_text, parse_any_legacy_contract_text(raw_text)
+
+    first_page_iter = iter_text_from_pdf_pages(pdf_path, profile, pagenos={0})
+    try:
+        first_page_text = next(first_page_iter, "")
+    finally:
+        first_page_iter.close()
+    fingerprint = fingerprint_form(first_page_text)
+    layout = layouts.get(fingerprint)
+    if layout:
+        other_pages = {page for page in layout['pages'] if page != 0}
+        raw_text = first_page_text
+        if other_pages:
+            raw_text += "".join(iter_text_from_pdf_pages(pdf_path, profile, pagenos=other_pages))
+        report = LEGACY_CONTRACT_SPEC.parse_report(raw_text)
+        missing = [
+            name for name in layout['sections']
+            if name in LEGACY_CONTRACT_SPEC.section_names and name not in report.sections
+        ] + [name for name in layout['fields'] if name not in report.matched]
+        if not missing:
+            print(f"INFO: Targeted extraction of pages {[page + 1 for page in layout['pages']]} for form '{fingerprint}'.")
+            return raw_text, report.data
+        print(f"INFO: Targeted extraction for form '{fingerprint}' missed {', '.join(missing)}; falling back to full extraction.")
+
+    raw_text = extract_legacy_contract_text(pdf_path, profile)
+    report = LEGACY_CONTRACT_SPEC.parse_report(raw_text)
+    # pdfminer ends every page with a form feed, so this recovers the per-page text (offsets intact)
+    layouts.learn(fingerprint, re.findall(r"[^\f]*\f|[^\f]+$", raw_text), report)
+    return raw_text, report.data
+
+
+# New function to check folder existence
+def check_folder_exists(target_folder_path: str) -> bool:
+    """Checks if a folder or file already exists at the given path."""
+    return os.path.exists(target_folder_path)
+
+
+# Bump whenever `parse_any_legacy_contract_text` changes what it returns, so cached
+# records are re-parsed from their cached text instead of being reused.
+LEGACY_PARSER_VERSION = 3
+# Identifies how cached Legacy text was produced (see `extract_legacy_contract_text`).
+LEGACY_TEXT_EXTRACTION = "legacy-stream-2"
 
 
 def parse_any_legacy_contract_text(original_text_from_pdf: str) -> dict:
     """
     Parses the raw text extracted from a Legacy contract PDF to find specific data fields.
-    Uses a series of regular expressions and text processing techniques.
+    The fields, their precompiled patterns, fallbacks, search scopes and
+    post-processors are declared in `core.legacy_contract_spec.LEGACY_CONTRACT_SPEC`.
     The `original_text_from_pdf` should be the direct output from `extract_text_from_pdf`.
     """
-    data = {}
+    return LEGACY_CONTRACT_SPEC.parse(original_text_from_pdf)
 
-    # Preprocess text: initial cleaning for sensitive parsing (e.g., names before space normalization)
-    # and global cleaning for general field extraction.
-    text_for_sensitive_parsing = preprocess_text_initial(original_text_from_pdf)
-    globally_cleaned_text = normalize_multiple_spaces_in_text(text_for_sensitive_parsing)
+def parse_many_legacy_contract_texts(texts) -> ParsedColumns:
+    """
+    Batch counterpart of `parse_any_legacy_contract_text` for stored texts
+    (e.g. month-end reconciliation): returns one column per field of
+    `get_all_legacy_contract_field_names()`, in that order, plus a status and
+    error per text. `result.row(i)` gives the dict the single-text parser
+    would have returned.
+    """
+    return LEGACY_CONTRACT_SPEC.parse_many(texts)
+
+# Closings are filed under this root, each contract type in its own subfolder.
+CLOSINGS_ROOT = "C:/Closings"
+# Profile used to read the first page for classification: the markers are
+# plain phrases, so layout analysis would only add time.
+CLASSIFIER_EXTRACTION_PROFILE = "fast"
+
+CONTRACT_TYPES = ContractTypeRegistry((
+    ContractType(
+        "Legacy",
+        markers=(
+            re.compile(r"LEGACY\s+NEW\s+HOMES", re.IGNORECASE),
+            re.compile(r"hereafter\s+called\s+SELLER", re.IGNORECASE),
+            re.compile(r"hereafter\s+called\s+BUYER\(s\)", re.IGNORECASE),
+        ),
+        output_subdir="Legacy Seller",
+        parser=parse_any_legacy_contract_text,
+    ),
+    ContractType(
+        "MS Assoc. of Realtors",
+        markers=(
+            re.compile(r"MISSISSIPPI\s+ASSOCIATION\s+OF\s+REALTORS", re.IGNORECASE),
+            re.compile(r"CONTRACT\s+FOR\s+THE\s+SALE\s+AND\s+PURCHASE\s+OF\s+REAL\s+ESTATE", re.IGNORECASE),
+        ),
+    ),
+))
+
+
+def get_contract_output_dir(contract_type_name: str, root: str = CLOSINGS_ROOT) -> str:
+    """The default output directory for a contract type (the closings root for unknown types)."""
+    contract_type = CONTRACT_TYPES.get(contract_type_name)
+    if contract_type and contract_type.output_subdir:
+        return f"{root}/{contract_type.output_subdir}"
+    return root
+
+
+def classify_contract_pdf(pdf, registry: ContractTypeRegistry = CONTRACT_TYPES) -> tuple[ContractType | None, str | None]:
+    """
+    Reads only the first page of `pdf` (a path or a `PdfBuffer`) and returns
+    the contract type it most likely is (see `ContractTypeRegistry.classify`),
+    so the right parser and output directory are known before the full
+    extraction. Given a `PdfBuffer`, the same buffer can then go to the parser
+    without reading the file again.
 
-    def search_and_extract(pattern, text_to_search, group_index=1, default=None, flags=re.DOTALL | re.IGNORECASE):
-        if not text_to_search:
-            return default
-        match = re.search(pattern, text_to_search, flags)
-        if match:
-            try:
-                if group_index <= len(match.groups()) and match.group(group_index) is not None:
-                    captured_value = match.group(group_index).strip()
-                    captured_value = re.sub(r"Docusign Envelope ID:.*?\f", "", captured_value, flags=re.IGNORECASE | re.DOTALL).strip()
-                    captured_value = re.sub(r"\|[\w-]+DigitalControl_[\w_]+?\s*", " ", captured_value).strip()
-                    return re.sub(r"\s{2,}", " ", captured_value).strip()
-                else:
-                    return default
-            except IndexError:
-                return default
-        return default
-
-    def clean_phone(phone_str):
-        if phone_str:
-            return re.sub(r'\D', '', phone_str)
-        return None
-
-    def clean_currency(currency_str):
-        if currency_str:
-            return currency_str.replace('$', '').replace(',', '').strip()
-        return None
-
-    def normalize_state(state_str):
-        if not state_str:
-            return None
-        state_str_upper = state_str.upper().strip()
-        state_str_upper = re.sub(r'\s*\f\s*', '', state_str_upper)
-        if "MISSISSIPPI" in state_str_upper or state_str_upper == "MS":
-            return "MS"
-        if "TENNESSEE" in state_str_upper or state_str_upper == "TN":
-            return "TN"
-        if "TEXAS" in state_str_upper or state_str_upper == "TX":
-            return "TX"
-        if len(state_str_upper) == 2:
-            return state_str_upper
-        return state_str.strip()[:2].upper()
-
-    # --- Hardcoded Fields ---
-    data['COUNTY'] = "DeSoto"
-    data['SLR1ADR1'] = "5740 Getwell Road Building 8B"
-    data['SLR1ADR2'] = "Southaven, MS 38672"
-    data['AG701FRM'] = "Legacy Homes Realty, LLC"
-    data['AG701LIC'] = "24125"
-    data['AG701AD1'] = "5740 Getwell Rd Bldg 8B"
-    data['AG701AD2'] = "Southaven, MS 38672"
-    data['AG701PH'] = "6629322282"
-    # --- End Hardcoded Fields ---
-
-    data['INCITY'] = 'X'
-    data['INCOUNTY'] = 'X'
-    data['DEPHELD'] = 'Seller'
-    data['POSSION'] = 'Fee Simple'
-    data['UNDNAME'] = 'Chicago Title Insurance Company'
-    data['SLR1NAM1'] = search_and_extract(r"Parties\s*-\s*(LEGACY NEW HOMES, LLC.*?)\s*hereafter called SELLER", globally_cleaned_text)
-    data['SLR1REL1'], data['SLR1NAM2'] = '', None
-    data['SLR1CELL1'], data['SLR1EMAIL'], data['SLR1CELL2'], data['SLR1EMAIL2'] = None, None, None, None
-    data['PARCELID'] = None
-    data['PLISTINGAGENT'], data['MTDTTYPE'] = '2%', 'Deed of Trust'
-
-    data['SALEPRIC'] = clean_currency(search_and_extract(r"Full Purchase Price\s*\$?([\d,]+\.\d{2})", globally_cleaned_text))
-    data['DEPOSIT'] = clean_currency(search_and_extract(r"Deposit held by\s*LEGACY NEW HOMES,LLC\s*\$?([\d,]+\.\d{2})", globally_cleaned_text))
-    if not data['DEPOSIT']:
-        data['DEPOSIT'] = clean_currency(search_and_extract(r"DEPOSIT Held by Legacy New Homes, LLC\s*\$?([\d,]+\.\d{2})", globally_cleaned_text))
-
-    # --- START: SETTDATE Extraction Logic (Rewritten with user's reliable approach) ---
-    data['SETTDATE'] = None
-    anchor = "Home is to close on or before"
-    idx = original_text_from_pdf.find(anchor)
-    if idx != -1:
-        after = original_text_from_pdf[idx + len(anchor):]
-        for token in re.split(r"\s+", after):            # walk tokens after anchor
-            if token.count('/') > 4:                     # first token with >4 “/” ends block
-                # keep only digits, slashes, and spaces
-                filtered = ''.join(
-                    ch if (ch.isdigit() or ch == '/' or ch == ' ') else ' '
-                    for ch in token
-                )
-                # grab **all** date patterns in the filtered string
-                dates = re.findall(r"\d{1,2}/\d{1,2}/\d{4}", filtered)
-                if dates:
-                    def _p(d):
-                        try:
-                            return datetime.strptime(d, "%m/%d/%Y")
-                        except ValueError:
-                            return datetime.min
-                    data['SETTDATE'] = max(dates, key=_p)   # <-- latest date wins
-                break
-    # --- END: SETTDATE Extraction Logic ---
-
-    byr1_name, byr2_name, byr1_rel = None, None, ''
-    title_block_match = re.search(r"wishes to take title as follows:\s*(.*?)(?=\s*Please List whether BUYER is:|\s*Single Person|\s*Married Person|\s*Investor|$)", text_for_sensitive_parsing, re.IGNORECASE | re.DOTALL)
-    if title_block_match:
-        raw_names_str = title_block_match.group(1).strip()
-        cleaned_names_str = raw_names_str
-        if cleaned_names_str.lower().endswith("please"):
-            match_please_end = re.match(r"(.*?)(\w*Please)$", cleaned_names_str, re.IGNORECASE)
-            if match_please_end:
-                word_before_please = match_please_end.group(2)[:-6] if len(match_please_end.group(2)) >= 6 else ""
-                cleaned_names_str = (match_please_end.group(1) + word_before_please).strip()
-        if " and " in cleaned_names_str.lower():
-            parts = re.split(r"\s+and\s+", cleaned_names_str, maxsplit=1, flags=re.IGNORECASE)
-            byr1_name = parts[0].strip()
-            if len(parts) > 1 and parts[1].strip():
-                byr2_name = parts[1].strip()
-                byr1_rel = 'and'
-        elif re.search(r"\s{3,}", cleaned_names_str):
-            parts = re.split(r"\s{3,}", cleaned_names_str, maxsplit=1)
-            byr1_name = parts[0].strip()
-            if len(parts) > 1 and parts[1].strip():
-                byr2_name = parts[1].strip()
-                byr1_rel = 'and'
-        else:
-            byr1_name = cleaned_names_str.strip()
-    data['BYR1NAM1'], data['BYR1NAM2'], data['BYR1REL1'] = byr1_name, byr2_name, byr1_rel
-
-    buyer_contact_block_match = re.search(r"hereafter called BUYER\(s\), whose address, phone numbers, and email address(?:es)? are listed below\s*(.*?)\s*hereby agree", globally_cleaned_text, re.DOTALL | re.IGNORECASE)
-    if buyer_contact_block_match:
-        contact_details_str = buyer_contact_block_match.group(1)
-        buyer_contacts_pattern = r"(\d+[\w\s\.,#-]*?(?:Street|St|Road|Rd|Drive|Dr|Avenue|Ave|Lane|Ln|Cove|Cv|Court|Ct|Place|Pl|Boulevard|Blvd))\s+([A-Za-z\s'-]+?)\s+(MS|TN|TX|MISSISSIPPI|TENNESSEE|TEXAS)\s+(\d{5})\s*\(?(\d{3})\)?\s*(\d{3}-\d{4})\s+([\w\.@-]+)"
-        buyer_contacts_fallback_pattern = r"(\d+[\w\s\.,#-]*?\s\w+)\s+([A-Za-z\s'-]+?)\s+(MS|TN|TX|MISSISSIPPI|TENNESSEE|TEXAS)\s+(\d{5})\s*\(?(\d{3})\)?\s*(\d{3}-\d{4})\s+([\w\.@-]+)"
-        buyer_contacts = re.findall(buyer_contacts_pattern, contact_details_str, re.IGNORECASE)
-        if not buyer_contacts:
-            buyer_contacts = re.findall(buyer_contacts_fallback_pattern, contact_details_str, re.IGNORECASE)
-        if len(buyer_contacts) > 0:
-            b1 = buyer_contacts[0]
-            data['BYR1ADR1'] = b1[0].strip()
-            data['BYR1ADR2'] = f"{b1[1].strip()}, {normalize_state(b1[2])} {b1[3].strip()}"
-            data['BYR1CELL1'] = clean_phone(f"{b1[4]}{b1[5]}")
-            data['BYR1EMAIL'] = b1[6].strip()
-        if len(buyer_contacts) > 1:
-            b2 = buyer_contacts[1]
-            data['BYR1CELL2'] = clean_phone(f"{b2[4]}{b2[5]}")
-            data['BYR1EMAIL2'] = b2[6].strip()
-    for k_buyer_contact in ['BYR1ADR1', 'BYR1ADR2', 'BYR1CELL1', 'BYR1EMAIL', 'BYR1CELL2', 'BYR1EMAIL2']:
-        data.setdefault(k_buyer_contact, None)
-
-    prop_match = re.search(r"Lot\s+([\w\d]+)(?:\s*Plan/Elevation\s+[\w\s\d.-]+?)?\s*Subdivision\s+([\w\s\d.-]+?Phase\s*\d+|[\w\s\d.-]+?Section\s*\w+\s*Phase\s*\d+|[\w\s\d.-]+?)\s*Address\s+([\d\w\s.-]+?(?:Lane|Drive|Road|Cove|Street|St|Ave|Dr))\s+([A-Za-z\s'-]+?)\s+(MISSISSIPPI|MS|TENNESSEE|TN)\s+(\d{5})", globally_cleaned_text, re.IGNORECASE | re.DOTALL)
-    if prop_match:
-        data['LORU'], data['LOTUNIT'] = "Lot", prop_match.group(1).strip()
-        data['SUBDIVN'] = prop_match.group(2).strip()
-        data['PROPSTRE'] = prop_match.group(3).strip()
-        data['PROPCITY'] = prop_match.group(4).strip()
-        data['STATELET'] = normalize_state(prop_match.group(5))
-        data['PROPZIP'] = prop_match.group(6).strip()
-    else:
-        prop_match_fallback = re.search(r"Lot\s+([\w\d]+).*?Subdivision\s+(.*?)\s*Address\s+([\d\w\s.-]+)\s+([A-Za-z\s'-]+?)\s+(MISSISSIPPI|MS|TENNESSEE|TN)\s+(\d{5})", globally_cleaned_text, re.IGNORECASE | re.DOTALL)
-        if prop_match_fallback:
-            data['LORU'], data['LOTUNIT'] = "Lot", prop_match_fallback.group(1).strip()
-            data['SUBDIVN'] = prop_match_fallback.group(2).strip()
-            full_addr = prop_match_fallback.group(3).strip()
-            city_prop = prop_match_fallback.group(4).strip()
-            if city_prop.lower() in full_addr.lower() and full_addr.lower() != city_prop.lower():
-                parts = full_addr.rsplit(city_prop, 1)
-                data['PROPSTRE'] = parts[0].strip() if len(parts) > 1 and parts[0].strip() else full_addr
-            else:
-                data['PROPSTRE'] = full_addr
-            data['PROPCITY'] = city_prop
-            data['STATELET'] = normalize_state(prop_match_fallback.group(5))
-            data['PROPZIP'] = prop_match_fallback.group(6).strip()
-        else:
-            data['LORU'], data['LOTUNIT'], data['SUBDIVN'], data['PROPSTRE'], data['PROPCITY'], data['STATELET'], data['PROPZIP'] = (
-                None, None, None, None, None, None, None)
-
-    agent_section_overall_match = re.search(r"AGENCY DISCLOSURE\s*-\s*\(check one\):(.*?)(?=13\.\s*ARBITRATION|14\.\s*ARBITRATION|SIGNING BELOW|BY SIGNING BELOW|Property Condition Disclosure|$)", globally_cleaned_text, re.DOTALL | re.IGNORECASE)
-    agent_text_block_overall = agent_section_overall_match.group(1).strip() if agent_section_overall_match else globally_cleaned_text
-    listing_agent_block_match = re.search(r"Listing Agency\s*(.*?)(?=Selling Agency|$)", agent_text_block_overall, re.DOTALL | re.IGNORECASE)
-    listing_agent_block_text = listing_agent_block_match.group(1).strip() if listing_agent_block_match else ""
-    if listing_agent_block_text:
-        data['AG701NAM'] = search_and_extract(r"Listing Agent\s+([\w\s,-]+?)(?=\s*Business Phone)", listing_agent_block_text)
-        if data['AG701NAM']:
-            data['AG701NAM'] = data['AG701NAM'].replace(',', '').strip()
-        l_agent_phone_match = re.search(r"Listing Agent\s+[\w\s,-]+?Business Phone\s*([()\d\s-]+?)(?=\s*Address|\s*Email)", listing_agent_block_text, re.IGNORECASE)
-        data['AG701MO'] = clean_phone(l_agent_phone_match.group(1)) if l_agent_phone_match else None
-        data['AG701EMAIL'] = search_and_extract(r"Email\s+([\w\.@-]+?)(?=\s+License #:\s*Agent|\s*$)", listing_agent_block_text)
-        data['AG701CONTLIC'] = search_and_extract(r"License #:\s*Agent\s*(.*?)(?=Selling Agency|$)", listing_agent_block_text)
-    else:
-        for k in ['AG701NAM', 'AG701MO', 'AG701EMAIL', 'AG701CONTLIC']:
-            data.setdefault(k, None)
-
-    selling_agent_block_match = re.search(r"Selling Agency\s*(.*?)(?=13\.\s*ARBITRATION|14\.\s*ARBITRATION|Revised\s+\d{2}/\d{2}/\d{2}|$)", agent_text_block_overall, re.DOTALL | re.IGNORECASE)
-    selling_agent_block_text_for_details = selling_agent_block_match.group(1).strip() if selling_agent_block_match else ""
-    if selling_agent_block_text_for_details:
-        data['AG702FRM'] = search_and_extract(r"^([\w\s.,'&@#-]+?)(?=\s*Selling Agent|\s*Business Phone)", selling_agent_block_text_for_details)
-        data['AG702LIC'] = search_and_extract(r"License #:\s*Firm\s*([S\d][\w-]+?)(?=\s*License #:\s*Agent|\s*Email:|$)", selling_agent_block_text_for_details)
-        if data['AG702LIC']: data['AG702LIC'] = data['AG702LIC'].replace(" ", "")
-        s_addr_match = re.search(r"Address:\s*([\w\s\.\d#-]+(?:Street|Parkway|Road|Rd)?(?:,\s*\#?\w+)?)\s*,\s*([A-Za-z\s'-]+?)\s*,\s*(MISSISSIPPI|MS|TENNESSEE|TN|TEXAS|TX)(?:,\s*(\d{5})(?:,\s*United States of America)?)?", selling_agent_block_text_for_details, re.IGNORECASE)
-        zip_s = None
-        if s_addr_match:
-            data['AG702AD1'] = s_addr_match.group(1).strip(); city_s = s_addr_match.group(2).strip().replace(',', ''); state_s = normalize_state(s_addr_match.group(3))
-            if s_addr_match.group(4): zip_s = s_addr_match.group(4).strip()
-            else:
-                zip_s_alt_match = re.search(r"(?:MISSISSIPPI|MS|TENNESSEE|TN|TEXAS|TX)(?:,\s*United States of America)?\s*(\d{5})", selling_agent_block_text_for_details, re.IGNORECASE)
-                if zip_s_alt_match: zip_s = zip_s_alt_match.group(1).strip()
-            data['AG702AD2'] = f"{city_s}, {state_s} {zip_s}" if zip_s else f"{city_s}, {state_s}"
-        else: data['AG702AD1'], data['AG702AD2'] = None, None
-        data['AG702PH'] = clean_phone(search_and_extract(r"Business Phone\s*([()\d\s-]+?)(?=\s+Address:|\s+Selling Agent)", selling_agent_block_text_for_details))
-        data['AG702NAM'] = search_and_extract(r"Selling Agent\s+([\w\s,-]+?)(?=\s*Business Phone|,Business Phone)", selling_agent_block_text_for_details)
-        if data['AG702NAM']: data['AG702NAM'] = data['AG702NAM'].replace(',', '').strip()
-        sa_phone_match = re.search(r"Selling Agent\s+[\w\s,-]+?Business Phone\s*([()\d\s-]+?)(?=\s*Address|\s*Email)", selling_agent_block_text_for_details, re.IGNORECASE)
-        data['AG702MO'] = clean_phone(sa_phone_match.group(1)) if sa_phone_match else None
-        data['AG702EMAIL'] = search_and_extract(r"Email:\s*([\w\.@-]+)", selling_agent_block_text_for_details)
-    else:
-        for k in ['AG702FRM', 'AG702PH', 'AG702AD1', 'AG702AD2', 'AG702LIC', 'AG702NAM', 'AG702MO', 'AG702EMAIL']: data.setdefault(k, None)
-
-    ag702contlic_pattern_full_text = r"Selling Agency.*?License #:\s*Firm\s*(?:[S]-)?\d[\w-]*\s*License #:\s*Agent\s*(.{1,20}?)(?=\s*\d{1,2}\.\s*ARBITRATION)"
-    data['AG702CONTLIC'] = search_and_extract(ag702contlic_pattern_full_text, globally_cleaned_text)
-    if not data.get('AG702CONTLIC'):
-         data['AG702CONTLIC'] = search_and_extract(r"Selling Agency.*?License #:\s*Agent\s*(.{1,20}?)(?=\s*\d{1,2}\.\s*ARBITRATION)", globally_cleaned_text)
-    data.setdefault('AG702CONTLIC', None)
-
-    listing_agent_comm_pct = 2.0
-    buyer_agent_comm_match = re.search(r"buyer’s agent compensation of\s+(\d+)%", globally_cleaned_text, re.IGNORECASE)
-    if buyer_agent_comm_match:
-        try: data['COMPCT'] = f"{listing_agent_comm_pct + float(buyer_agent_comm_match.group(1))}%"
-        except ValueError: data['COMPCT'] = f"{listing_agent_comm_pct}%"
-    else: data['COMPCT'] = f"{listing_agent_comm_pct}%"
-    
-    return data
+    Returns:
+        A tuple of (contract type or None if unrecognised, error message or None).
+    """
+    try:
+        pages = iter_text_from_pdf_pages(pdf, CLASSIFIER_EXTRACTION_PROFILE, pagenos={0})
+        try:
+            first_page_text = next(pages, "")
+        finally:
+            pages.close()
+    except Exception as e:
+        print(f"ERROR: Could not read the first page of {pdf}: {e}")
+        return None, f"Could not read the first page of {pdf}: {e}"
+    contract_type = registry.classify(first_page_text)
+    print(f"INFO: Classified {pdf} as {contract_type.name if contract_type else 'unrecognised'}.")
+    return contract_type, None
 
 def get_all_legacy_contract_field_names() -> list[str]:
     """
     Returns a comprehensive list of all possible field names (keys) that
     the `parse_any_legacy_contract_text` function can extract and include
-    in its returned dictionary. This list is based on a review of the
-    keys assigned in that function.
-    """
-    # This list should be manually maintained and updated if
-    # `parse_any_legacy_contract_text` changes which keys it can return.
-    return [
-        "COUNTY", "SLR1ADR1", "SLR1ADR2", "AG701FRM", "AG701LIC", "AG701AD1",
-        "AG701AD2", "AG701PH", "INCITY", "INCOUNTY", "DEPHELD", "POSSION",
-        "UNDNAME", "SLR1NAM1", "SLR1REL1", "SLR1NAM2", "SLR1CELL1", "SLR1EMAIL",
-        "SLR1CELL2", "SLR1EMAIL2", "PARCELID", "PLISTINGAGENT", "MTDTTYPE",
-        "SALEPRIC", "DEPOSIT", "SETTDATE", "BYR1NAM1", "BYR1NAM2", "BYR1REL1",
-        "BYR1ADR1", "BYR1ADR2", "BYR1CELL1", "BYR1EMAIL", "BYR1CELL2", "BYR1EMAIL2",
-        "LORU", "LOTUNIT", "SUBDIVN", "PROPSTRE", "PROPCITY", "STATELET", "PROPZIP",
-        "AG701NAM", "AG701MO", "AG701EMAIL", "AG701CONTLIC", "AG702FRM", "AG702LIC",
-        "AG702AD1", "AG702AD2", "AG702PH", "AG702NAM", "AG702MO", "AG702EMAIL",
-        "AG702CONTLIC", "COMPCT"
-    ]
+    in its returned dictionary, in output order. Derived from the Legacy
+    contract spec, so it always matches what the parser returns.
+    """
+    return LEGACY_CONTRACT_SPEC.field_names()
 
 def format_name(name1_str, name2_str=None):
     """
@@ -431,21 +452,48 @@ def generate_legacy_folder_name(extracted_data: dict) -> str:
     return "Unknown_Entity  25-"
 
 
+# Values computed from the extracted fields rather than read from the contract
+# (COMPCT is derived while parsing, from text that isn't kept as a field, so
+# here it is an ordinary extracted field), and the generated outputs showing
+# them. Lets an edit in the Extracted Data Viewer recompute only its dependents.
+LEGACY_DERIVED_FIELDS = FieldDependencyGraph(
+    derived_fields=(
+        DerivedField('BYRREL', ('BYR1NAM1', 'BYR1NAM2'), lambda data: format_name(data.get('BYR1NAM1') or '', data.get('BYR1NAM2') or '')),
+        DerivedField('SLRREL', ('SLR1NAM1', 'SLR1NAM2'), lambda data: format_name(data.get('SLR1NAM1') or '', data.get('SLR1NAM2') or '')),
+        DerivedField('FOLDERNAME', ('BYR1NAM1',), generate_legacy_folder_name),
+    ),
+    outputs=(
+        OutputDocument("folder name", ('FOLDERNAME',)),
+        OutputDocument("overlay.pxt", (ALL_EXTRACTED_FIELDS,)),
+        OutputDocument("setupdocs.docx", (ALL_EXTRACTED_FIELDS, 'BYRREL', 'SLRREL')),
+        OutputDocument("Label.docx", ('BYRREL', 'SLRREL', 'PROPSTRE')),
+    ),
+)
+
+
 # New function to copy PDF
-def copy_pdf_to_folder(source_pdf_path: str, destination_folder_path: str, pdf_filename: str) -> tuple[bool, str]:
-    """Copies the source PDF to the destination folder."""
+def copy_pdf_to_folder(source_pdf_path: str, destination_folder_path: str, pdf_filename: str,
+                       placement_methods=DEFAULT_PLACEMENT_METHODS) -> tuple[bool, str]:
+    """
+    Copies the source PDF to the destination folder with the first of
+    `placement_methods` that works (see `core.pdf_placement.place_file`);
+    the message names the method used. Given a `PdfBuffer`, the copy is
+    written from it rather than read from the source again.
+    """
     full_dest_pdf_path = os.path.join(destination_folder_path, pdf_filename)
+    data = source_pdf_path.data if isinstance(source_pdf_path, PdfBuffer) else None
     try:
-        shutil.copy2(source_pdf_path, full_dest_pdf_path)
-        print(f"INFO: Successfully copied {pdf_filename} to {destination_folder_path}")
-        return True, f"Successfully copied {pdf_filename} to {destination_folder_path}"
+        with METRICS.timer("pdf.copy"):
+            method = place_file(str(source_pdf_path), full_dest_pdf_path, placement_methods, data)
+        print(f"INFO: Successfully copied {pdf_filename} to {destination_folder_path} ({method})")
+        return True, f"Successfully copied {pdf_filename} to {destination_folder_path} ({method})"
     except (IOError, shutil.Error) as e:
         print(f"ERROR: Error copying {pdf_filename}: {e}")
         return False, f"Error copying {pdf_filename}: {e}"
 
 
 # New function to get initial folder name and data for GUI checks
-def get_initial_legacy_folder_name_and_data(pdf_file_path: str) -> tuple[str | None, dict | None, str | None]:
+def get_initial_legacy_folder_name_and_data(pdf_file_path: str, cache=None, profile: str = DEFAULT_EXTRACTION_PROFILE, layouts=None) -> tuple[str | None, dict | None, str | None]:
     """
     Extracts text, parses it, generates a folder name, and returns these.
     This function serves as a preliminary step, often called by the GUI, 
@@ -453,7 +501,13 @@ def get_initial_legacy_folder_name_and_data(pdf_file_path: str) -> tuple[str | N
     committing to the full folder creation and file population process.
 
     Args:
-        pdf_file_path: The path to the PDF file to be processed.
+        pdf_file_path: The path to the PDF file to be processed, or a `PdfBuffer`
+                       of it so the file is neither hashed nor parsed from disk.
+        cache: Optional `ExtractionCache`. When given, previously extracted text
+               and parsed records for the same PDF contents are reused, so
+               reprocessing a PDF skips `extract_text_from_pdf` entirely.
+        profile: The extraction profile (see EXTRACTION_PROFILES) used on a cache miss.
+        layouts: Optional `FormLayoutStore` enabling targeted page extraction (see `read_legacy_contract`).
 
     Returns:
         A tuple containing:
@@ -462,15 +516,29 @@ def get_initial_legacy_folder_name_and_data(pdf_file_path: str) -> tuple[str | N
             - error_message (str | None): An error message if any issue occurred, otherwise None.
     """
     try:
-        print(f"INFO: Initial PDF text extraction for folder name generation: {pdf_file_path}")
-        raw_text = extract_text_from_pdf(pdf_file_path)
+        pdf_hash = pdf_content_hash(pdf_file_path) if cache else None
+        extraction = f"{LEGACY_TEXT_EXTRACTION}:{profile}"
+        raw_text = cache.get_text(pdf_hash, extraction) if cache else None
+        extracted_data = None
+        if raw_text is None:
+            print(f"INFO: Initial PDF text extraction for folder name generation: {pdf_file_path}")
+            raw_text, extracted_data = read_legacy_contract(pdf_file_path, profile, layouts)
+            if cache and raw_text:
+                cache.put(pdf_hash, extraction, raw_text, LEGACY_PARSER_VERSION, extracted_data)
+        else:
+            print(f"INFO: Using cached text for {pdf_file_path}")
+            extracted_data = cache.get_record(pdf_hash, extraction, LEGACY_PARSER_VERSION)
+            if extracted_data is None:
+                print(f"INFO: Re-parsing cached text for folder name generation: {pdf_file_path}")
+                extracted_data = parse_any_legacy_contract_text(raw_text)
+                cache.put(pdf_hash, extraction, raw_text, LEGACY_PARSER_VERSION, extracted_data)
+            else:
+                print(f"INFO: Using cached parse results for {pdf_file_path}")
         if not raw_text:
             error_msg = f"Could not extract any text from {pdf_file_path} for folder naming."
             print(f"ERROR: {error_msg}")
             return None, None, error_msg
-        
-        print(f"INFO: Initial parsing for folder name generation: {pdf_file_path}")
-        extracted_data = parse_any_legacy_contract_text(raw_text)
+
         # Check for essential data needed for folder name (e.g., BYR1NAM1)
         if not extracted_data or not extracted_data.get('BYR1NAM1'):
             error_msg = f"Failed to parse essential data (like BYR1NAM1) from {pdf_file_path} for folder naming."
@@ -485,6 +553,81 @@ def get_initial_legacy_folder_name_and_data(pdf_file_path: str) -> tuple[str | N
         return None, None, error_msg
 
 
+# Fields the folder name needs. The form puts the title block on its first
+# page; the second is only read should a name run over the page break.
+LEGACY_QUICK_LOOK_FIELDS = ('BYR1NAM1',)
+LEGACY_QUICK_LOOK_MAX_PAGES = 2
+
+
+def quick_look_legacy_folder_name(pdf_file_path: str, cache=None, profile: str = DEFAULT_EXTRACTION_PROFILE) -> tuple[str | None, dict | None, str | None]:
+    """
+    Phase one of processing a single contract: gets just enough of it for the
+    folder name and the folder-exists check, so the operator can be asked
+    about an existing folder while `start_legacy_full_parse` finishes the rest.
+
+    Only LEGACY_QUICK_LOOK_FIELDS are parsed, from cached text when `cache`
+    has it and otherwise from the first LEGACY_QUICK_LOOK_MAX_PAGES pages,
+    one page at a time, stopping as soon as they are found.
+
+    Returns:
+        A tuple of (generated folder name, the quick-look fields, error message),
+        like `get_initial_legacy_folder_name_and_data`.
+    """
+    try:
+        raw_text = None
+        if cache:
+            raw_text = cache.get_text(pdf_content_hash(pdf_file_path), f"{LEGACY_TEXT_EXTRACTION}:{profile}")
+        if raw_text is not None:
+            quick_data = LEGACY_CONTRACT_SPEC.parse(raw_text, only=LEGACY_QUICK_LOOK_FIELDS)
+        else:
+            quick_data = {}
+            pages_read = []
+            pages = iter_text_from_pdf_pages(pdf_file_path, profile, pagenos=set(range(LEGACY_QUICK_LOOK_MAX_PAGES)))
+            try:
+                for page_text in pages:
+                    pages_read.append(page_text)
+                    quick_data = LEGACY_CONTRACT_SPEC.parse("".join(pages_read), only=LEGACY_QUICK_LOOK_FIELDS)
+                    if all(quick_data.get(name) for name in LEGACY_QUICK_LOOK_FIELDS):
+                        break
+            finally:
+                pages.close()
+        if not quick_data.get('BYR1NAM1'):
+            error_msg = f"BYR1NAM1 is not on the first {LEGACY_QUICK_LOOK_MAX_PAGES} page(s) of {pdf_file_path}."
+            print(f"INFO: Quick look found no folder name: {error_msg}")
+            return None, quick_data, error_msg
+        return generate_legacy_folder_name(quick_data), quick_data, None
+    except Exception as e:
+        error_msg = f"An error occurred during the quick look at {pdf_file_path}: {e}"
+        print(f"ERROR: {error_msg}")
+        return None, None, error_msg
+
+
+def start_legacy_full_parse(pool, pdf_file_path: str, cache=None, profile: str = DEFAULT_EXTRACTION_PROFILE, layouts=None):
+    """
+    Phase two of processing a single contract: submits the full extraction and
+    parse (`get_initial_legacy_folder_name_and_data`) to `pool`, a
+    `ProcessPoolExecutor`, so it runs while the GUI is waiting on the
+    operator. Collect the result with `finish_legacy_full_parse`.
+    """
+    return pool.submit(_parse_legacy_contract_in_worker, pdf_file_path, cache, profile, layouts,
+                       LEGACY_CONTRACT_SPEC.pattern_order)
+
+
+def finish_legacy_full_parse(future, pdf_file_path: str) -> tuple[str | None, dict | None, str | None]:
+    """
+    Waits for a `start_legacy_full_parse` future, merges the metrics the worker
+    recorded and returns what `get_initial_legacy_folder_name_and_data` returned.
+    """
+    try:
+        result, worker_metrics = future.result()
+    except Exception as e:
+        error_msg = f"Worker failed while parsing {pdf_file_path}: {e}"
+        print(f"ERROR: {error_msg}")
+        return None, None, error_msg
+    METRICS.merge(worker_metrics)
+    return result
+
+
 def save_config(config_data: dict, filepath="config.YAML"):
     """Saves the configuration dictionary to a YAML file."""
     try:
@@ -496,7 +639,86 @@ def save_config(config_data: dict, filepath="config.YAML"):
         print(f"ERROR: Could not save configuration to {filepath}: {e}")
         return False
 
-def create_legacy_contract_folder_structure(final_folder_path: str, extracted_data: dict, is_buyer_checked: bool, is_seller_checked: bool, config: dict) -> tuple[str, bool]:
+def _write_overlay_pxt(final_folder_path: str, extracted_data: dict) -> str:
+    """Writes "overlay.pxt" (every extracted field) into the client folder and returns its text."""
+    entity_list_content = []
+    if extracted_data: # Ensure extracted_data is not None
+        for key, value in extracted_data.items():
+            entity_list_content.append(f"{key}= {value}")
+    overlay_text = "\n".join(entity_list_content) + "\n\n--- End of Extracted Data ---"
+
+    with open(os.path.join(final_folder_path, "overlay.pxt"), "w") as f:
+        f.write(overlay_text)
+    return overlay_text
+
+
+def _write_setup_docs(final_folder_path: str, extracted_data: dict, overlay_text: str, is_buyer_checked: bool, is_seller_checked: bool,
+                      transaction: str = PURCHASE_TRANSACTION, statement: str = CD_STATEMENT) -> None:
+    """Writes "Setup/setupdocs.docx" from the template matching the processing tab choices (a placeholder if there is none)."""
+    setup_docs_path = os.path.join(final_folder_path, "Setup", "setupdocs.docx")
+
+    setup_template_path, template_error = get_setup_docs_template(transaction, is_buyer_checked, is_seller_checked, statement)
+    if setup_template_path:
+        print(f"INFO: Templating setupdocs.docx from {os.path.basename(setup_template_path)} for {final_folder_path}")
+        try:
+            # The composite is prebuilt and cached in memory: setupdocs.docx is templated and written once
+            setup_laps = METRICS.stopwatch("setupdocs")
+            doc_tpl = TEMPLATE_CACHE.docx_template(setup_template_path)
+            # The same values overlay.pxt holds, without reading the file back
+            context = parse_pxt_text(overlay_text)
+
+            context.update(LEGACY_DERIVED_FIELDS.compute(extracted_data or {}, ('BYRREL', 'SLRREL')))
+            
+            try:
+                doc_tpl.render(context)
+            except Exception:
+                doc_tpl.docx.save(setup_docs_path) # Leave the merged, untemplated document
+                raise
+            setup_laps.lap("render")
+            TEMPLATE_CACHE.save_docx_template(doc_tpl, setup_docs_path) # Untouched parts reuse the template's compressed parts
+            setup_laps.lap("save")
+            print(f"INFO: Successfully templated {setup_docs_path}")
+
+        except Exception as e: # Catch other potential errors during template (docx, docxtpl errors)
+            print(f"ERROR: Failed to template setupdocs.docx for {final_folder_path}: {e}")
+            # Fallback to simple placeholder in case of other errors if setup_docs_path wasn't already handled
+            if not (os.path.exists(setup_docs_path) and os.path.getsize(setup_docs_path) > 0) : # check if a placeholder was already made
+                with open(setup_docs_path, "w") as f:
+                    f.write(f"Setup Documents for: {os.path.basename(final_folder_path)}\nError during generation: {e}\n")
+    elif template_error:
+        print(f"ERROR: {template_error}")
+        with open(setup_docs_path, "w") as f:
+            f.write(f"Setup Documents for: {os.path.basename(final_folder_path)}\nError: {template_error}\n")
+    else:
+        print(f"INFO: No setup documents for {transaction} with Buyer={is_buyer_checked}, Seller={is_seller_checked}. Creating placeholder setupdocs.docx for {final_folder_path}")
+        with open(setup_docs_path, "w") as f:
+            f.write(f"Setup Documents for: {os.path.basename(final_folder_path)}\n")
+
+
+def _write_label_docx(final_folder_path: str, extracted_data: dict, config: dict, label_index: int | None = None) -> None:
+    """
+    Writes "Setup/Label.docx" in `label_index`, or in the next slot from
+    `config` (advancing it there) when `label_index` is None.
+    """
+    output_label_path = os.path.join(final_folder_path, "Setup", "Label.docx")
+    if not extracted_data: # Ensure there's data for the label
+        print(f"WARNING: No extracted_data available, skipping label generation for {final_folder_path}")
+        return
+    advance_label_index = label_index is None
+    if advance_label_index:
+        label_index = get_next_label_index(config) # Pass config
+    label_generated = generate_label_docx(LABEL_TEMPLATE_PATH, output_label_path, extracted_data, label_index)
+    if label_generated and advance_label_index:
+        update_label_index(config, label_index) # Pass config
+        print(f"INFO: Successfully generated and updated label index for {output_label_path}")
+    elif label_generated:
+        print(f"INFO: Successfully generated label in slot {label_index} for {output_label_path}")
+    else:
+        print(f"WARNING: Failed to generate label for {output_label_path}")
+
+
+def create_legacy_contract_folder_structure(final_folder_path: str, extracted_data: dict, is_buyer_checked: bool, is_seller_checked: bool, config: dict, label_index: int | None = None,
+                                            transaction: str = PURCHASE_TRANSACTION, statement: str = CD_STATEMENT, generate_label: bool = True) -> tuple[str, bool]:
     """
     Creates the specific folder structure for a Legacy contract at the `final_folder_path`.
     This includes:
@@ -511,6 +733,14 @@ def create_legacy_contract_folder_structure(final_folder_path: str, extracted_da
                            This path is determined by the GUI, possibly after user input for renaming.
         extracted_data: A dictionary containing data extracted from the PDF, used to populate
                         the .pxt file and potentially other generated files.
+        label_index: Label slot to use. When None, the next slot is read from `config`
+                     and advanced there afterwards; when given, `config` is left untouched
+                     (used by batch processing, which assigns slots up front).
+        transaction, statement: Purchase/Refi and CD/HUD as chosen on the processing tab;
+                     with the buyer/seller flags they pick the setupdocs.docx template
+                     (see `core.setup_templates.SETUP_DOCS_TEMPLATE_MATRIX`).
+        generate_label: Set to False to skip Label.docx, e.g. when a batch puts its
+                     labels on shared sheets instead (see `generate_label_sheets`).
 
     Returns:
         A tuple containing:
@@ -522,117 +752,18 @@ def create_legacy_contract_folder_structure(final_folder_path: str, extracted_da
 
     try:
         os.makedirs(final_folder_path, exist_ok=True)
+        overlay_text = _write_overlay_pxt(final_folder_path, extracted_data)
 
-        # Create "overlay.pxt" with all extracted data
-        entity_list_content = []
-        if extracted_data: # Ensure extracted_data is not None
-            for key, value in extracted_data.items():
-                entity_list_content.append(f"{key}= {value}")
-        
-        with open(os.path.join(final_folder_path, "overlay.pxt"), "w") as f:
-            f.write("\n".join(entity_list_content))
-            f.write("\n\n--- End of Extracted Data ---")
-
-        # Placeholder files
-        # Use final_folder_path's basename for user-facing messages/content if needed
-        # folder_basename = os.path.basename(final_folder_path) # No longer directly used for simple label
-        
         # Create subfolders first (ensure "Setup" exists before writing files into it)
-        setup_subfolder_path = os.path.join(final_folder_path, "Setup")
-        os.makedirs(setup_subfolder_path, exist_ok=True)
+        os.makedirs(os.path.join(final_folder_path, "Setup"), exist_ok=True)
         os.makedirs(os.path.join(final_folder_path, "TitleSearch"), exist_ok=True)
 
-        # Remove old placeholder label creation in "Setup"
-        # file_label_path = os.path.join(setup_subfolder_path, "file label.docx")
-        # with open(file_label_path, "w") as f:
-        #     f.write(f"File Label for: {folder_basename}\n")
-        #     if extracted_data:
-        #         f.write(f"Property Address: {extracted_data.get('PROPSTRE', 'N/A')}\n")
-        
-        # Create setupdocs.docx in "Setup" subfolder
-        setup_docs_path = os.path.join(setup_subfolder_path, "setupdocs.docx")
+        _write_setup_docs(final_folder_path, extracted_data, overlay_text, is_buyer_checked, is_seller_checked, transaction, statement)
 
-        if is_buyer_checked and is_seller_checked:
-            print(f"INFO: Both buyer and seller checked. Merging and templating setupdocs.docx for {final_folder_path}")
-            source_doc1_path = "templates/long/Order Summary-Res.docx"
-            source_doc2_path = "templates/green/buyer_seller.docx"
-            
-            try:
-                # --- Merge Documents ---
-                merged_document = docx.Document()
-
-                # Add content from the first document
-                if os.path.exists(source_doc1_path):
-                    doc1 = docx.Document(source_doc1_path)
-                    for element in doc1.element.body: # Iterate over top-level elements in body
-                        merged_document.element.body.append(element)
-                else:
-                    print(f"ERROR: Template {source_doc1_path} not found for merging.")
-                    # Create a simple placeholder if critical templates are missing
-                    with open(setup_docs_path, "w") as f:
-                        f.write(f"Setup Documents for: {os.path.basename(final_folder_path)}\nError: Template '{os.path.basename(source_doc1_path)}' not found.\n")
-                    # Optionally, re-raise or return False earlier if this is a critical failure
-                    # For now, this specific error will result in a placeholder and then processing continues to Label.docx
-                    # raise FileNotFoundError(f"Template {source_doc1_path} not found, created placeholder.") 
-                
-                # Add content from the second document only if the first one was found and processed
-                if os.path.exists(source_doc1_path) and os.path.exists(source_doc2_path):
-                    doc2 = docx.Document(source_doc2_path)
-                    for element in doc2.element.body: # Iterate over top-level elements in body
-                        merged_document.element.body.append(element)
-                    merged_document.save(setup_docs_path)
-                    print(f"INFO: Successfully merged documents into {setup_docs_path}")
-
-                    # --- Template Processing on Merged Document ---
-                    doc_tpl = DocxTemplate(setup_docs_path)
-                    pxt_file_path = os.path.join(final_folder_path, "overlay.pxt")
-                    context = parse_pxt_to_dict(pxt_file_path) 
-
-                    byr1nam1 = extracted_data.get('BYR1NAM1', '') if extracted_data else ''
-                    byr1nam2 = extracted_data.get('BYR1NAM2', '') if extracted_data else ''
-                    slr1nam1 = extracted_data.get('SLR1NAM1', '') if extracted_data else '' # Sourced from extracted_data
-                    slr1nam2 = extracted_data.get('SLR1NAM2', '') if extracted_data else '' # Sourced from extracted_data
-
-                    context['BYRREL'] = format_name(byr1nam1, byr1nam2)
-                    context['SLRREL'] = format_name(slr1nam1, slr1nam2)
-                    
-                    doc_tpl.render(context)
-                    doc_tpl.save(setup_docs_path) 
-                    print(f"INFO: Successfully templated {setup_docs_path}")
-
-                elif os.path.exists(source_doc1_path) and not os.path.exists(source_doc2_path):
-                    # First template existed, second didn't. Save what we have from first doc.
-                    print(f"ERROR: Template {source_doc2_path} not found for merging. Saving content from first template only.")
-                    merged_document.save(setup_docs_path) # Save the first document's content
-                    # Then write a modified placeholder or log error for the user that only partial content exists.
-                    # For simplicity, we'll just save doc1 content. User will see it's not the full merge.
-
-            except Exception as e: # Catch other potential errors during merge/template (docx, docxtpl errors)
-                print(f"ERROR: Failed to merge or template setupdocs.docx for {final_folder_path}: {e}")
-                # Fallback to simple placeholder in case of other errors if setup_docs_path wasn't already handled
-                if not (os.path.exists(setup_docs_path) and os.path.getsize(setup_docs_path) > 0) : # check if a placeholder was already made
-                    with open(setup_docs_path, "w") as f:
-                        f.write(f"Setup Documents for: {os.path.basename(final_folder_path)}\nError during generation: {e}\n")
+        if not generate_label:
+            print(f"INFO: Label for {final_folder_path} goes on a shared label sheet; skipping Label.docx")
         else:
-            print(f"INFO: Buyer and Seller not both checked. Creating placeholder setupdocs.docx for {final_folder_path}")
-            with open(setup_docs_path, "w") as f:
-                f.write(f"Setup Documents for: {os.path.basename(final_folder_path)}\n")
-
-        # Generate the new Label.docx in the "Setup" subfolder
-        template_label_path = "templates/Label.docx" # Assuming this path is correct relative to execution
-        # Ensure setup_subfolder_path is defined before this line (it is, a few lines above)
-        output_label_path = os.path.join(setup_subfolder_path, "Label.docx")
-        
-        if extracted_data: # Ensure there's data for the label
-            label_index = get_next_label_index(config) # Pass config
-            label_generated = generate_label_docx(template_label_path, output_label_path, extracted_data, label_index)
-            if label_generated:
-                update_label_index(config, label_index) # Pass config
-                print(f"INFO: Successfully generated and updated label index for {output_label_path}")
-            else:
-                print(f"WARNING: Failed to generate label for {output_label_path}")
-        else:
-            print(f"WARNING: No extracted_data available, skipping label generation for {final_folder_path}")
+            _write_label_docx(final_folder_path, extracted_data, config, label_index)
 
         print(f"SUCCESS: Created folder structure in '{final_folder_path}'.")
         return final_folder_path, True # Return path and success
@@ -648,7 +779,9 @@ def handle_legacy_contract_processing(
     extracted_data_from_gui: dict,
     is_buyer_checked: bool,
     is_seller_checked: bool,
-    config: dict # Added config
+    config: dict, # Added config
+    transaction: str = PURCHASE_TRANSACTION,
+    statement: str = CD_STATEMENT
     ):
     """
     Main handler for the core logic of processing "Legacy" contracts.
@@ -666,6 +799,7 @@ def handle_legacy_contract_processing(
         user_selected_output_dir: The base directory selected by the user for output.
         processed_folder_name: The final, confirmed name for the client-specific folder.
         extracted_data_from_gui: The dictionary of data extracted by `get_initial_legacy_folder_name_and_data`.
+        transaction, statement: Purchase/Refi and CD/HUD, see `create_legacy_contract_folder_structure`.
 
     Returns:
         A tuple containing:
@@ -691,7 +825,9 @@ def handle_legacy_contract_processing(
         extracted_data_from_gui,
         is_buyer_checked,
         is_seller_checked,
-        config=config # Pass config
+        config=config, # Pass config
+        transaction=transaction,
+        statement=statement
     )
 
     if success:
@@ -701,6 +837,355 @@ def handle_legacy_contract_processing(
         return None, f"Failed to create folder structure for '{processed_folder_name}'"
 
 
+def regenerate_legacy_contract_outputs(
+    final_folder_path: str,
+    extracted_data: dict,
+    outputs,
+    is_buyer_checked: bool,
+    is_seller_checked: bool,
+    config: dict,
+    transaction: str = PURCHASE_TRANSACTION,
+    statement: str = CD_STATEMENT
+    ) -> tuple[str, list[str], str | None]:
+    """
+    Re-renders only `outputs` (names from `LEGACY_DERIVED_FIELDS.outputs`,
+    e.g. the out-of-date outputs `recompute` reports) of the client folder at
+    `final_folder_path`, after the operator edited `extracted_data` in the
+    Extracted Data Viewer, instead of recreating the whole folder.
+
+    "folder name" renames the folder to the name the edited data gives; an
+    existing folder of that name is never replaced. Label.docx goes in the
+    next label slot from `config`, like any new label.
+
+    Returns:
+        A tuple containing:
+            - folder_path (str): The client folder's path, after any rename.
+            - regenerated (list[str]): The outputs that were re-rendered.
+            - error_message (str | None): What could not be regenerated, if anything.
+    """
+    outputs = set(outputs)
+    regenerated = []
+    if not os.path.isdir(final_folder_path):
+        return final_folder_path, regenerated, f"Folder '{final_folder_path}' no longer exists."
+    if "folder name" in outputs:
+        new_folder_path = os.path.join(os.path.dirname(final_folder_path), generate_legacy_folder_name(extracted_data))
+        if new_folder_path != final_folder_path:
+            if check_folder_exists(new_folder_path):
+                return final_folder_path, regenerated, f"Folder '{os.path.basename(new_folder_path)}' already exists; not renamed."
+            try:
+                os.rename(final_folder_path, new_folder_path)
+            except OSError as e:
+                return final_folder_path, regenerated, f"Could not rename '{final_folder_path}': {e}"
+            print(f"INFO: Renamed '{final_folder_path}' to '{new_folder_path}'")
+            final_folder_path = new_folder_path
+        regenerated.append("folder name")
+    try:
+        overlay_text = None
+        if "overlay.pxt" in outputs or "setupdocs.docx" in outputs:
+            # setupdocs.docx is templated from the overlay text, which holds the same values either way
+            overlay_text = _write_overlay_pxt(final_folder_path, extracted_data)
+            if "overlay.pxt" in outputs:
+                regenerated.append("overlay.pxt")
+        os.makedirs(os.path.join(final_folder_path, "Setup"), exist_ok=True)
+        if "setupdocs.docx" in outputs:
+            _write_setup_docs(final_folder_path, extracted_data, overlay_text, is_buyer_checked, is_seller_checked, transaction, statement)
+            regenerated.append("setupdocs.docx")
+        if "Label.docx" in outputs:
+            _write_label_docx(final_folder_path, extracted_data, config)
+            regenerated.append("Label.docx")
+    except OSError as e:
+        print(f"ERROR: Could not regenerate outputs in '{final_folder_path}'. Error: {e}")
+        return final_folder_path, regenerated, f"Could not regenerate outputs in '{final_folder_path}': {e}"
+    print(f"INFO: Regenerated {', '.join(regenerated) or 'nothing'} in '{final_folder_path}'")
+    return final_folder_path, regenerated, None
+
+
+def _parse_legacy_contract_in_worker(pdf_file_path: str, cache, profile: str, layouts, pattern_order=None) -> tuple[tuple, dict]:
+    """
+    Batch worker: runs `get_initial_legacy_folder_name_and_data` with the
+    parent's pattern order and returns its result with the metrics it
+    recorded, for the parent to merge.
+    """
+    METRICS.reset()
+    LEGACY_CONTRACT_SPEC.set_pattern_order(pattern_order)
+    result = get_initial_legacy_folder_name_and_data(pdf_file_path, cache, profile, layouts)
+    return result, METRICS.snapshot()
+
+
+def _read_and_parse_legacy_contract_in_worker(pdf_file, cache, profile: str, layouts, pattern_order=None) -> tuple[tuple, dict, PdfBuffer | None]:
+    """
+    Batch worker: reads the PDF once into a `PdfBuffer` (unless `pdf_file`
+    already is one), does what `_parse_legacy_contract_in_worker` does with it
+    and also returns the buffer, which the parent hands to the render worker
+    for the copy. The buffer is None if the file could not be read.
+    """
+    METRICS.reset()
+    if isinstance(pdf_file, PdfBuffer):
+        pdf = pdf_file
+    else:
+        try:
+            pdf = PdfBuffer.read(pdf_file)
+        except OSError as e:
+            error_msg = f"Could not read {pdf_file}: {e}"
+            print(f"ERROR: {error_msg}")
+            return (None, None, error_msg), METRICS.snapshot(), None
+    LEGACY_CONTRACT_SPEC.set_pattern_order(pattern_order)
+    result = get_initial_legacy_folder_name_and_data(pdf, cache, profile, layouts)
+    return result, METRICS.snapshot(), pdf
+
+
+def _render_legacy_contract_outputs_in_worker(*args) -> tuple[tuple, dict]:
+    """Batch worker: runs `_render_legacy_contract_outputs` and returns its result with the metrics it recorded."""
+    METRICS.reset()
+    result = _render_legacy_contract_outputs(*args)
+    return result, METRICS.snapshot()
+
+
+def _render_legacy_contract_outputs(
+    pdf_file_path: str,
+    final_folder_path: str,
+    extracted_data: dict,
+    is_buyer_checked: bool,
+    is_seller_checked: bool,
+    label_index: int,
+    transaction: str = PURCHASE_TRANSACTION,
+    statement: str = CD_STATEMENT,
+    generate_label: bool = True,
+    placement_methods=DEFAULT_PLACEMENT_METHODS
+    ) -> tuple[str | None, str]:
+    """
+    Batch worker: creates the folder structure for one contract in `label_index`
+    and copies its PDF (a path or `PdfBuffer`) into it. Runs in a worker process, so it never touches
+    config.YAML; the parent assigns label slots and saves the config once.
+    """
+    created_path, success = create_legacy_contract_folder_structure(
+        final_folder_path,
+        extracted_data,
+        is_buyer_checked,
+        is_seller_checked,
+        config={},
+        label_index=label_index,
+        transaction=transaction,
+        statement=statement,
+        generate_label=generate_label
+    )
+    if not success:
+        return None, f"Failed to create folder structure for '{os.path.basename(final_folder_path)}'"
+    copy_success, copy_message = copy_pdf_to_folder(pdf_file_path, created_path, os.path.basename(str(pdf_file_path)), placement_methods)
+    if not copy_success:
+        return created_path, f"Created folder structure in '{os.path.basename(created_path)}', BUT {copy_message}"
+    return created_path, f"Successfully created folder structure in '{os.path.basename(created_path)}'. {copy_message}"
+
+
+def iter_legacy_contract_batch_processing(
+    pdf_file_paths,
+    user_selected_output_dir: str,
+    is_buyer_checked: bool,
+    is_seller_checked: bool,
+    config: dict,
+    overwrite_existing: bool = False,
+    cache=None,
+    profile: str = DEFAULT_EXTRACTION_PROFILE,
+    layouts=None,
+    max_workers: int | None = None,
+    max_in_flight: int | None = None,
+    transaction: str = PURCHASE_TRANSACTION,
+    statement: str = CD_STATEMENT,
+    label_sheets: bool = False
+    ):
+    """
+    Processes many Legacy contracts in parallel and yields one result per PDF,
+    in submission order.
+
+    Extraction and parsing (`get_initial_legacy_folder_name_and_data`) and output
+    rendering (`_render_legacy_contract_outputs`) both run in a
+    `ProcessPoolExecutor` sized to the CPU count. Folder-name checks and label
+    slot assignment happen in this process, in submission order, so results
+    match what one-at-a-time processing would produce. At most `max_in_flight`
+    contracts are being extracted or rendered at any time, so memory use does
+    not grow with the batch size. Stage metrics recorded in the workers are
+    merged into this process's METRICS as results are collected, and the
+    workers parse with this process's `LEGACY_CONTRACT_SPEC.pattern_order`.
+    Each PDF is read from disk once, by its parse worker (or already by the
+    caller, when `pdf_file_paths` holds `PdfBuffer`s); the `PdfBuffer` goes
+    with the contract to its render worker, which writes the copy from it.
+
+    There is no operator to negotiate with in a batch: a contract whose folder
+    already exists (or whose folder name repeats an earlier one in the batch) is
+    skipped unless `overwrite_existing` is True.
+
+    Args:
+        pdf_file_paths: The PDF file paths to process, or `PdfBuffer`s of PDFs already read.
+        user_selected_output_dir: The base directory for the client folders.
+        config: Application config; `next_label_index` is read once and saved once,
+                `pdf_placement_methods` decides how each PDF is copied into its folder.
+        cache: Optional `ExtractionCache` shared by the workers.
+        profile: The extraction profile (see EXTRACTION_PROFILES).
+        layouts: Optional `FormLayoutStore` shared by the workers; each task's copy re-reads
+                 the layouts file once it changed, so a form learned by one worker is
+                 targeted by the workers parsing later PDFs of that form.
+        max_workers: Worker process count (defaults to the CPU count).
+        max_in_flight: Maximum contracts submitted but not yet collected
+                       (defaults to twice the worker count).
+        transaction, statement: Purchase/Refi and CD/HUD, see `create_legacy_contract_folder_structure`.
+        label_sheets: Instead of a one-label Label.docx in every folder, put the
+                      labels of the successful contracts, in order, on shared
+                      sheets in `user_selected_output_dir` (see `generate_label_sheets`),
+                      continuing from `next_label_index`. A sheet is written as
+                      soon as its last slot is taken, the final one when the batch ends.
+
+    Yields:
+        A dict per PDF with keys 'pdf_file_path', 'folder_path', 'extracted_data',
+        'success', 'message', and 'label_sheet' and 'label_slot' (the sheet file
+        and slot holding its label with `label_sheets`, otherwise None).
+    """
+    pdf_file_paths = list(pdf_file_paths or [])
+    if not pdf_file_paths:
+        return
+    max_workers = max_workers or os.cpu_count() or 1
+    max_in_flight = max(1, max_in_flight or 2 * max_workers)
+    # Bring the setup documents template up to date once, before any worker needs it
+    _, template_error = get_setup_docs_template(transaction, is_buyer_checked, is_seller_checked, statement)
+    if template_error:
+        print(f"ERROR: {template_error}")
+    placement_methods = get_placement_methods(config)
+    label_index = get_next_label_index(config)
+    labels_assigned = 0
+    sheet_labels = {} # Slot -> data for the label sheet being filled
+    sheet_paths = iter_label_sheet_paths(user_selected_output_dir)
+    sheet_path = next(sheet_paths)
+    used_folder_names = set()
+    ready_results = {}
+    next_result_index = 0
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        parse_queue = deque()
+        render_queue = deque()
+        pending_paths = iter(enumerate(pdf_file_paths))
+        exhausted = False
+
+        while True:
+            # Keep the pool busy, but never hold more than max_in_flight contracts at once
+            while not exhausted and len(parse_queue) + len(render_queue) < max_in_flight:
+                next_item = next(pending_paths, None)
+                if next_item is None:
+                    exhausted = True
+                    break
+                index, pdf_file = next_item
+                future = pool.submit(_read_and_parse_legacy_contract_in_worker, pdf_file, cache, profile, layouts,
+                                     LEGACY_CONTRACT_SPEC.pattern_order)
+                pdf_file_path = pdf_file.path if isinstance(pdf_file, PdfBuffer) else pdf_file
+                parse_queue.append((index, pdf_file_path, future))
+
+            if parse_queue:
+                index, pdf_file_path, future = parse_queue.popleft()
+                result = {
+                    'pdf_file_path': pdf_file_path,
+                    'folder_path': None,
+                    'extracted_data': None,
+                    'success': False,
+                    'message': "",
+                    'label_sheet': None,
+                    'label_slot': None,
+                }
+                pdf = None
+                try:
+                    (folder_name, extracted_data, error_message), worker_metrics, pdf = future.result()
+                    METRICS.merge(worker_metrics)
+                except Exception as e:
+                    folder_name, extracted_data, error_message = None, None, f"Worker failed while parsing {pdf_file_path}: {e}"
+                result['extracted_data'] = extracted_data
+                final_folder_path = os.path.join(user_selected_output_dir, folder_name) if folder_name else None
+                if error_message or not folder_name:
+                    result['message'] = error_message or f"Could not determine folder name for {pdf_file_path}."
+                    ready_results[index] = result
+                elif not overwrite_existing and (folder_name in used_folder_names or check_folder_exists(final_folder_path)):
+                    result['message'] = f"Folder '{folder_name}' already exists in '{user_selected_output_dir}'; skipped."
+                    ready_results[index] = result
+                else:
+                    used_folder_names.add(folder_name)
+                    render_future = pool.submit(
+                        _render_legacy_contract_outputs_in_worker, pdf if pdf is not None else pdf_file_path, final_folder_path,
+                        extracted_data, is_buyer_checked, is_seller_checked, label_index, transaction, statement,
+                        not label_sheets, placement_methods
+                    )
+                    render_queue.append((index, result, render_future))
+                    if not label_sheets: # With label sheets, slots go to the contracts that succeed
+                        label_index = 1 if label_index == LABEL_SLOTS_PER_SHEET else label_index + 1
+                        labels_assigned += 1
+            elif not render_queue:
+                break
+
+            # Collect renders oldest first: enough to respect the in-flight bound, and one
+            # per pass when there is nothing left to parse so the pipeline keeps draining
+            while render_queue and (len(parse_queue) + len(render_queue) > max_in_flight or not parse_queue):
+                index, result, render_future = render_queue.popleft()
+                try:
+                    (created_path, message), worker_metrics = render_future.result()
+                    METRICS.merge(worker_metrics)
+                except Exception as e:
+                    created_path, message = None, f"Worker failed while rendering outputs for {result['pdf_file_path']}: {e}"
+                result['folder_path'] = created_path
+                result['success'] = created_path is not None
+                result['message'] = message
+                ready_results[index] = result
+                if not parse_queue:
+                    break
+
+            while next_result_index in ready_results:
+                result = ready_results.pop(next_result_index)
+                next_result_index += 1
+                if label_sheets and result['success'] and result['extracted_data']:
+                    sheet_labels[label_index] = result['extracted_data']
+                    result['label_sheet'], result['label_slot'] = sheet_path, label_index
+                    labels_assigned += 1
+                    if label_index == LABEL_SLOTS_PER_SHEET:
+                        generate_label_sheet_docx(LABEL_TEMPLATE_PATH, sheet_path, sheet_labels)
+                        sheet_labels, sheet_path = {}, next(sheet_paths)
+                    label_index = 1 if label_index == LABEL_SLOTS_PER_SHEET else label_index + 1
+                yield result
+
+    if sheet_labels:
+        generate_label_sheet_docx(LABEL_TEMPLATE_PATH, sheet_path, sheet_labels)
+    if labels_assigned:
+        config['next_label_index'] = label_index
+        if not save_config(config):
+            print(f"ERROR: Failed to save updated label index to config file.")
+
+
+def handle_legacy_contract_batch_processing(
+    pdf_file_paths,
+    user_selected_output_dir: str,
+    is_buyer_checked: bool,
+    is_seller_checked: bool,
+    config: dict,
+    overwrite_existing: bool = False,
+    cache=None,
+    profile: str = DEFAULT_EXTRACTION_PROFILE,
+    layouts=None,
+    max_workers: int | None = None,
+    max_in_flight: int | None = None,
+    transaction: str = PURCHASE_TRANSACTION,
+    statement: str = CD_STATEMENT,
+    label_sheets: bool = False
+    ) -> list[dict]:
+    """
+    Batch counterpart of `handle_legacy_contract_processing`. Returns the results
+    of `iter_legacy_contract_batch_processing` as a list, in submission order.
+    """
+    return list(iter_legacy_contract_batch_processing(
+        pdf_file_paths, user_selected_output_dir, is_buyer_checked, is_seller_checked, config,
+        overwrite_existing=overwrite_existing, cache=cache, profile=profile, layouts=layouts,
+        max_workers=max_workers, max_in_flight=max_in_flight, transaction=transaction, statement=statement,
+        label_sheets=label_sheets
+    ))
+
+
+# The label sheet template and the number of labels (placeholder sets) on one sheet.
+LABEL_TEMPLATE_PATH = "templates/Label.docx" # Assuming this path is correct relative to execution
+LABEL_SLOTS_PER_SHEET = 20
+
+
 def get_next_label_index(config: dict) -> int:
     """
     Reads the next_label_index from the provided config dictionary.
@@ -740,27 +1225,38 @@ def generate_label_docx(template_path: str, output_path: str, data: dict, label_
                Keys like 'BYR1NAM1', 'SLR1NAM1', 'PROPSTRE' are used for the active label.
         label_index: Integer (1-20) to identify which set of placeholders is active.
 
+    Returns:
+        True if generation was successful, False otherwise.
+    """
+    return generate_label_sheet_docx(template_path, output_path, {label_index: data})
+
+
+def generate_label_sheet_docx(template_path: str, output_path: str, labels: dict) -> bool:
+    """
+    Generates one label sheet with a single docxtpl render: every slot in
+    `labels` (slot 1-20 -> extracted data) is populated like the active label
+    of `generate_label_docx`, and every other slot is cleared.
+
     Returns:
         True if generation was successful, False otherwise.
     """
     try:
-        doc = DocxTemplate(template_path)
+        label_laps = METRICS.stopwatch("label")
+        doc = TEMPLATE_CACHE.docx_template(template_path)
         context = {}
 
-        for i in range(1, 21):  # Iterate from 1 to 20
+        for i in range(1, LABEL_SLOTS_PER_SHEET + 1):  # Iterate from 1 to 20
             buyer_key = f"Buyer{i}"
             seller_key = f"Seller{i}"
             address_key = f"Address{i}"
 
-            if i == label_index:
+            if i in labels:
                 # Active label: populate with data
-                buyer_name_str = format_name(data.get('BYR1NAM1', ''), data.get('BYR1NAM2', ''))
-                seller_name_str = format_name(data.get('SLR1NAM1', ''), data.get('SLR1NAM2', ''))
-                address_str = data.get('PROPSTRE', '')
-                
-                context[buyer_key] = buyer_name_str
-                context[seller_key] = seller_name_str
-                context[address_key] = address_str
+                data = labels[i]
+                names = LEGACY_DERIVED_FIELDS.compute(data, ('BYRREL', 'SLRREL'))
+                context[buyer_key] = names['BYRREL']
+                context[seller_key] = names['SLRREL']
+                context[address_key] = data.get('PROPSTRE', '')
             else:
                 # Inactive label: clear placeholders by setting them to empty strings
                 context[buyer_key] = ""
@@ -768,7 +1264,9 @@ def generate_label_docx(template_path: str, output_path: str, data: dict, label_
                 context[address_key] = ""
         
         doc.render(context)
-        doc.save(output_path)
+        label_laps.lap("render")
+        TEMPLATE_CACHE.save_docx_template(doc, output_path)
+        label_laps.lap("save")
         print(f"Successfully generated label document using docxtpl: {output_path}")
         return True
 
@@ -779,21 +1277,37 @@ def generate_label_docx(template_path: str, output_path: str, data: dict, label_
         print(f"ERROR: An unexpected error occurred with docxtpl for {output_path}: {e}")
         return False
 
+
+def iter_label_sheet_paths(output_dir: str):
+    """Yields the paths of a batch's label sheets in `output_dir`: "Label Sheet <date time> (1).docx", "(2)" and so on."""
+    stamp = time.strftime("%Y-%m-%d %H%M%S")
+    sheet_number = 1
+    while True:
+        yield os.path.join(output_dir, f"Label Sheet {stamp} ({sheet_number}).docx")
+        sheet_number += 1
+
+
+def parse_pxt_text(pxt_text: str) -> dict:
+    """Parses the contents of a PXT file as `parse_pxt_to_dict` would read them from disk."""
+    data = {}
+    for line in io.StringIO(pxt_text, newline=None): # Same line splitting as a file opened in text mode
+        line = line.strip()
+        if not line or line.startswith("---"):
+            continue
+        if '=' in line: 
+            key, value = line.split('=', 1)
+            data[key.strip()] = value.strip()
+    return data
+
+
 # Helper function to parse PXT file
 def parse_pxt_to_dict(pxt_file_path):
-    data = {}
     if not os.path.exists(pxt_file_path):
         print(f"Warning: PXT file not found at {pxt_file_path}")
-        return data
+        return {}
     try:
         with open(pxt_file_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith("---"):
-                    continue
-                if '=' in line: 
-                    key, value = line.split('=', 1)
-                    data[key.strip()] = value.strip()
+            return parse_pxt_text(f.read())
     except Exception as e:
         print(f"Error parsing PXT file {pxt_file_path}: {e}")
-    return data
\ No newline at end of file
+        return {}
\ No newline at end of file
@@ -0,0 +1,76 @@
+import signal
+import threading
+from contextlib import contextmanager
+
+
+class FieldTimeout(Exception):
+    """Raised inside a field extraction that ran past its time budget."""
+
+
+def field_budget_available() -> bool:
+    """True if `FieldBudgetGuard` can enforce a budget in the calling thread."""
+    return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+
+class FieldBudgetGuard:
+    """
+    Stops a field extraction that runs longer than `budget_seconds`, so one
+    malformed PDF whose text sends a pattern into catastrophic backtracking
+    can't hang the caller.
+
+    The budget is enforced with a real-time interval timer (SIGALRM): Python's
+    regex engine checks for signals while it matches and holds the GIL the
+    whole time, so a signal is the only thing that can stop a running
+    `re.search`. That needs `signal.setitimer` and the main thread. Where either
+    is missing (Windows, worker threads) or the budget is None the guard does
+    nothing. There the budget rests on the spec's patterns being linear and each
+    field's input being cut to `ContractSpec.field_input_limit`, sized so the
+    slowest pattern finishes in time on it (tests/test_regex_scaling.py checks both).
+
+    Usage:
+        with FieldBudgetGuard(0.25) as guard:
+            try:
+                with guard.field():
+                    value = pattern.search(text)
+            except FieldTimeout:
+                value = None
+    """
+
+    def __init__(self, budget_seconds: float | None):
+        self.budget_seconds = budget_seconds
+        self.enabled = False
+        self._armed = False
+        self._previous_handler = None
+
+    def __enter__(self):
+        if self.budget_seconds and self.budget_seconds > 0 and field_budget_available():
+            self._previous_handler = signal.signal(signal.SIGALRM, self._handle_alarm)
+            self.enabled = True
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.enabled:
+            self._armed = False
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, self._previous_handler or signal.SIG_DFL)
+            self.enabled = False
+        return False
+
+    def _handle_alarm(self, signum, frame):
+        if self._armed: # A timer that fired as its field finished is ignored
+            self._armed = False
+            raise FieldTimeout()
+
+    @contextmanager
+    def field(self):
+        """Runs the block under the budget; raises FieldTimeout if it runs over."""
+        if not self.enabled:
+            yield
+            return
+        self._armed = True
+        signal.setitimer(signal.ITIMER_REAL, self.budget_seconds)
+        try:
+            yield
+        finally:
+            self._armed = False
+            signal.setitimer(signal.ITIMER_REAL, 0)
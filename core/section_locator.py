@@ -0,0 +1,93 @@
+import re
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Section:
+    """
+    A part of a contract form, found by its heading.
+
+    The section starts at the first match of `start`. It ends after the first
+    match of `end` following the start when `end` is given; otherwise it ends
+    where the next located section starts (or at the end of the text).
+    """
+    name: str
+    start: str
+    end: str | None = None
+
+
+class SectionLocator:
+    """
+    Finds every section of a form in one forward pass over the text.
+
+    The start headings are combined into a single alternation, so the text is
+    scanned once for all of them instead of once per field; each time a heading
+    is found the scan resumes from there with the headings still missing, and
+    it stops as soon as all of them are found. `end` headings are then searched
+    from their own section's start. Headings are matched case-insensitively.
+
+    The first section is taken to open the form: when it is found, the other
+    headings are only looked for after it, so cover sheets or other documents
+    in front of the contract can't pull a section's start away from the form.
+    """
+
+    def __init__(self, sections, flags: int = re.IGNORECASE):
+        self.sections = tuple(sections)
+        self.flags = flags
+        self._start_patterns = {}
+        self._end_patterns = {
+            section.name: re.compile(section.end, flags) for section in self.sections if section.end
+        }
+        self._combined(frozenset(section.name for section in self.sections)) # Fail fast on bad patterns
+
+    def _combined(self, names: frozenset) -> re.Pattern:
+        """Alternation of the start headings of `names`, compiled once per set of still-missing sections."""
+        pattern = self._start_patterns.get(names)
+        if pattern is None:
+            pattern = re.compile(
+                "|".join(f"(?P<s{i}>{section.start})" for i, section in enumerate(self.sections) if section.name in names),
+                self.flags
+            )
+            self._start_patterns[names] = pattern
+        return pattern
+
+    def locate(self, text: str) -> dict:
+        """
+        Returns section name -> (start, end) offsets into `text` for every
+        section whose heading is present.
+        """
+        if not text or not self.sections:
+            return {}
+        starts = {}
+        missing = frozenset(section.name for section in self.sections)
+        position = 0
+        opening = self.sections[0]
+        opening_match = self._combined(frozenset([opening.name])).search(text)
+        if opening_match:
+            starts[opening.name] = opening_match.start()
+            missing = missing - {opening.name}
+            position = opening_match.start() + 1
+        while missing:
+            match = self._combined(missing).search(text, position)
+            if not match:
+                break
+            name = self.sections[int(match.lastgroup[1:])].name
+            starts[name] = match.start()
+            missing = missing - {name}
+            position = match.start() + 1 # Headings may overlap
+
+        bounds = {}
+        ordered_starts = sorted(starts.values())
+        for section in self.sections:
+            if section.name not in starts:
+                continue
+            start = starts[section.name]
+            end = len(text)
+            if section.end:
+                end_match = self._end_patterns[section.name].search(text, start)
+                if end_match:
+                    end = end_match.end()
+            else:
+                end = next((other for other in ordered_starts if other > start), len(text))
+            bounds[section.name] = (start, end)
+        return bounds
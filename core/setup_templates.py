@@ -0,0 +1,140 @@
+import os
+import json
+
+import docx
+
+from core.metrics import METRICS
+
+PURCHASE_TRANSACTION = "Purchase"
+REFI_TRANSACTION = "Refi"
+CD_STATEMENT = "CD"
+HUD_STATEMENT = "HUD"
+
+DEFAULT_COMPOSITES_DIR = os.path.join(".cache", "setup_templates")
+
+_ORDER_SUMMARY_DIR = os.path.join("templates", "long")
+_CHECKLIST_DIR = os.path.join("templates", "green")
+
+# Templates merged, in order, into setupdocs.docx for each (transaction, buyer,
+# seller) choice on the processing tab. Refi disables the Seller checkbox, so
+# Refi only has a borrower (buyer) side. Combinations not listed (e.g. neither
+# side checked) get no setup documents.
+_SETUP_DOCS_SOURCES = {
+    (PURCHASE_TRANSACTION, True, True): (
+        os.path.join(_ORDER_SUMMARY_DIR, "Order Summary-RES.docx"),
+        os.path.join(_CHECKLIST_DIR, "buyer_seller.docx"),
+    ),
+    (PURCHASE_TRANSACTION, True, False): (
+        os.path.join(_ORDER_SUMMARY_DIR, "Order Summary-RES.docx"),
+        os.path.join(_CHECKLIST_DIR, "buyer_only.docx"),
+    ),
+    (PURCHASE_TRANSACTION, False, True): (
+        os.path.join(_ORDER_SUMMARY_DIR, "Order Summary-RES SELLER.docx"),
+        os.path.join(_CHECKLIST_DIR, "seller_only.docx"),
+    ),
+    (REFI_TRANSACTION, True, False): (
+        os.path.join(_ORDER_SUMMARY_DIR, "Order Summary-REFI.docx"),
+        os.path.join(_CHECKLIST_DIR, "refi.docx"),
+    ),
+}
+
+# (transaction, is_buyer, is_seller, statement) -> source templates. The
+# checklists cover both settlement statements ("CD/HUD ..."), so CD and HUD
+# cells share their sources, and their composite, until a HUD variant exists.
+SETUP_DOCS_TEMPLATE_MATRIX = {
+    (transaction, is_buyer, is_seller, statement): sources
+    for (transaction, is_buyer, is_seller), sources in _SETUP_DOCS_SOURCES.items()
+    for statement in (CD_STATEMENT, HUD_STATEMENT)
+}
+
+
+def select_setup_docs_sources(transaction: str, is_buyer: bool, is_seller: bool, statement: str = CD_STATEMENT) -> tuple[str, ...] | None:
+    """The source templates of one cell of SETUP_DOCS_TEMPLATE_MATRIX, or None if that combination has none."""
+    return SETUP_DOCS_TEMPLATE_MATRIX.get((transaction, bool(is_buyer), bool(is_seller), statement))
+
+
+def _composite_paths(sources, composites_dir: str) -> tuple[str, str]:
+    name = " + ".join(os.path.splitext(os.path.basename(source))[0] for source in sources)
+    return os.path.join(composites_dir, f"{name}.docx"), os.path.join(composites_dir, f"{name}.json")
+
+
+def _source_stamps(sources) -> list:
+    stamps = []
+    for source in sources:
+        stat = os.stat(source)
+        stamps.append([source, stat.st_mtime_ns, stat.st_size])
+    return stamps
+
+
+def _build_composite(sources, composite_path: str, manifest_path: str, stamps: list) -> None:
+    """Merges the bodies of `sources` into one document, the same way setupdocs.docx always was."""
+    with METRICS.timer("setupdocs.build"):
+        merged_document = docx.Document()
+        for source in sources:
+            source_document = docx.Document(source)
+            for element in source_document.element.body: # Iterate over top-level elements in body
+                merged_document.element.body.append(element)
+        os.makedirs(os.path.dirname(composite_path) or ".", exist_ok=True)
+        # Written under temporary names and swapped in, so concurrent builders never see half a file
+        merged_document.save(f"{composite_path}.tmp")
+        os.replace(f"{composite_path}.tmp", composite_path)
+        with open(f"{manifest_path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump({'sources': stamps}, f, indent=2)
+        os.replace(f"{manifest_path}.tmp", manifest_path)
+    METRICS.increment("setupdocs.builds")
+
+
+def get_composite_template(sources, composites_dir: str = DEFAULT_COMPOSITES_DIR) -> tuple[str | None, str | None]:
+    """
+    Returns the prebuilt composite of `sources`, building it first if it is
+    missing or any source changed (by mtime or size) since it was built.
+
+    Returns:
+        A tuple of (composite template path, error message); the path is None on error.
+    """
+    missing = [source for source in sources if not os.path.exists(source)]
+    if missing:
+        return None, f"Template '{os.path.basename(missing[0])}' not found."
+    composite_path, manifest_path = _composite_paths(sources, composites_dir)
+    try:
+        stamps = _source_stamps(sources)
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                built_from = json.load(f).get('sources')
+        except (OSError, ValueError, AttributeError):
+            built_from = None
+        if built_from != stamps or not os.path.exists(composite_path):
+            print(f"INFO: Building setup documents template {composite_path}")
+            _build_composite(sources, composite_path, manifest_path, stamps)
+        return composite_path, None
+    except Exception as e:
+        return None, f"Could not build the setup documents template from {', '.join(sources)}: {e}"
+
+
+def get_setup_docs_template(transaction: str, is_buyer: bool, is_seller: bool, statement: str = CD_STATEMENT,
+                            composites_dir: str = DEFAULT_COMPOSITES_DIR) -> tuple[str | None, str | None]:
+    """
+    Returns the composite template for the options chosen on the processing tab
+    as (path, error message). Both are None when the combination has no setup documents.
+    """
+    sources = select_setup_docs_sources(transaction, is_buyer, is_seller, statement)
+    if not sources:
+        return None, None
+    return get_composite_template(sources, composites_dir)
+
+
+def prebuild_setup_docs_templates(composites_dir: str = DEFAULT_COMPOSITES_DIR) -> tuple[int, list[str]]:
+    """
+    Brings the composite of every cell of SETUP_DOCS_TEMPLATE_MATRIX up to date,
+    so no render has to wait for one.
+
+    Returns:
+        A tuple of (number of distinct composites checked, error messages).
+    """
+    errors = []
+    distinct_sources = dict.fromkeys(SETUP_DOCS_TEMPLATE_MATRIX.values())
+    for sources in distinct_sources:
+        _, error_message = get_composite_template(sources, composites_dir)
+        if error_message:
+            errors.append(error_message)
+    return len(distinct_sources), errors
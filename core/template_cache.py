@@ -0,0 +1,129 @@
+import os
+import copy
+import threading
+from collections import OrderedDict
+
+import docx
+from docxtpl import DocxTemplate
+
+from core.metrics import METRICS
+from core.docx_writer import pack_document, write_docx
+
+DEFAULT_TEMPLATE_CACHE_SIZE = 32
+
+
+class TemplateCache:
+    """
+    Process-wide cache of parsed .docx templates, keyed by absolute path,
+    modification time and size, so a batch unzips and parses each template
+    once instead of once per contract. Every caller gets its own deep copy of
+    the cached python-docx Document to edit or render; the cached one is never
+    handed out. Editing a template on disk changes its key, so the next request
+    reloads it. At most `max_templates` are kept, least recently used evicted first.
+
+    `save` writes a document made from a cached template with `write_docx`.
+    The cached Document is re-serialized by python-docx and compressed once per
+    process and template (`pack_document`). The output's parts that serialize
+    to the same bytes reuse that compressed data instead of being compressed again.
+
+    Usage:
+        document = TEMPLATE_CACHE.document("templates/green/buyer_seller.docx")
+        label = TEMPLATE_CACHE.docx_template("templates/Label.docx")
+        label.render(context)
+        TEMPLATE_CACHE.save_docx_template(label, "Label.docx")
+    """
+
+    def __init__(self, max_templates: int = DEFAULT_TEMPLATE_CACHE_SIZE):
+        self.max_templates = max_templates
+        self._lock = threading.Lock()
+        self._documents = OrderedDict() # Absolute path -> ((mtime_ns, size), parsed Document)
+        self._packed = {} # Absolute path -> ((mtime_ns, size), pack_document() of the parsed Document)
+
+    def _parsed(self, path: str):
+        """The cached Document for `path`, loading it on a miss. Raises FileNotFoundError if the file is missing."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._documents.get(path)
+            if entry and entry[0] == key:
+                self._documents.move_to_end(path)
+                METRICS.increment("templates.hits")
+                return entry[1]
+        METRICS.increment("templates.misses")
+        with METRICS.timer("templates.load"):
+            document = docx.Document(path)
+        with self._lock:
+            self._documents[path] = (key, document)
+            self._documents.move_to_end(path)
+            while len(self._documents) > self.max_templates:
+                evicted_path, _ = self._documents.popitem(last=False)
+                self._packed.pop(evicted_path, None)
+                METRICS.increment("templates.evictions")
+        return document
+
+    def document(self, path: str):
+        """A private copy of the python-docx Document at `path`, as `docx.Document(path)` would return it."""
+        parsed = self._parsed(path)
+        with METRICS.timer("templates.clone"):
+            return copy.deepcopy(parsed)
+
+    def docx_template(self, path: str) -> DocxTemplate:
+        """A `DocxTemplate` for `path` working on a private copy of the cached Document."""
+        template = DocxTemplate(path)
+        template.docx = self.document(path)
+        return template
+
+    def _packed_template(self, path: str) -> dict:
+        """The packed members of the cached Document for `path`, packing them on first use. Empty if it is not cached."""
+        path = os.path.abspath(path)
+        with self._lock:
+            entry = self._documents.get(path)
+            packed = self._packed.get(path)
+        if entry is None:
+            return {}
+        if packed and packed[0] == entry[0]:
+            return packed[1]
+        with METRICS.timer("templates.pack"):
+            members = pack_document(entry[1])
+        with self._lock:
+            if self._documents.get(path) is entry:
+                self._packed[path] = (entry[0], members)
+        return members
+
+    def save(self, document, output_path: str, template_path: str) -> None:
+        """
+        Saves `document`, a copy handed out for `template_path`, to
+        `output_path`. Parts that serialize to the same bytes as in the packed
+        template reuse its compressed data; a stale or unrelated template only
+        costs the comparison, never correctness.
+        """
+        packed_template = self._packed_template(template_path)
+        with METRICS.timer("templates.save"):
+            compressed, copied = write_docx(document, output_path, packed_template)
+        METRICS.increment("templates.parts_compressed", compressed)
+        METRICS.increment("templates.parts_copied", copied)
+
+    def save_docx_template(self, template: DocxTemplate, output_path: str) -> None:
+        """
+        `template.save(output_path)` for a `docx_template`, through `save`.
+        Templates with pending picture, media or embedded file replacements
+        are left to docxtpl, which patches those into the written zip.
+        """
+        if (template.pics_to_replace or template.crc_to_new_media
+                or template.crc_to_new_embedded or template.zipname_to_replace):
+            template.save(output_path)
+            return
+        self.save(template.docx, output_path, template.template_file)
+        template.is_saved = True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._documents.clear()
+            self._packed.clear()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+
+TEMPLATE_CACHE = TemplateCache()
@@ -0,0 +1,185 @@
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from itertools import accumulate
+
+# One pattern for everything preprocessing changes: a DocuSign envelope ID
+# (removed), a DigitalControl marker (replaced by a space), a run of whitespace
+# and pipes holding a pipe that doesn't start a marker, or a run of two or more
+# whitespace characters. Everything between matches (words and single spaces)
+# is copied as is. Every match starts with one character of a fixed class and
+# the lookbehinds pick the branch from it, which lets the regex engine skip
+# ahead to candidates in C instead of trying every position.
+_MARKER = r"[\w-]+DigitalControl_[\w_]" # What follows a pipe that starts a marker
+_ARTIFACT_PATTERN = re.compile(
+    r"[\s|Dd]"
+    r"(?:(?<=[Dd])(?P<envelope>(?i:ocusign Envelope ID: [\w-]+\s*\f?))"
+    r"|(?<=\|)(?P<control>[\w-]+DigitalControl_[\w_]+?\s*)"
+    rf"|(?<=\|)(?:\s|\|(?!{_MARKER}))*"
+    rf"|(?<=\s)(?:\s*\|(?!{_MARKER})(?:\s|\|(?!{_MARKER}))*|\s+))"
+)
+_PIPE_WITH_SPACE_PATTERNS = (
+    re.compile(r"\s+\|\s+"),
+    re.compile(r"\|\s+"),
+    re.compile(r"\s+\|"),
+)
+_MULTIPLE_SPACES_PATTERN = re.compile(r"\s{2,}")
+
+
+@lru_cache(maxsize=1024)
+def _clean_gap(gap: str) -> tuple[str, str]:
+    """
+    Returns the sensitive and space-normalized forms of one run of whitespace
+    and pipes (markers already turned into spaces, envelope IDs dropped): pipes
+    next to whitespace are replaced by a space, in the order the rules are
+    listed, then runs of whitespace are collapsed for the second form. The
+    rules only ever match whitespace and pipes, so applying them to each run on
+    its own is the same as applying them to the whole text. Runs repeat a lot
+    (line breaks, page breaks, column gaps), hence the cache.
+    """
+    if "|" in gap:
+        for pattern in _PIPE_WITH_SPACE_PATTERNS:
+            gap = pattern.sub(" ", gap)
+    return gap, _MULTIPLE_SPACES_PATTERN.sub(" ", gap)
+
+
+def _iter_normalized_pieces(text: str):
+    """
+    Yields (sensitive piece, normalized piece, raw offset, exact) for `text` in
+    order, without stripping the ends. `exact` is True when the pieces are a
+    verbatim copy of the raw text starting at the offset.
+    """
+    position = 0
+    gap_parts = []
+    gap_start = 0
+    for match in _ARTIFACT_PATTERN.finditer(text):
+        kind = match.lastgroup # 'envelope', 'control' or None for whitespace and pipes
+        lead = ""
+        if match.start() > position:
+            literal = text[position:match.start()]
+            if kind: # Whitespace before an ID or marker merges with what replaces it
+                kept = literal.rstrip()
+                literal, lead = kept, literal[len(kept):]
+            if literal: # Copied text ends any pending gap
+                if gap_parts:
+                    sensitive, normalized = _clean_gap("".join(gap_parts))
+                    yield sensitive, normalized, gap_start, False
+                    gap_parts = []
+                yield literal, literal, position, True
+        if not gap_parts:
+            gap_start = match.start() - len(lead)
+        if kind == 'control':
+            gap_parts.append(lead + " ")
+        elif kind == 'envelope':
+            gap_parts.append(lead) # The ID itself just joins what surrounds it
+        else:
+            gap_parts.append(match.group())
+        position = match.end()
+    if gap_parts:
+        sensitive, normalized = _clean_gap("".join(gap_parts))
+        yield sensitive, normalized, gap_start, False
+    if position < len(text):
+        literal = text[position:]
+        yield literal, literal, position, True
+
+
+class _OffsetMap:
+    """Maps offsets in one normalized view back to the raw text."""
+
+    def __init__(self, view_starts, raw_starts, exact):
+        self._view_starts = view_starts
+        self._raw_starts = raw_starts
+        self._exact = exact
+
+    def to_raw(self, index: int) -> int:
+        piece = bisect_right(self._view_starts, index) - 1
+        if piece < 0:
+            return 0
+        if self._exact[piece]:
+            return self._raw_starts[piece] + index - self._view_starts[piece]
+        return self._raw_starts[piece] # Rewritten whitespace maps to where it began
+
+
+@dataclass(frozen=True)
+class NormalizedText:
+    """
+    The preprocessed views of one document, built in a single pass over the
+    raw text by `normalize_text_views`:
+
+    - sensitive: DocuSign envelope IDs, DigitalControl markers and pipe
+      characters removed, spacing kept, ends stripped.
+    - clean: the same with every run of whitespace collapsed to one space.
+
+    `raw_offset(view, index)` maps a position in either view back to the raw
+    text (positions inside rewritten whitespace map to where that run began).
+    The offset maps are only built, from the raw text, the first time one is needed.
+    """
+    sensitive: str
+    clean: str
+    raw: str
+
+    def views(self) -> dict:
+        return {'sensitive': self.sensitive, 'clean': self.clean}
+
+    @cached_property
+    def _offset_maps(self) -> dict:
+        pieces = list(_iter_normalized_pieces(self.raw))
+        raw_starts = [piece[2] for piece in pieces]
+        exact = [piece[3] for piece in pieces]
+        offset_maps = {}
+        for view, column in (('sensitive', 0), ('clean', 1)):
+            parts = [piece[column] for piece in pieces]
+            joined = "".join(parts)
+            view_starts = list(accumulate(map(len, parts), initial=len(joined.lstrip()) - len(joined)))
+            view_starts.pop()
+            offset_maps[view] = _OffsetMap(view_starts, raw_starts, exact)
+        return offset_maps
+
+    def raw_offset(self, view: str, index: int) -> int:
+        return self._offset_maps[view].to_raw(index)
+
+
+def normalize_text_views(text: str) -> NormalizedText:
+    """Builds the sensitive and clean views of `text` (see NormalizedText) in one pass."""
+    text = text or ""
+    pieces = list(_iter_normalized_pieces(text))
+    return NormalizedText(
+        "".join([piece[0] for piece in pieces]).strip(),
+        "".join([piece[1] for piece in pieces]).strip(),
+        text,
+    )
+
+
+def _remove_docusign_artifacts(text):
+    """Removes DocuSign IDs, DigitalControls and pipe chars, without stripping the ends."""
+    return "".join(sensitive for sensitive, _, _, _ in _iter_normalized_pieces(text))
+
+
+def preprocess_text_initial(text):
+    """
+    Initial preprocessing: Removes DocuSign IDs, DigitalControls, pipe chars.
+    DOES NOT NORMALIZE MULTIPLE SPACES TO ONE.
+    """
+    if text is None:
+        return None
+    return _remove_docusign_artifacts(text).strip()
+
+
+
+def normalize_multiple_spaces_in_text(text_segment):
+    """Utility to reduce multiple spaces to one for text segments."""
+    if text_segment is None:
+        return None
+    return _MULTIPLE_SPACES_PATTERN.sub(" ", text_segment)
+
+
+
+def preprocess_text_globally(text):
+    """
+    General preprocessing: Applies initial cleaning and then normalizes multiple spaces.
+    This is a global cleaner used before detailed parsing.
+    """
+    if text is None:
+        return None
+    return "".join(clean for _, clean, _, _ in _iter_normalized_pieces(text)).strip()
@@ -1,7 +1,9 @@
 import os 
 import sys
 
-def create_standard_dirs(root_folder=r"C:\Users\shawk\Desktop\a.1"):
+DEFAULT_ROOT_FOLDER = r"C:\Users\shawk\Desktop\a.1"
+
+def create_standard_dirs(root_folder=DEFAULT_ROOT_FOLDER):
     """
     Creates standard subdirectories for the application.
     Based on user-provided one-liner (adapted for clarity in docstring):
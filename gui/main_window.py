@@ -1,5 +1,6 @@
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
@@ -15,13 +16,34 @@ from PyQt6.QtGui import QAction, QPalette, QColor
 # --- Import functions from processing_logic.py ---
 from core.processing_logic import check_folder_exists
 from core.processing_logic import get_initial_legacy_folder_name_and_data
+from core.processing_logic import quick_look_legacy_folder_name
+from core.processing_logic import start_legacy_full_parse
+from core.processing_logic import finish_legacy_full_parse
 from core.processing_logic import handle_legacy_contract_processing
+from core.processing_logic import regenerate_legacy_contract_outputs
+from core.processing_logic import iter_legacy_contract_batch_processing
 from core.processing_logic import copy_pdf_to_folder
+from core.pdf_placement import get_placement_methods
+from core.pdf_buffer import PdfBuffer
 from core.processing_logic import get_all_legacy_contract_field_names
+from core.processing_logic import get_extraction_profile
+from core.processing_logic import LEGACY_DERIVED_FIELDS
+from core.processing_logic import CONTRACT_TYPES
+from core.processing_logic import CLOSINGS_ROOT
+from core.processing_logic import classify_contract_pdf
+from core.processing_logic import get_contract_output_dir
+from core.contract_types import OTHER_CONTRACT_TYPE
+from core.extraction_cache import create_extraction_cache
+from core.form_layouts import create_form_layout_store
+from core.pattern_stats import create_pattern_stats_store
+from core.setup_templates import CD_STATEMENT, HUD_STATEMENT, PURCHASE_TRANSACTION, REFI_TRANSACTION
+from core.setup_templates import prebuild_setup_docs_templates
+from core.legacy_contract_spec import LEGACY_CONTRACT_SPEC
+from core.metrics import METRICS, export_metrics_for_config
 
 # --- Import custom GUI components ---
 from gui.widgets import CustomComboBox, PDFListWidget # Ensure correct relative import
-from gui.tabs.processing_tab import create_processing_tab
+from gui.tabs.processing_tab import AUTO_DETECT_CONTRACT_TYPE, create_processing_tab
 from gui.tabs.data_viewer_tab import create_data_viewer_tab
 
 
@@ -30,15 +52,29 @@ class ContractProcessorApp(QMainWindow):
     def __init__(self, config, parent=None): # Added config parameter
         super().__init__(parent) # Pass parent if using one
         self.config = config # Store the config
+        self.extraction_cache = create_extraction_cache(config)
+        self.form_layouts = create_form_layout_store(config)
+        self.pattern_stats = create_pattern_stats_store(config)
+        if self.pattern_stats:
+            LEGACY_CONTRACT_SPEC.set_pattern_order(self.pattern_stats.pattern_order(LEGACY_CONTRACT_SPEC))
         self.setWindowTitle("Contract Processing Application")
         self.setGeometry(100, 100, 900, 700)
 
         # It's generally better to set the style once in main.py on the QApplication instance
         # QApplication.setStyle("Fusion") # If you want to force Fusion style
 
+        self.extracted_data_cache = None
+        self.derived_data_cache = {} # BYRREL, SLRREL, FOLDERNAME of extracted_data_cache
+        self.dirty_outputs = set() # Outputs out of date after edits in the viewer
+        self.legacy_output = None # Folder and options of the contract whose outputs dirty_outputs refers to
+        self.derived_rows = {} # Derived field -> its row in the Extracted Data Viewer
+        self.background_pool = None # Parses contracts while the operator answers dialogs; started on first use
         self.init_ui() 
+        composites_checked, template_errors = prebuild_setup_docs_templates()
+        for template_error in template_errors:
+            self.log_message(f"Setup documents template unavailable: {template_error}", "WARNING")
+        self.log_message(f"{composites_checked - len(template_errors)} setup documents template(s) ready.", "DEBUG")
         self.log_message("Application initialized. Ready.")
-        self.extracted_data_cache = None
 
     def init_ui(self):
         central_widget = QWidget()
@@ -92,10 +128,8 @@ class ContractProcessorApp(QMainWindow):
         help_menu.addAction(about_action)
 
     def _update_output_directory_for_contract_type(self, contract_type_text):
-        if contract_type_text == "Legacy":
-            self.output_dir_edit.setText("C:/Closings/Legacy Seller")
-        else:
-            self.output_dir_edit.setText("C:/Closings")
+        # Auto-detect gets the closings root; each type's folder is added per PDF
+        self.output_dir_edit.setText(get_contract_output_dir(contract_type_text))
 
     def _select_output_directory(self):
         dir_path = QFileDialog.getExistingDirectory(
@@ -106,11 +140,14 @@ class ContractProcessorApp(QMainWindow):
             self.output_dir_edit.setText(dir_path)
             self.log_message(f"Output directory selected: {dir_path}")
 
+    def _get_pdf_file_list(self) -> list[str]:
+        return [self.pdf_list_widget.item(i).text() for i in range(self.pdf_list_widget.count())]
+
     def _get_and_validate_processing_inputs(self):
         contract_type = self.contract_type_combo.currentText()
         generate_label = self.chk_generate_file_label.isChecked()
         generate_docs = self.chk_generate_setup_docs.isChecked()
-        pdfs_list = [self.pdf_list_widget.item(i).text() for i in range(self.pdf_list_widget.count())]
+        pdfs_list = self._get_pdf_file_list()
         single_pdf_file = pdfs_list[0] if pdfs_list else None
         output_dir = self.output_dir_edit.text()
         is_buyer_checked = self.chk_buyer.isChecked()
@@ -131,6 +168,13 @@ class ContractProcessorApp(QMainWindow):
         
         return contract_type, single_pdf_file, output_dir, generate_label, generate_docs, is_buyer_checked, is_seller_checked
 
+    def _setup_docs_options(self) -> dict:
+        """The Purchase/Refi and CD/HUD choices, as keyword arguments of the core processing functions."""
+        return {
+            'transaction': REFI_TRANSACTION if self.rb_refi.isChecked() else PURCHASE_TRANSACTION,
+            'statement': HUD_STATEMENT if self.rb_hud.isChecked() else CD_STATEMENT,
+        }
+
     def _negotiate_legacy_folder_name(self, output_dir: str, proposed_folder_name: str, extracted_data: dict) -> str | None:
         target_path = os.path.join(output_dir, proposed_folder_name)
         final_folder_name = proposed_folder_name
@@ -165,16 +209,72 @@ class ContractProcessorApp(QMainWindow):
                 self.log_message(f"Proceeding with overwriting folder: {proposed_folder_name}", "INFO")
         return final_folder_name
 
-    def _handle_legacy_processing(self, single_pdf_file: str, output_dir: str, is_buyer_checked: bool, is_seller_checked: bool):
+    def _legacy_output_options(self, folder_path: str, is_buyer_checked: bool, is_seller_checked: bool, label_sheet: str | None = None) -> dict:
+        """What `_regenerate_dirty_outputs` needs to re-render the outputs written to `folder_path`."""
+        return {
+            'folder_path': folder_path,
+            'is_buyer_checked': is_buyer_checked,
+            'is_seller_checked': is_seller_checked,
+            'label_sheet': label_sheet,
+            **self._setup_docs_options(),
+        }
+
+    def _get_background_pool(self) -> ProcessPoolExecutor:
+        if self.background_pool is None:
+            self.background_pool = ProcessPoolExecutor(max_workers=1)
+        return self.background_pool
+
+    def closeEvent(self, event):
+        if self.background_pool is not None:
+            self.background_pool.shutdown(wait=False, cancel_futures=True)
+        super().closeEvent(event)
+
+    def _handle_legacy_processing(self, single_pdf_file, output_dir: str, is_buyer_checked: bool, is_seller_checked: bool):
+        """`single_pdf_file` is a path, or a `PdfBuffer` when the PDF was already read (e.g. to classify it)."""
         self.log_message(f"Initiating Legacy processing for: {single_pdf_file}. Buyer: {is_buyer_checked}, Seller: {is_seller_checked}", "INFO")
-        proposed_folder_name, extracted_data, error_message = get_initial_legacy_folder_name_and_data(single_pdf_file)
+        self.legacy_output = None
+        profile = get_extraction_profile(self.config)
+        # Read once: the quick look, the full parse and the copy all use this buffer
+        if isinstance(single_pdf_file, PdfBuffer):
+            pdf = single_pdf_file
+        else:
+            try:
+                pdf = PdfBuffer.read(single_pdf_file)
+            except OSError as e:
+                self.log_message(f"Could not read {single_pdf_file}: {e}", "ERROR")
+                self.show_warning(f"Could not read {single_pdf_file}: {e}")
+                return
+        single_pdf_file = pdf.path
+        # The full parse runs in the background while the quick look gets the
+        # folder name and any overwrite/rename question is put to the operator
+        full_parse = start_legacy_full_parse(
+            self._get_background_pool(), pdf, cache=self.extraction_cache, profile=profile,
+            layouts=self.form_layouts
+        )
+        quick_folder_name, _, quick_error = quick_look_legacy_folder_name(
+            pdf, cache=self.extraction_cache, profile=profile
+        )
+        final_folder_name_for_processing = None
+        if quick_folder_name:
+            final_folder_name_for_processing = self._negotiate_legacy_folder_name(output_dir, quick_folder_name, None)
+        else:
+            self.log_message(f"Quick look could not name the folder ({quick_error}); waiting for the full parse.", "DEBUG")
+        proposed_folder_name, extracted_data, error_message = finish_legacy_full_parse(full_parse, single_pdf_file)
         self.extracted_data_cache = extracted_data
+        if self.extraction_cache:
+            self.log_message(f"Extraction cache stats: {self.extraction_cache.stats()}", "DEBUG")
         if error_message or not proposed_folder_name:
             self.log_message(f"Failed to get proposed folder name or parse data: {error_message}", "ERROR")
             self.show_warning(f"Could not determine folder name or parse essential data: {error_message}")
             if extracted_data: self.update_extracted_data_viewer(extracted_data)
             return
-        final_folder_name_for_processing = self._negotiate_legacy_folder_name(output_dir, proposed_folder_name, extracted_data)
+        if not quick_folder_name or (final_folder_name_for_processing == quick_folder_name and proposed_folder_name != quick_folder_name):
+            # No quick-look name, or the full parse disagrees with the name the operator accepted
+            if quick_folder_name:
+                self.log_message(f"Full parse names the folder '{proposed_folder_name}', not '{quick_folder_name}'.", "WARNING")
+            final_folder_name_for_processing = self._negotiate_legacy_folder_name(output_dir, proposed_folder_name, extracted_data)
+        elif not final_folder_name_for_processing:
+            self.update_extracted_data_viewer(extracted_data)
         if not final_folder_name_for_processing:
             return
         self.log_message(f"Calling core processing for folder: {final_folder_name_for_processing}", "INFO")
@@ -185,12 +285,15 @@ class ContractProcessorApp(QMainWindow):
             extracted_data_from_gui=extracted_data,
             is_buyer_checked=is_buyer_checked,
             is_seller_checked=is_seller_checked,
-            config=self.config # Pass the config
+            config=self.config, # Pass the config
+            **self._setup_docs_options()
         )
         if created_path:
             self.log_message(f"SUCCESS (Legacy Folder Structure): {message}", "INFO")
+            self.legacy_output = self._legacy_output_options(created_path, is_buyer_checked, is_seller_checked)
             pdf_filename_to_copy = os.path.basename(single_pdf_file)
-            copy_success, copy_message = copy_pdf_to_folder(single_pdf_file, created_path, pdf_filename_to_copy)
+            copy_success, copy_message = copy_pdf_to_folder(pdf, created_path, pdf_filename_to_copy,
+                                                            get_placement_methods(self.config))
             if copy_success:
                 self.log_message(copy_message, "INFO")
                 QMessageBox.information(self, "Processing Complete",
@@ -206,6 +309,118 @@ class ContractProcessorApp(QMainWindow):
             self.show_warning(f"Legacy processing failed: {message}")
         self.update_extracted_data_viewer(extracted_data)
 
+    def _handle_legacy_batch_processing(self, pdf_files: list[str], output_dir: str, is_buyer_checked: bool, is_seller_checked: bool):
+        self.log_message(f"Initiating Legacy batch processing for {len(pdf_files)} PDFs. Buyer: {is_buyer_checked}, Seller: {is_seller_checked}", "INFO")
+        succeeded = 0
+        last_extracted_data = None
+        label_sheets = []
+        results = iter_legacy_contract_batch_processing(
+            pdf_files, output_dir, is_buyer_checked, is_seller_checked, self.config,
+            cache=self.extraction_cache, profile=get_extraction_profile(self.config),
+            layouts=self.form_layouts, label_sheets=self.config.get('batch_label_sheets', True),
+            **self._setup_docs_options()
+        )
+        for done, result in enumerate(results, start=1):
+            pdf_name = os.path.basename(result['pdf_file_path'])
+            if result['success']:
+                succeeded += 1
+                self.log_message(f"SUCCESS (Legacy Batch) {pdf_name}: {result['message']}", "INFO")
+            else:
+                self.log_message(f"ERROR (Legacy Batch) {pdf_name}: {result['message']}", "ERROR")
+            if result['extracted_data']:
+                last_extracted_data = result['extracted_data']
+                # The viewer shows this contract; its outputs can be regenerated if they were written
+                self.legacy_output = self._legacy_output_options(
+                    result['folder_path'], is_buyer_checked, is_seller_checked, result['label_sheet']
+                ) if result['success'] else None
+            if result['label_sheet'] and result['label_sheet'] not in label_sheets:
+                label_sheets.append(result['label_sheet'])
+            self.progress_bar.setValue(int(done * 100 / len(pdf_files)))
+            QApplication.processEvents() # Keep the window responsive between results
+        summary = f"Processed {len(pdf_files)} PDFs: {succeeded} succeeded, {len(pdf_files) - succeeded} failed or skipped."
+        if label_sheets:
+            summary += f"\nLabels: {len(label_sheets)} sheet(s) in '{output_dir}'."
+            self.log_message(f"Label sheets: {', '.join(os.path.basename(path) for path in label_sheets)}", "INFO")
+        self.log_message(summary, "INFO")
+        QMessageBox.information(self, "Batch Processing Complete", summary)
+        self.extracted_data_cache = last_extracted_data
+        if last_extracted_data: self.update_extracted_data_viewer(last_extracted_data)
+
+    def _handle_legacy_contracts(self, pdf_files: list, output_dir: str, is_buyer_checked: bool, is_seller_checked: bool):
+        if len(pdf_files) > 1:
+            self._handle_legacy_batch_processing(pdf_files, output_dir, is_buyer_checked, is_seller_checked)
+        else:
+            self._handle_legacy_processing(pdf_files[0], output_dir, is_buyer_checked, is_seller_checked)
+
+    def _contract_type_handlers(self) -> dict:
+        """Contract type name -> method processing a list of PDFs (paths or `PdfBuffer`s) of that type."""
+        return {"Legacy": self._handle_legacy_contracts}
+
+    def _ask_contract_type(self, pdf_file: str, type_names: list[str]) -> str:
+        """Asks the operator how to process a PDF the classifier could not place; cancelling returns Other (skip)."""
+        choices = type_names + [OTHER_CONTRACT_TYPE]
+        type_name, ok = QInputDialog.getItem(
+            self, "Contract Type Not Detected",
+            f"The contract type of '{os.path.basename(pdf_file)}' could not be detected from its first page\n"
+            "(a scan or a cover page?). Process it as:",
+            choices, 0, False
+        )
+        return type_name if ok else OTHER_CONTRACT_TYPE
+
+    def _handle_auto_detected_processing(self, pdf_files: list[str], output_root: str, is_buyer_checked: bool, is_seller_checked: bool):
+        """
+        Classifies every PDF from its first page, then processes each type's
+        PDFs together with that type's handler. With the default closings root
+        each type goes to its own folder under it; a directory the operator
+        picked is used as given. The operator is asked about PDFs the
+        classifier could not place; PDFs of a type without a parser are
+        reported and skipped.
+        """
+        handlers = self._contract_type_handlers()
+        per_type_dirs = os.path.normpath(output_root) == os.path.normpath(CLOSINGS_ROOT)
+        pdfs_by_type = {}
+        for pdf_file in pdf_files:
+            # Read once: the classifier and the type's handler both use this buffer
+            try:
+                pdf = PdfBuffer.read(pdf_file)
+            except OSError as e:
+                self.log_message(f"Could not read {pdf_file}; skipped: {e}", "ERROR")
+                continue
+            contract_type, error_message = classify_contract_pdf(pdf)
+            if error_message:
+                self.log_message(error_message, "ERROR")
+            if contract_type:
+                type_name = contract_type.name
+                self.log_message(f"Detected contract type of {os.path.basename(pdf_file)}: {type_name}", "INFO")
+            else:
+                type_name = self._ask_contract_type(pdf_file, list(handlers))
+                self.log_message(f"Contract type of {os.path.basename(pdf_file)} not detected; operator chose: {type_name}", "INFO")
+            pdfs_by_type.setdefault(type_name, []).append(pdf)
+            QApplication.processEvents()
+        for type_name, type_pdf_files in pdfs_by_type.items():
+            handler = handlers.get(type_name)
+            if handler is None:
+                names = ", ".join(os.path.basename(pdf.path) for pdf in type_pdf_files)
+                self.log_message(f"Processing logic for '{type_name}' is not yet implemented; skipped: {names}", "WARNING")
+                continue
+            type_output_dir = get_contract_output_dir(type_name, output_root) if per_type_dirs else output_root
+            self.log_message(f"Processing {len(type_pdf_files)} {type_name} PDF(s) into {type_output_dir}", "INFO")
+            handler(type_pdf_files, type_output_dir, is_buyer_checked, is_seller_checked)
+
+    def _export_run_metrics(self, pdf_files: list[str], contract_type: str = "Legacy"):
+        self.log_message(f"Stage timings for this run:\n{METRICS.format_text()}", "DEBUG")
+        if self.pattern_stats:
+            self.pattern_stats.record_metrics(LEGACY_CONTRACT_SPEC, METRICS.snapshot())
+            LEGACY_CONTRACT_SPEC.set_pattern_order(self.pattern_stats.pattern_order(LEGACY_CONTRACT_SPEC))
+            self.log_message(f"Pattern statistics:\n{self.pattern_stats.format_text(LEGACY_CONTRACT_SPEC)}", "DEBUG")
+        metrics_path, error_message = export_metrics_for_config(
+            self.config, label=f"{contract_type} run over {len(pdf_files)} PDF(s): " + ", ".join(os.path.basename(p) for p in pdf_files)
+        )
+        if error_message:
+            self.log_message(error_message, "WARNING")
+        elif metrics_path:
+            self.log_message(f"Metrics snapshot saved to {metrics_path}", "INFO")
+
     def _start_processing_placeholder(self):
         inputs = self._get_and_validate_processing_inputs()
         if inputs is None or not all(inputs) or any(val is None for val in inputs): # More robust check
@@ -218,13 +433,23 @@ class ContractProcessorApp(QMainWindow):
         self.log_message(f"  Generate Docs: {generate_docs}")
         self.log_message(f"  Is Buyer: {is_buyer_checked}")
         self.log_message(f"  Is Seller: {is_seller_checked}") # Will reflect disabled state if Refi
-        self.log_message(f"  PDF: {single_pdf_file}")
+        self.log_message(f"  Setup Docs: {self._setup_docs_options()}")
+        self.log_message(f"  PDF: {single_pdf_file}" + (f" (+{self.pdf_list_widget.count() - 1} more)" if self.pdf_list_widget.count() > 1 else ""))
         self.log_message(f"  Output Dir: {output_dir}")
         self.progress_bar.setVisible(True)
         self.progress_bar.setRange(0, 100)
         self.status_label.setText(f"Processing {contract_type}...")
-        if contract_type == "Legacy":
-            self._handle_legacy_processing(single_pdf_file, output_dir, is_buyer_checked, is_seller_checked)
+        pdf_files = self._get_pdf_file_list()
+        handler = self._contract_type_handlers().get(contract_type)
+        if contract_type == AUTO_DETECT_CONTRACT_TYPE or handler:
+            METRICS.reset() # Each exported snapshot covers one processing run
+            self.legacy_output = None
+        if contract_type == AUTO_DETECT_CONTRACT_TYPE:
+            self._handle_auto_detected_processing(pdf_files, output_dir, is_buyer_checked, is_seller_checked)
+            self._export_run_metrics(pdf_files, contract_type)
+        elif handler:
+            handler(pdf_files, output_dir, is_buyer_checked, is_seller_checked)
+            self._export_run_metrics(pdf_files, contract_type)
         else:
             self.log_message(f"Processing logic for '{contract_type}' is not yet implemented.", "WARNING")
             self.log_message(f"  (For non-Legacy: Buyer: {is_buyer_checked}, Seller: {is_seller_checked})", "DEBUG") 
@@ -245,6 +470,8 @@ class ContractProcessorApp(QMainWindow):
         for row in range(self.data_table.rowCount()):
             label_item = self.data_table.item(row, 0)
             value_item = self.data_table.item(row, 1)
+            if label_item and label_item.text() in LEGACY_DERIVED_FIELDS.derived_fields:
+                continue # Shown for reference; computed again from the extracted fields
             if label_item and value_item:
                 table_data[label_item.text()] = value_item.text()
             elif label_item:
@@ -282,8 +509,14 @@ class ContractProcessorApp(QMainWindow):
             self.data_table.setRowCount(0)
             self.log_message("No data to display in viewer.", "INFO")
             return
+        try:
+            self.derived_data_cache = LEGACY_DERIVED_FIELDS.compute(data_to_use)
+        except Exception as e: # e.g. a buyer name that was never found
+            self.derived_data_cache = {}
+            self.log_message(f"Could not compute derived fields: {e}", "DEBUG")
+        self.data_table.blockSignals(True) # Filling the table isn't an edit
         self.data_table.setRowCount(0) # Clear previous items
-        self.data_table.setRowCount(len(data_to_use))
+        self.data_table.setRowCount(len(data_to_use) + len(self.derived_data_cache))
         row = 0
         for key, value in data_to_use.items():
             key_item = QTableWidgetItem(str(key))
@@ -292,10 +525,87 @@ class ContractProcessorApp(QMainWindow):
             self.data_table.setItem(row, 0, key_item)
             self.data_table.setItem(row, 1, value_item)
             row += 1
+        # Derived values follow the extracted ones, read-only: edits go to the fields they come from
+        self.derived_rows = {}
+        for name, value in self.derived_data_cache.items():
+            key_item = QTableWidgetItem(name)
+            value_item = QTableWidgetItem(str(value) if value is not None else "")
+            inputs = ", ".join(LEGACY_DERIVED_FIELDS.derived_fields[name].inputs)
+            for derived_item in (key_item, value_item):
+                derived_item.setFlags(derived_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+                derived_item.setToolTip(f"Derived from {inputs}")
+                derived_item.setForeground(QColor("gray"))
+            self.data_table.setItem(row, 0, key_item)
+            self.data_table.setItem(row, 1, value_item)
+            self.derived_rows[name] = row
+            row += 1
+        self.data_table.blockSignals(False)
+        self.dirty_outputs = set()
+        self.btn_regenerate_outputs.setEnabled(False)
         self.log_message(f"Displayed {len(data_to_use)} items in Extracted Data Viewer.", "INFO")
         if hasattr(self, 'data_viewer_tab'): # Check if tab exists
             self.tab_widget.setCurrentWidget(self.data_viewer_tab)
 
+    def _on_extracted_value_edited(self, item):
+        """Recomputes only the derived fields depending on the edited cell, shows them and marks the outputs showing them dirty."""
+        if item.column() != 1 or self.extracted_data_cache is None:
+            return
+        key_item = self.data_table.item(item.row(), 0)
+        if not key_item:
+            return
+        field_name = key_item.text()
+        self.extracted_data_cache[field_name] = item.text()
+        try:
+            recomputed, dirty = LEGACY_DERIVED_FIELDS.recompute(self.extracted_data_cache, self.derived_data_cache, {field_name})
+        except Exception as e:
+            self.log_message(f"Could not recompute the fields depending on {field_name}: {e}", "WARNING")
+            return
+        self.dirty_outputs.update(dirty)
+        self.data_table.blockSignals(True) # Showing a recomputed value isn't an edit
+        for name, value in recomputed.items():
+            if name in self.derived_rows:
+                self.data_table.item(self.derived_rows[name], 1).setText(str(value) if value is not None else "")
+            self.log_message(f"{field_name} edited: {name} is now '{value}'", "DEBUG")
+        self.data_table.blockSignals(False)
+        if dirty:
+            self.log_message(f"{field_name} edited; out of date: {', '.join(sorted(self.dirty_outputs))}", "INFO")
+        self.btn_regenerate_outputs.setEnabled(bool(self.dirty_outputs) and self.legacy_output is not None)
+
+    def _regenerate_dirty_outputs(self):
+        """Re-renders only the outputs of the last processed contract that edits in the viewer made out of date."""
+        if not self.dirty_outputs:
+            self.log_message("No outputs are out of date.", "INFO")
+            return
+        if self.legacy_output is None:
+            self.show_warning("The contract shown was not processed into a folder; there is nothing to regenerate.")
+            return
+        outputs = set(self.dirty_outputs)
+        if self.legacy_output['label_sheet'] and "Label.docx" in outputs:
+            outputs.discard("Label.docx")
+            self.log_message(f"The label is on the shared sheet {self.legacy_output['label_sheet']}; it is not regenerated.", "WARNING")
+        folder_path, regenerated, error_message = regenerate_legacy_contract_outputs(
+            self.legacy_output['folder_path'],
+            self.extracted_data_cache,
+            outputs,
+            self.legacy_output['is_buyer_checked'],
+            self.legacy_output['is_seller_checked'],
+            config=self.config,
+            transaction=self.legacy_output['transaction'],
+            statement=self.legacy_output['statement']
+        )
+        self.legacy_output['folder_path'] = folder_path
+        self.dirty_outputs.difference_update(regenerated)
+        if self.legacy_output['label_sheet']:
+            self.dirty_outputs.discard("Label.docx")
+        self.btn_regenerate_outputs.setEnabled(bool(self.dirty_outputs))
+        if regenerated:
+            self.log_message(f"Regenerated {', '.join(regenerated)} in {folder_path}", "INFO")
+        if error_message:
+            self.log_message(f"Could not regenerate all outputs: {error_message}", "ERROR")
+            self.show_warning(f"Could not regenerate all outputs: {error_message}")
+        else:
+            QMessageBox.information(self, "Outputs Regenerated", f"Regenerated {', '.join(regenerated)} in:\n{folder_path}")
+
     def _show_about_dialog(self):
         QMessageBox.about(
             self, "About Contract Processing Application",
@@ -35,11 +35,18 @@ def create_data_viewer_tab(main_window_instance):
         main_window_instance.data_table.setItem(row, 0, label_item)
         main_window_instance.data_table.setItem(row, 1, value_item)
         
+    main_window_instance.data_table.itemChanged.connect(main_window_instance._on_extracted_value_edited)
     layout.addWidget(main_window_instance.data_table)
 
     buttons_layout = QHBoxLayout()
     buttons_layout.addStretch(1)
 
+    main_window_instance.btn_regenerate_outputs = QPushButton("Regenerate Outputs")
+    main_window_instance.btn_regenerate_outputs.setEnabled(False) # Enabled once an edit makes an output out of date
+    main_window_instance.btn_regenerate_outputs.setToolTip("Re-render only the outputs of the last processed contract that the edits made out of date.")
+    main_window_instance.btn_regenerate_outputs.clicked.connect(main_window_instance._regenerate_dirty_outputs)
+    buttons_layout.addWidget(main_window_instance.btn_regenerate_outputs)
+
     main_window_instance.btn_save_changes = QPushButton("Save Changes")
     main_window_instance.btn_save_changes.setEnabled(True) # Enable the button
     main_window_instance.btn_save_changes.setToolTip("Save the current table data to a .pxt file.")
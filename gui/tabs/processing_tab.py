@@ -6,8 +6,13 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt
 
+from core.contract_types import OTHER_CONTRACT_TYPE
+from core.processing_logic import CLOSINGS_ROOT, CONTRACT_TYPES
 from ..widgets import CustomComboBox, PDFListWidget
 
+# Contract type selector entry that classifies each PDF from its first page.
+AUTO_DETECT_CONTRACT_TYPE = "Auto-detect"
+
 
 def create_processing_tab(main_window_instance):
     processing_tab = QWidget()
@@ -21,16 +26,18 @@ def create_processing_tab(main_window_instance):
     main_window_instance.contract_type_combo = CustomComboBox()
     main_window_instance.contract_type_combo.setPlaceholderText("Select or type contract type...")
     main_window_instance.contract_type_combo.setEditable(False)
-    main_window_instance.contract_type_combo.addItems(["Legacy", "MS Assoc. of Realtors", "Other"])
-    main_window_instance.contract_type_combo.setCurrentText("Legacy")
-    main_window_instance.contract_type_combo.setToolTip("Select the type of contract being processed.")
+    main_window_instance.contract_type_combo.addItems([AUTO_DETECT_CONTRACT_TYPE] + CONTRACT_TYPES.names() + [OTHER_CONTRACT_TYPE])
+    main_window_instance.contract_type_combo.setCurrentText(AUTO_DETECT_CONTRACT_TYPE)
+    main_window_instance.contract_type_combo.setToolTip(
+        "Select the type of contract being processed, or let it be detected from each PDF's first page."
+    )
     form_layout.addRow(QLabel("Contract Type:"), main_window_instance.contract_type_combo)
     layout.addLayout(form_layout)
 
     main_window_instance.output_dir_edit = QLineEdit()
     main_window_instance.output_dir_edit.setPlaceholderText("Select directory...")
     main_window_instance.output_dir_edit.setReadOnly(False)
-    main_window_instance.output_dir_edit.setText("C:/Closings/Legacy Seller")
+    main_window_instance.output_dir_edit.setText(CLOSINGS_ROOT)
 
     main_window_instance.contract_type_combo.currentTextChanged.connect(main_window_instance._update_output_directory_for_contract_type)
 
@@ -28,9 +28,13 @@ class PDFListWidget(QListWidget):
     # Ensure this method is correctly indented as part of the class
     def _replace_current_pdf(self, new_file_path):
         """Helper to clear and add the new PDF."""
+        self._replace_current_pdfs([new_file_path])
+
+    def _replace_current_pdfs(self, new_file_paths):
+        """Helper to clear the list and add the new PDFs (several PDFs form a batch)."""
         self.clear()
-        self.addItem(new_file_path)
-        self.files_added.emit([new_file_path])
+        self.addItems(new_file_paths)
+        self.files_added.emit(list(new_file_paths))
 
     def dragEnterEvent(self, event):
         if event.mimeData().hasUrls():
@@ -58,16 +62,12 @@ class PDFListWidget(QListWidget):
             event.setDropAction(Qt.DropAction.CopyAction) # Set the action
             event.acceptProposedAction() # Explicitly accept
 
-            new_pdf_path = None
-            # Find the first valid PDF path from the dropped URLs
-            for url in event.mimeData().urls():
-                file_path = url.toLocalFile()
-                if file_path.lower().endswith('.pdf'):
-                    new_pdf_path = file_path
-                    break # We only care about the first PDF for swapping
+            # Collect every PDF dropped together; more than one is processed as a batch
+            new_pdf_paths = [url.toLocalFile() for url in event.mimeData().urls()
+                             if url.toLocalFile().lower().endswith('.pdf')]
 
-            if new_pdf_path:
-                self._replace_current_pdf(new_pdf_path) # Use the helper
+            if new_pdf_paths:
+                self._replace_current_pdfs(new_pdf_paths) # Use the helper
             # If no valid PDF was dropped, we do nothing, the event was accepted but no action taken on list
         # If mimeData doesn't have URLs, the event is implicitly ignored by not being handled.
 
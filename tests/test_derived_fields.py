@@ -0,0 +1,27 @@
+import unittest
+
+from core.processing_logic import LEGACY_DERIVED_FIELDS
+
+# The parser leaves a name it could not find as None
+NO_NAMES = {'BYR1NAM1': None, 'BYR1NAM2': None, 'SLR1NAM1': None, 'SLR1NAM2': None, 'PROPSTRE': "1 Main St"}
+
+
+class LegacyDerivedFieldsTest(unittest.TestCase):
+    def test_compute_with_names_not_found(self):
+        derived = LEGACY_DERIVED_FIELDS.compute(NO_NAMES)
+        self.assertEqual(derived['BYRREL'], "")
+        self.assertEqual(derived['SLRREL'], "")
+        self.assertEqual(derived['FOLDERNAME'], "Unknown_Entity  25-")
+
+    def test_edit_recomputes_only_dependents(self):
+        data = dict(NO_NAMES)
+        derived = LEGACY_DERIVED_FIELDS.compute(data)
+        data['BYR1NAM1'] = "Jane Doe"
+        recomputed, dirty = LEGACY_DERIVED_FIELDS.recompute(data, derived, {'BYR1NAM1'})
+        self.assertEqual(recomputed, {'BYRREL': "DOE, Jane", 'FOLDERNAME': "Doe  25-"})
+        self.assertEqual(derived['SLRREL'], "")
+        self.assertEqual(set(dirty), {"folder name", "overlay.pxt", "setupdocs.docx", "Label.docx"})
+
+
+if __name__ == "__main__":
+    unittest.main()
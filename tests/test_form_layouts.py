@@ -0,0 +1,38 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from core.field_spec import ParseReport
+from core.form_layouts import FormLayoutStore
+
+PAGE_TEXTS = ["Revised 01/15/24 first page\f", "deposit and closing date\f", "agency\f"]
+SECTIONS = {'deposit': (30, 40), 'agency': (58, 64)}
+
+
+def _learn_in_worker(store: FormLayoutStore, fingerprint: str) -> dict:
+    return store.learn(fingerprint, PAGE_TEXTS, ParseReport({}, frozenset({'SETTDATE'}), SECTIONS))
+
+
+class FormLayoutStoreTest(unittest.TestCase):
+    def test_layout_learned_in_worker_reaches_parent_store(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = FormLayoutStore(os.path.join(directory, "form_layouts.json"))
+            self.assertIsNone(store.get("revised-01-15-24"))
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                learned = pool.submit(_learn_in_worker, store, "revised-01-15-24").result()
+                self.assertEqual(learned['pages'], [0, 1, 2])
+                self.assertEqual(store.get("revised-01-15-24"), learned)
+
+    def test_stale_copy_in_worker_sees_layout_learned_since(self):
+        # Batch tasks are pickled with the store as it was when the batch started
+        with tempfile.TemporaryDirectory() as directory:
+            store = FormLayoutStore(os.path.join(directory, "form_layouts.json"))
+            with ProcessPoolExecutor(max_workers=2) as pool:
+                learned = pool.submit(_learn_in_worker, store, "revised-01-15-24").result()
+                # The parent's store was never refreshed, so this task gets the startup copy
+                self.assertEqual(pool.submit(store.get, "revised-01-15-24").result(), learned)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,22 @@
+import unittest
+
+from core.benchmarks import benchmark_streaming_memory
+
+# Allowed extra peak RSS for the large packet over the small one; reading the
+# exhibits the contract doesn't need would cost several MB per 100 pages.
+MAX_GROWTH_BYTES = 2 * 1024 * 1024
+
+
+class StreamingMemoryTest(unittest.TestCase):
+    def test_peak_rss_flat_as_exhibit_pages_grow(self):
+        results = benchmark_streaming_memory((20, 200), include_whole=False)
+        small, large = results['runs']
+        growth = large['stream_bytes'] - small['stream_bytes']
+        self.assertLessEqual(
+            growth, MAX_GROWTH_BYTES,
+            f"Peak RSS grew {growth / 1024 / 1024:.1f} MB from {small['pages']} to {large['pages']} exhibit pages"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
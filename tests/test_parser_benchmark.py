@@ -0,0 +1,26 @@
+import os
+import json
+import unittest
+
+from core.benchmarks import PARSER_BASELINE_PATH, benchmark_parser, compare_parser_benchmark, synthetic_legacy_corpus
+
+# The baseline is a timing run on one machine, so absolute numbers only mean
+# something on comparable hardware: the test runs only with RUN_BENCHMARKS=1
+# (`python -m core.benchmarks parser` is the everyday gate). After a
+# deliberate change, or on a new machine, refresh it with
+#     python -m core.benchmarks parser --save-baseline
+
+
+@unittest.skipUnless(os.environ.get("RUN_BENCHMARKS") == "1", "wall-clock benchmark; set RUN_BENCHMARKS=1 to run")
+class ParserBenchmarkTest(unittest.TestCase):
+    def test_parser_within_baseline(self):
+        with open(PARSER_BASELINE_PATH, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        corpus = synthetic_legacy_corpus(baseline['documents'], baseline['seed'])
+        self.assertEqual(sum(len(text) for text in corpus), baseline['characters'], "Synthetic corpus changed; refresh the baseline")
+        results = benchmark_parser(corpus, repeat=baseline['repeat'])
+        self.assertEqual(compare_parser_benchmark(results, baseline), [], "Parser slower than tests/parser_baseline.json")
+
+
+if __name__ == "__main__":
+    unittest.main()
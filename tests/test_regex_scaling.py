@@ -0,0 +1,32 @@
+import time
+import unittest
+
+from core.benchmarks import adversarial_texts, benchmark_regex_scaling, spec_pattern_targets
+from core.legacy_contract_spec import LEGACY_CONTRACT_SPEC
+
+
+class RegexScalingTest(unittest.TestCase):
+    def test_patterns_grow_linearly(self):
+        results = benchmark_regex_scaling(LEGACY_CONTRACT_SPEC, size=1000)
+        failed = [f"{result['target']} on {result['input']} ({result['ratio']:.1f}x)" for result in results if result['failed']]
+        self.assertEqual(failed, [], "Super-linear time growth")
+
+    def test_fields_finish_within_budget_at_input_limit(self):
+        # What keeps fields in budget where FieldBudgetGuard can't run (Windows)
+        spec = LEGACY_CONTRACT_SPEC
+        over_budget = []
+        for label, sources, run in spec_pattern_targets(spec):
+            if label == "sections": # Located once per document, not a field
+                continue
+            for input_name, text in adversarial_texts(sources, spec.field_input_limit).items():
+                text = text[:spec.field_input_limit]
+                start = time.perf_counter()
+                run(text)
+                elapsed = time.perf_counter() - start
+                if elapsed > spec.field_time_budget:
+                    over_budget.append(f"{label} on {input_name} ({elapsed * 1000:.0f} ms)")
+        self.assertEqual(over_budget, [], f"Over the {spec.field_time_budget * 1000:.0f} ms field budget")
+
+
+if __name__ == "__main__":
+    unittest.main()